@@ -0,0 +1,84 @@
+"""입원 기간 조회 인덱스 벤치마크
+
+합성 vs/ns/progressnote 행(기본 테이블별 100만 건, 서명/RTF 없이)을 SQLite에 넣고,
+모델에 선언한 복합 인덱스가 없을 때와 있을 때 임의 차트의 입원 기간 조회 지연을 비교합니다.
+
+  uv run --extra sqlite python -m benchmarks.emr_indexes --charts 2000 --rows-per-chart 500
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from src.models.ddl import model_indexes
+from src.services.emr_service import EmrService
+
+from benchmarks.synthetic import REF, SyntheticWriter, create_tables
+
+
+def chart_ref(n: int) -> dict[str, str]:
+  return {**REF, "chart": f"{n + 1:08d}"}
+
+
+async def build_database(engine: AsyncEngine, charts: int, rows_per_chart: int) -> None:
+  """인덱스 없이 테이블 생성 후 차트별 합성 행 삽입 (삽입 후 인덱스를 만드는 편이 빠름)"""
+  writer = SyntheticWriter(blobs=False)
+  async with engine.begin() as conn:
+    await create_tables(conn)
+    for index in model_indexes():
+      await conn.execute(DropIndex(index))
+    for n in range(charts):
+      await writer.insert_chart(conn, chart_ref(n), rows_per_chart)
+
+
+async def create_indexes(engine: AsyncEngine) -> None:
+  async with engine.begin() as conn:
+    for index in model_indexes():
+      await conn.execute(CreateIndex(index))
+    await conn.execute(text("ANALYZE"))
+
+
+async def measure(name: str, service: EmrService, charts: int, queries: int) -> None:
+  rng = random.Random(0)
+  timings = []
+  for _ in range(queries):
+    started = time.perf_counter()
+    await service.load_chart(chart_ref(rng.randrange(charts)))
+    timings.append(time.perf_counter() - started)
+  timings.sort()
+  print(
+      f"{name:<14} queries={queries:<5} median={statistics.median(timings) * 1000:9.2f}ms "
+      f"p95={timings[int(len(timings) * 0.95) - 1] * 1000:9.2f}ms max={timings[-1] * 1000:9.2f}ms")
+
+
+async def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--charts", type=int, default=2000)
+  parser.add_argument("--rows-per-chart", type=int, default=500, help="차트별 테이블당 행 수")
+  parser.add_argument("--queries", type=int, default=50)
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as tmp:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/emr.sqlite")
+    started = time.perf_counter()
+    await build_database(engine, args.charts, args.rows_per_chart)
+    print(f"합성 데이터 생성: 테이블별 {args.charts * args.rows_per_chart:,}건, {time.perf_counter() - started:.1f}s")
+
+    service = EmrService(async_sessionmaker(engine, expire_on_commit=False))
+    await measure("no index", service, args.charts, args.queries)
+
+    started = time.perf_counter()
+    await create_indexes(engine)
+    print(f"인덱스 생성: {time.perf_counter() - started:.1f}s")
+    await measure("chart_window", service, args.charts, args.queries)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
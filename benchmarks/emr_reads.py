@@ -0,0 +1,93 @@
+"""EMR 조회 벤치마크: 전체 엔티티 조회 vs 컬럼 투영 + 스트리밍 조회
+
+서명(LargeBinary)/RTF 컬럼을 채운 합성 vs/ns/progressnote 테이블을 SQLite에 만들고,
+한 입원 기간을 두 방식으로 읽어 소요 시간과 최대 메모리(tracemalloc)를 비교합니다.
+
+  uv run --extra sqlite python -m benchmarks.emr_reads --rows 20000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from src.models.ns import Ns
+from src.models.progressnote import ProgressNote
+from src.models.vs import Vs
+from src.services.emr_service import EmrService, to_nursing_record, to_progress_note, to_vital_sign
+
+from benchmarks.synthetic import REF, SyntheticWriter, create_tables
+
+
+async def build_database(engine: AsyncEngine, rows: int, noise_charts: int) -> None:
+  """대상 입원 rows건 + 다른 차트 noise_charts개 x rows/10건 생성"""
+  writer = SyntheticWriter(blobs=True)
+  async with engine.begin() as conn:
+    await create_tables(conn)
+    await writer.insert_chart(conn, REF, rows)
+    for n in range(noise_charts):
+      await writer.insert_chart(conn, {**REF, "chart": f"{n + 2:08d}"}, rows // 10)
+
+
+async def load_full_entities(session_factory: async_sessionmaker) -> int:
+  """기존 방식: 모든 컬럼 엔티티 조회 후 Python에서 dc 필터"""
+  total = 0
+  converters = ((Vs, to_vital_sign), (Ns, to_nursing_record), (ProgressNote, to_progress_note))
+  async with session_factory() as session:
+    for model, convert in converters:
+      stmt = select(model).where(
+          model.saup == REF["saup"], model.chart == REF["chart"], model.ibymd == REF["ibymd"])
+      entities = (await session.scalars(stmt)).all()
+      total += len([convert(e) for e in entities if e.dc == "0"])
+  return total
+
+
+async def load_projected(session_factory: async_sessionmaker, batch_size: int) -> int:
+  """컬럼 투영 + SQL dc 필터 + yield_per 스트리밍"""
+  chart = await EmrService(session_factory, batch_size=batch_size).load_chart(REF)
+  return sum(len(rows) for rows in chart.values())
+
+
+async def measure(name: str, load: Callable[[], Awaitable[int]], repeat: int) -> None:
+  timings = []
+  peak = 0
+  count = 0
+  for _ in range(repeat):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = await load()
+    timings.append(time.perf_counter() - started)
+    peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+  timings.sort()
+  print(
+      f"{name:<22} rows={count:<8} median={timings[len(timings) // 2] * 1000:8.1f}ms "
+      f"min={timings[0] * 1000:8.1f}ms peak_mem={peak / 1024 / 1024:8.1f}MiB")
+
+
+async def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--rows", type=int, default=20000, help="대상 입원의 테이블별 행 수")
+  parser.add_argument("--noise-charts", type=int, default=20, help="다른 차트 수 (각 rows/10건)")
+  parser.add_argument("--batch-size", type=int, default=1000)
+  parser.add_argument("--repeat", type=int, default=5)
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as tmp:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/emr.sqlite")
+    started = time.perf_counter()
+    await build_database(engine, args.rows, args.noise_charts)
+    print(f"합성 데이터 생성: {time.perf_counter() - started:.1f}s")
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    await measure("full entities", lambda: load_full_entities(session_factory), args.repeat)
+    await measure("projected stream", lambda: load_projected(session_factory, args.batch_size), args.repeat)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
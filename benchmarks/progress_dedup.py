@@ -0,0 +1,43 @@
+"""경과기록 반복 문단 접기 벤치마크
+
+copy-forward가 많은 합성 경과기록(입원 기간별)에 collapse_repeats를 적용하고,
+경과기록 프롬프트 문자열의 추정 토큰 감소량과 처리 시간(기록 수에 비례하는지)을 확인합니다.
+
+  uv run python -m benchmarks.progress_dedup --days 30 180 1000
+"""
+import argparse
+import time
+
+from src.sio.features.medical.note_dedup import collapse_repeats
+from src.utils.format_util import hm_to_time, ymd_to_date
+from src.utils.token_util import estimate_tokens
+
+from benchmarks.synthetic import synthetic_request
+
+
+def render(notes: list[dict]) -> str:
+  """create_progressnote_summary와 같은 형식의 경과기록 본문"""
+  return "\n\n---\n".join(
+      f"**일시**: {ymd_to_date(r['ymd'])} {hm_to_time(r['time'])}\n**경과기록**: {r['progress']}"
+      for r in notes)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--days", type=int, nargs="+", default=[30, 180, 1000], help="입원 기간(일), 하루 1건")
+  args = parser.parse_args()
+
+  print(f"{'notes':>7}{'tokens':>10}{'collapsed':>11}{'saved':>8}{'ms':>9}{'us/note':>9}")
+  for days in args.days:
+    notes = synthetic_request(days)["progressNotes"]
+    started = time.perf_counter()
+    collapsed = collapse_repeats(notes)
+    elapsed = time.perf_counter() - started
+    before, after = estimate_tokens(render(notes)), estimate_tokens(render(collapsed))
+    print(
+        f"{len(notes):>7}{before:>10}{after:>11}{1 - after / before:>8.0%}"
+        f"{elapsed * 1000:>9.1f}{elapsed / len(notes) * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+  main()
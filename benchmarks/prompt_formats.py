@@ -0,0 +1,73 @@
+"""프롬프트 표 형식별 크기 벤치마크
+
+합성 입원 환자(입원 기간별)의 활력징후/간호기록/검사/진단 표를 형식별로 렌더링하여
+문자 수와 추정 토큰 수(estimate_tokens), markdown 대비 비율을 비교합니다.
+
+  uv run python -m benchmarks.prompt_formats --days 3 14 60
+"""
+import argparse
+from typing import Any, Callable
+
+from src.sio.features.medical.models import NsModels, VsModels
+from src.sio.features.medical.prompt_format import FORMAT_DESCRIPTIONS, PromptFormat, render_table
+from src.utils.token_util import estimate_tokens
+
+from benchmarks.synthetic import synthetic_request
+
+
+def vital_signs(data: dict[str, Any], fmt: PromptFormat) -> str:
+  vs_list = VsModels()
+  vs_list.add_recently_from_vss(data["vitalSigns"])
+  return vs_list.to_prompt(fmt)
+
+
+def nursing_records(data: dict[str, Any], fmt: PromptFormat) -> str:
+  ns_list = NsModels()
+  ns_list.add_from_nss(data["nursingRecords"])
+  return ns_list.to_prompt(fmt)
+
+
+def labs(data: dict[str, Any], fmt: PromptFormat) -> str:
+  columns = {key: key for lab in data["labs"] for key in lab}
+  columns["ymd"] = "검사일자(yyyyMMdd)"
+  return render_table(data["labs"], fmt, columns=columns, date_key="ymd")
+
+
+def diagnoses(data: dict[str, Any], fmt: PromptFormat) -> str:
+  rows = [
+      {"ymd": record["ymd"], **diagnosis}
+      for record in data["diagnosisRecords"] for diagnosis in record["diagnoses"]]
+  return render_table(
+      rows, fmt, columns={"ymd": "일자", "icdCode": "ICD 코드", "diagnosisName": "진단명"}, date_key="ymd")
+
+
+TABLES: dict[str, Callable[[dict[str, Any], PromptFormat], str]] = {
+    "vitalSigns": vital_signs,
+    "nursingRecords": nursing_records,
+    "labs": labs,
+    "diagnoses": diagnoses,
+}
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--days", type=int, nargs="+", default=[3, 14, 60], help="입원 기간(일)")
+  parser.add_argument("--patients", type=int, default=5, help="기간별 합성 환자 수")
+  args = parser.parse_args()
+
+  for days in args.days:
+    patients = [synthetic_request(days, seed) for seed in range(args.patients)]
+    print(f"\n입원 {days}일, 환자 {args.patients}명 (환자당 평균)")
+    print(f"{'table':<16}{'format':<10}{'chars':>10}{'tokens':>10}{'vs markdown':>13}")
+    for name, render in TABLES.items():
+      baseline = None
+      for fmt in FORMAT_DESCRIPTIONS:
+        texts = [render(data, fmt) for data in patients]
+        chars = sum(map(len, texts)) / len(texts)
+        tokens = sum(map(estimate_tokens, texts)) / len(texts)
+        baseline = baseline or tokens
+        print(f"{name:<16}{fmt:<10}{chars:>10.0f}{tokens:>10.0f}{tokens / baseline:>12.0%}")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,66 @@
+"""반복 간호기록/진단 run-length 압축 벤치마크
+
+같은 간호 문제/처치와 진단이 반복되는 합성 입원 기록(입원 기간별)에서
+간호기록 표와 진단 목록의 행 수, 추정 토큰 감소량과 처리 시간을 확인합니다.
+
+  uv run python -m benchmarks.run_length --days 30 180 1000
+"""
+import argparse
+import time
+
+from src.sio.features.medical.compaction import compact_diagnoses, group_by_period
+from src.sio.features.medical.models import NsModels
+from src.utils.token_util import estimate_tokens
+
+from benchmarks.synthetic import synthetic_request
+
+
+def diagnosis_text(records: list[dict], compact: bool) -> tuple[int, str]:
+  """create_prescription_summary와 같은 형식의 진단 목록 (줄 수, 본문)"""
+  if compact:
+    lines = [
+        f"**{run.period}**: " + ", ".join(f"{r.diagnosis_name} ({r.icd_code})" for r in group)
+        for run, group in group_by_period(compact_diagnoses(records))]
+  else:
+    lines = [
+        f"**{record['ymd']}**: " + ", ".join(f"{d['diagnosisName']} ({d['icdCode']})" for d in record['diagnoses'])
+        for record in records]
+  return len(lines), "\n".join(lines)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--days", type=int, nargs="+", default=[30, 180, 1000], help="입원 기간(일)")
+  parser.add_argument("--format", default="kv", help="간호기록 표 형식 (prompt_format.PromptFormat)")
+  args = parser.parse_args()
+
+  print(f"{'records':<10}{'days':>6}{'rows':>8}{'compact':>9}{'tokens':>9}{'compact':>9}{'saved':>8}{'ms':>8}")
+  for days in args.days:
+    request = synthetic_request(days)
+    for name, rows, compacted, elapsed in (_nursing(request, args.format), _diagnoses(request)):
+      before, after = estimate_tokens(rows[1]), estimate_tokens(compacted[1])
+      print(
+          f"{name:<10}{days:>6}{rows[0]:>8}{compacted[0]:>9}{before:>9}{after:>9}"
+          f"{1 - after / before:>8.0%}{elapsed * 1000:>8.1f}")
+
+
+def _nursing(request: dict, fmt: str):
+  plain = NsModels()
+  plain.add_from_nss(request["nursingRecords"], compact=False)
+  started = time.perf_counter()
+  compacted = NsModels()
+  compacted.add_from_nss(request["nursingRecords"], compact=True)
+  elapsed = time.perf_counter() - started
+  return "nursing", (len(plain), plain.to_prompt(fmt)), (len(compacted), compacted.to_prompt(fmt)), elapsed
+
+
+def _diagnoses(request: dict):
+  records = request["diagnosisRecords"]
+  started = time.perf_counter()
+  compacted = diagnosis_text(records, compact=True)
+  elapsed = time.perf_counter() - started
+  return "diagnoses", diagnosis_text(records, compact=False), compacted, elapsed
+
+
+if __name__ == "__main__":
+  main()
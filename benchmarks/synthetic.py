@@ -0,0 +1,193 @@
+"""벤치마크용 합성 데이터 (EMR vs/ns/progressnote 행, 요약 요청 형식 환자)"""
+import itertools
+import os
+import random
+from datetime import date, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.models.ns import Ns
+from src.models.progressnote import ProgressNote
+from src.models.vs import Vs
+
+
+REF = {"saup": "01", "chart": "00000001", "ibymd": "20240101"}
+INSERT_CHUNK = 2000
+
+type RowBuilder = Callable[[int, dict[str, str], bool], dict[str, Any]]
+
+
+def _common(i: int, ref: dict[str, str], blobs: bool) -> dict[str, Any]:
+  day = i // 48
+  row = {
+      **ref,
+      "ymd": f"2024{1 + day // 28 % 12:02d}{1 + day % 28:02d}",
+      "time": f"{i % 24:02d}{i % 60:02d}00",
+      "dc": "1" if i % 50 == 0 else "0",
+  }
+  if blobs:
+    row.update(insign=os.urandom(2048), upsign=os.urandom(2048), incert="C" * 1024)
+  return row
+
+
+def vs_row(i: int, ref: dict[str, str], blobs: bool = True) -> dict[str, Any]:
+  return {
+      **_common(i, ref, blobs), "hulap1": "120", "hulap2": "80", "maekbak": str(60 + i % 40),
+      "cheon": "36.5", "hohup": "18", "weight": "60", "spo2": "98"}
+
+
+def ns_row(i: int, ref: dict[str, str], blobs: bool = True) -> dict[str, Any]:
+  row = {**_common(i, ref, blobs), "dup": i, "neyong1": f"낙상 위험 {i}", "neyong2": "침상 난간 올림"}
+  if blobs:
+    row.update(neyong1rtf="{\\rtf1 " + "x" * 4096 + "}", neyong2rtf="{\\rtf1 " + "x" * 4096 + "}")
+  return row
+
+
+def progress_row(i: int, ref: dict[str, str], blobs: bool = True) -> dict[str, Any]:
+  row = {
+      **_common(i, ref, blobs), "dup": i, "gubun": "01", "weibgu": "I", "yuhyung": "01", "jinchal": "01",
+      "soapuse": "0", "progress": f"경과 관찰 {i}"}
+  if blobs:
+    rtf = "{\\rtf1 " + "x" * 2048 + "}"
+    row.update(rtf=rtf, srtf=rtf, ortf=rtf, artf=rtf, prtf=rtf)
+  return row
+
+
+TABLES: tuple[tuple[Any, RowBuilder], ...] = ((Vs, vs_row), (Ns, ns_row), (ProgressNote, progress_row))
+
+
+async def create_tables(conn: AsyncConnection) -> None:
+  for model, _ in TABLES:
+    await conn.run_sync(model.metadata.create_all)
+
+
+def column_names(model: Any) -> dict[str, str]:
+  """ORM 속성 이름 -> 테이블 컬럼 이름 (예: Vs.auto -> vs_auto)"""
+  return {attr.key: attr.columns[0].name for attr in model.__mapper__.column_attrs}
+
+
+class SyntheticWriter:
+  """차트 단위 합성 행 삽입 (SQLite는 BIGINT 기본키를 자동 증가시키지 않으므로 auto를 직접 채움)
+
+  Core insert는 ORM 속성 이름이 아닌 테이블 컬럼 이름으로 값을 받으므로, 행 생성 함수가 만든
+  속성 이름 키를 컬럼 이름으로 바꿔 넣습니다.
+  """
+
+  def __init__(self, blobs: bool = True) -> None:
+    self.blobs = blobs
+    self._ids = {model: itertools.count(1) for model, _ in TABLES}
+    self._columns = {model: column_names(model) for model, _ in TABLES}
+
+  async def insert_chart(self, conn: AsyncConnection, ref: dict[str, str], rows: int) -> None:
+    for model, make_row in TABLES:
+      columns = self._columns[model]
+      for start in range(0, rows, INSERT_CHUNK):
+        chunk = [
+            {columns[key]: value for key, value in make_row(i, ref, self.blobs).items()}
+            | {columns["auto"]: next(self._ids[model])}
+            for i in range(start, min(rows, start + INSERT_CHUNK))]
+        await conn.execute(insert(model.__table__), chunk)
+
+
+# === 요약 요청(SummarizePatientRequest) 형식 합성 환자 ===
+
+_NURSING = [
+    ("낙상 위험", "침상 난간 올림, 낙상 예방 교육"),
+    ("급성 통증", "통증 사정 후 처방된 진통제 투여"),
+    ("감염 위험", "수술 부위 드레싱, 활력징후 관찰"),
+    ("비효율적 호흡 양상", "심호흡 및 기침 격려, 산소 2L/min 유지"),
+]
+_LABS = [
+    ("CBC", "WBC", 4.0, 10.0, "10^3/uL"),
+    ("CBC", "Hb", 12.0, 16.0, "g/dL"),
+    ("CBC", "PLT", 150, 400, "10^3/uL"),
+    ("Chemistry", "AST", 0, 40, "U/L"),
+    ("Chemistry", "ALT", 0, 40, "U/L"),
+    ("Chemistry", "BUN", 8, 23, "mg/dL"),
+    ("Chemistry", "Creatinine", 0.6, 1.2, "mg/dL"),
+    ("Chemistry", "Glucose", 70, 110, "mg/dL"),
+    ("Electrolyte", "Na", 135, 145, "mmol/L"),
+    ("Electrolyte", "K", 3.5, 5.1, "mmol/L"),
+    ("Inflammation", "CRP", 0, 0.5, "mg/dL"),
+]
+_DIAGNOSES = [
+    ("K35.8", "급성 충수염, 기타 및 상세불명"),
+    ("I10", "본태성(일차성) 고혈압"),
+    ("E11.9", "합병증을 동반하지 않은 2형 당뇨병"),
+]
+_MEDICATIONS = [
+    ("세프트리악손주 1g", "IV", 1, 2),
+    ("아세트아미노펜정 500mg", "PO", 1, 3),
+    ("메트포르민정 500mg", "PO", 1, 2),
+    ("암로디핀정 5mg", "PO", 1, 1),
+]
+_PROGRESS = [
+    "S) 복부 통증 호소 감소, 식이 진행 중 오심 없음.",
+    "O) 수술 부위 발적/삼출물 없음, 장음 정상, 발열 없음.",
+    "A) 충수절제술 후 회복 중, 혈압/혈당 조절 양호.",
+    "P) 항생제 유지, 식이 진행, 보행 격려, 내일 혈액검사 추적.",
+]
+
+
+def _ymd(start: date, day: int) -> str:
+  return (start + timedelta(days=day)).strftime("%Y%m%d")
+
+
+def synthetic_request(days: int, seed: int = 0) -> dict[str, Any]:
+  """days일 입원한 환자의 요약 요청
+
+  실제 EMR처럼 같은 간호 문제/처치가 근무조마다, 같은 진단이 매일, 경과기록 문단이 매일 반복(copy-forward)됩니다.
+  - 활력징후 하루 6회, 간호기록 하루 3회(근무조), 검사 2일마다 1회, 진단/경과기록 하루 1회
+  """
+  rng = random.Random(seed)
+  start = date(2024, 3, 1)
+
+  vital_signs, nursing_records, labs, diagnosis_records, progress_notes = [], [], [], [], []
+  for day in range(days):
+    ymd = _ymd(start, day)
+    for hour in range(2, 24, 4):
+      vital_signs.append({
+          "ymd": ymd, "time": f"{hour:02d}00",
+          "highPressure": str(rng.randint(110, 150)), "lowPressure": str(rng.randint(60, 95)),
+          "pulse": str(rng.randint(60, 110)), "weight": "" if hour != 6 else "68.5",
+          "temperature": f"{rng.uniform(36.2, 38.2):.1f}", "respiration": str(rng.randint(14, 22)),
+          "spo2": str(rng.randint(93, 100))})
+    problem = _NURSING[day // 7 % len(_NURSING)]
+    for shift in ("0700", "1500", "2300"):
+      nursing_records.append({
+          "ymd": ymd, "time": shift, "nursingDiagnosis": problem[0], "nursingIntervention": problem[1]})
+    if day % 2 == 0:
+      for test_name, sub_test, low, high, unit in _LABS:
+        value = rng.uniform(low * 0.8, high * 1.2) if high else 0
+        labs.append({
+            "ymd": ymd, "testName": test_name, "subTestName": sub_test, "resultValue": f"{value:.1f}",
+            "unit": unit, "normalRange": f"{low}~{high}", "note": "H" if value > high else ("L" if value < low else "")})
+    diagnosis_records.append({
+        "ymd": ymd, "diagnoses": [{"icdCode": code, "diagnosisName": name} for code, name in _DIAGNOSES]})
+    paragraphs = list(_PROGRESS)
+    if rng.random() < 0.3:
+      paragraphs.insert(2, f"O) {ymd} 체온 {rng.uniform(37.5, 38.5):.1f}도로 미열, 혈액배양 시행.")
+    progress_notes.append({"ymd": ymd, "time": "0900", "progress": "\n".join(paragraphs)})
+
+  medications = [
+      {
+          "sYmd": _ymd(start, 0), "eYmd": _ymd(start, days - 1),
+          "medicationYmds": [_ymd(start, day) for day in range(days)],
+          "medicationName": name, "route": route, "dose": dose, "frequency": frequency,
+          "totalDays": days, "administration": "식후 30분" if route == "PO" else "", "note": ""}
+      for name, route, dose, frequency in _MEDICATIONS]
+
+  return {
+      "patientInfo": {
+          "name": "홍길동", "chart": f"{seed + 1:08d}", "lastVisitYmd": _ymd(start, days - 1),
+          "hpTel": "010-0000-0000", "sex": "M", "age": "64"},
+      "nursingRecords": nursing_records,
+      "progressNotes": progress_notes,
+      "vitalSigns": vital_signs,
+      "medications": medications,
+      "diagnosisRecords": diagnosis_records,
+      "labs": labs,
+      "radiologyReports": [],
+  }
@@ -0,0 +1,4 @@
+"""HTTP API 라우터"""
+from .router import api_router
+
+__all__ = ["api_router"]
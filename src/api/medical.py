@@ -0,0 +1,160 @@
+"""의료 요약 HTTP API"""
+import asyncio
+import functools
+import json
+import uuid
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import APIRouter, Body, Request
+from fastapi.responses import StreamingResponse
+from loguru import logger
+from src.api.sse import SseEmitter
+from src.core import settings
+from src.sio.emitter import NullEmitter
+from src.sio.features.medical.dto import SummarizePatientRequest
+from src.sio.features.medical.job_store import summary_job_store
+from src.sio.features.medical.jobs import SummaryJob, SummaryWorkerPool, resolve_tenant
+from src.sio.features.medical.main import MedicalNamespace
+from src.sio.features.medical.prewarm import prewarm_watchlist
+from src.sio.features.medical.summary import validate_summary_request
+from src.sio.presence import new_http_stream_sid, room_presence
+from src.utils.stream_util import iter_ndjson_lines, map_unordered, ndjson_line
+
+router = APIRouter()
+
+# 연결이 끊긴 뒤에도 결과 보관을 위해 계속 실행 중인 요약 태스크 (GC 방지용 참조)
+_detached_tasks: set[asyncio.Task] = set()
+
+
+async def _summarize_line(pool: SummaryWorkerPool, item: tuple[int, bytes]) -> dict[str, Any]:
+  """NDJSON 한 줄 요약 (실패해도 배치 전체를 멈추지 않고 error 결과로 반환)
+
+  요청 1건을 background lane 작업으로 워커 풀에 넣어 실행하므로, interactive 요청이 먼저 슬롯을 받고
+  기관별 동시 실행/토큰 한도와 대기열 상한도 Socket.IO 요청과 똑같이 적용됩니다.
+  결과는 room 전송 없이 작업 보관소에서 읽습니다.
+  """
+  index, line = item
+  try:
+    data = json.loads(line)
+    validate_summary_request(data)
+    job = SummaryJob(
+        room=f"batch:{uuid.uuid4().hex}",
+        data={**data, "priority": "background"},
+        tenant=resolve_tenant(data.get("saup")),
+        priority="background",
+        silent=True)
+    await summary_job_store.update(job.job_id, job.room, "queued", silent=True)
+    await pool.run(job, NullEmitter(MedicalNamespace.namespace))
+    record = await summary_job_store.get(job.job_id)
+  except Exception as e:
+    logger.exception(f"[api] 배치 요약 실패 - index: {index}, error: {e}")
+    return {"index": index, "error": str(e)}
+
+  if record is None or record.status != "done" or record.result is None:
+    error = (record and record.error) or f"요약이 완료되지 않았습니다 ({record.status if record else 'missing'})"
+    logger.warning(f"[api] 배치 요약 실패 - index: {index}, job: {job.job_id}, error: {error}")
+    return {"index": index, "jobId": job.job_id, "error": error}
+  return {
+      "index": index,
+      "chart": (data.get("patientInfo") or {}).get("chart"),
+      "summary": record.result,
+  }
+
+
+@router.post("/summaries/batch")
+async def summarize_batch(request: Request) -> StreamingResponse:
+  """SummarizePatientRequest NDJSON 스트림을 받아 PatientSummaryResponse를 NDJSON으로 스트리밍
+
+  요청 본문은 한 줄에 요청 1건이며, 최대 SUMMARY_BATCH_CONCURRENCY건씩 워커 풀의 background lane에 넣고
+  끝나는 순서대로 `{"index", "chart", "summary"}` 또는 `{"index", "error"}` 한 줄을 전송합니다.
+  index는 요청 본문에서의 줄 순서(0부터)입니다.
+  """
+  pool: SummaryWorkerPool = request.app.state.summary_workers
+
+  async def items() -> AsyncIterator[tuple[int, bytes]]:
+    index = 0
+    async for line in iter_ndjson_lines(request.stream(), settings.SUMMARY_BATCH_MAX_LINE_BYTES):
+      yield index, line
+      index += 1
+
+  async def body() -> AsyncIterator[bytes]:
+    count = 0
+    try:
+      async for result in map_unordered(
+          items(), functools.partial(_summarize_line, pool), settings.SUMMARY_BATCH_CONCURRENCY):
+        count += 1
+        yield ndjson_line(result)
+    except ValueError as e:
+      # 응답이 이미 시작되었으므로 상태 코드 대신 마지막 줄로 알림
+      logger.warning(f"[api] 배치 입력 오류 - 처리 {count}건 후 중단: {e}")
+      yield ndjson_line({"error": str(e)})
+    logger.info(f"[api] 배치 요약 완료 - {count}건")
+
+  return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@router.post("/summaries/stream")
+async def stream_summary(
+    request: Request,
+    room: str,
+    data: SummarizePatientRequest = Body(...),
+) -> StreamingResponse:
+  """환자 요약을 Server-Sent Events로 스트리밍 (Socket.IO summarize_patient와 같은 실행 경로)
+
+  /medical 네임스페이스와 같은 이벤트 이름과 데이터를 전송합니다.
+  - job: `{"jobId"}` (Socket.IO 요청의 ack와 같음, cancel_summary에 사용)
+  - loading / patient_data / section_result / summarize_patient / error
+
+  웹 프로세스의 워커 풀에서 같은 AdmissionController를 거쳐 실행하며, 입력이 보관된 결과(사전 계산 포함)와
+  같으면 LLM 호출 없이 바로 결과를 보냅니다 (force로 무시). 결과는 room(환자 id)의 작업 보관소에 저장되므로
+  이후 Socket.IO join_room이나 재요약도 이 결과를 사용합니다.
+  연결이 끊기면 EMPTY_ROOM_POLICY=abort일 때 실행 중인 요약을 취소합니다.
+  잘못된 요청 옵션은 스트림을 열기 전에 422로 거절합니다.
+  """
+  validate_summary_request(data)
+  tenant = resolve_tenant(data.get("saup"))
+  pool: SummaryWorkerPool = request.app.state.summary_workers
+  namespace = MedicalNamespace.namespace
+  emitter = SseEmitter(namespace)
+  sid = new_http_stream_sid()
+  prewarm_watchlist.add(room, data)
+
+  async def run() -> None:
+    try:
+      job = SummaryJob(
+          room=room,
+          data=data,
+          tenant=tenant,
+          priority=data.get("priority", "interactive"))
+      logger.info(
+          f"[api] stream_summary - room: {room}, tenant: {job.tenant}, lane: {job.priority}, job: {job.job_id}")
+      await summary_job_store.update(job.job_id, room, "queued", requester_sid=sid)
+      await emitter.emit("job", {"jobId": job.job_id})
+      await pool.run(job, emitter)
+    except Exception as e:
+      logger.exception(f"[api] stream_summary 오류 - room: {room}, error: {e}")
+      await emitter.emit("error", {"message": str(e)}, room=room)
+    finally:
+      emitter.close()
+
+  async def body() -> AsyncIterator[bytes]:
+    await room_presence.add(namespace, room, sid)
+    task: Optional[asyncio.Task] = None
+    try:
+      task = asyncio.create_task(run(), name=f"summary-stream-{sid}")
+      async for event in emitter.events(settings.SSE_KEEPALIVE_SECONDS):
+        yield event
+    finally:
+      await room_presence.remove(namespace, room, sid)
+      if task and not task.done():
+        if settings.EMPTY_ROOM_POLICY == "abort":
+          logger.info(f"[api] stream_summary 연결 종료로 요약 취소 - room: {room}")
+          task.cancel()
+        else:
+          _detached_tasks.add(task)
+          task.add_done_callback(_detached_tasks.discard)
+
+  return StreamingResponse(
+      body(),
+      media_type="text/event-stream",
+      headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,6 @@
+from fastapi import APIRouter
+
+from src.api import medical
+
+api_router = APIRouter()
+api_router.include_router(medical.router, prefix="/medical", tags=["medical"])
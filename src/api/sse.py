@@ -0,0 +1,68 @@
+"""HTTP Server-Sent Events 전송"""
+import asyncio
+from typing import Any, AsyncIterator, Optional
+
+from src.utils.stream_util import sse_event
+
+
+class SseEmitter:
+  """요청 연결 하나로 이벤트를 보내는 RoomEmitter
+
+  요약 파이프라인은 room 단위로 전송하지만, 이 전송기는 room과 관계없이 자신을 만든
+  HTTP 요청의 응답 스트림에만 씁니다. ack는 받을 수 없으므로 빈 응답을 반환합니다.
+  """
+
+  def __init__(self, namespace: str) -> None:
+    self.namespace = namespace
+    self._events: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+
+  async def emit(
+      self,
+      event: str,
+      data: Any,
+      room: Optional[str] = None,
+      skip_sid: Optional[str] = None
+  ) -> None:
+    self._events.put_nowait(sse_event(event, data))
+
+  async def emit_with_ack(
+      self,
+      event: str,
+      data: Any,
+      to: str,
+      timeout: int = 10
+  ) -> Any:
+    await self.emit(event, data, room=to)
+    return None
+
+  async def send_with_acks(
+      self,
+      event: str,
+      data: Any,
+      room: str
+  ) -> dict[str, asyncio.Future]:
+    await self.emit(event, data, room=room)
+    return {}
+
+  async def collect_acks(
+      self,
+      futures: dict[str, asyncio.Future],
+      timeout: float = 10
+  ) -> dict[str, Any]:
+    return {}
+
+  def close(self) -> None:
+    """스트림 종료 표시 (대기 중 이벤트를 모두 보낸 뒤 events()가 끝남)"""
+    self._events.put_nowait(None)
+
+  async def events(self, keepalive: float) -> AsyncIterator[bytes]:
+    """전송된 이벤트 스트림 (keepalive초 동안 이벤트가 없으면 주석 줄을 보내 프록시 유휴 종료 방지)"""
+    while True:
+      try:
+        event = await asyncio.wait_for(self._events.get(), timeout=keepalive)
+      except TimeoutError:
+        yield b": keepalive\n\n"
+        continue
+      if event is None:
+        return
+      yield event
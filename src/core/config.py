@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -5,6 +7,125 @@ class Settings(BaseSettings):
   debug: bool = False
   APP_ENV:  str | None = None
   DATABASE_URL: str = ""
+  # EMR 테이블 조회 시 한 번에 가져올 행 수 (스트리밍 묶음 크기)
+  EMR_FETCH_BATCH_SIZE: int = 1000
+  # 차트 스냅샷 보관소 (memory / sqlite) - 재조회 시 변경분만 읽음
+  CHART_SNAPSHOT_STORE: str = "memory"
+  # memory 보관소 최대 차트 수
+  CHART_SNAPSHOT_MAX_CHARTS: int = 500
+  # sqlite 보관소 파일 경로
+  CHART_SNAPSHOT_PATH: str = "chart_snapshots.sqlite"
+
+  # 프롬프트 표 형식 (markdown / tsv / kv / by_date), 노드별 지정은 노드 이름 -> 형식
+  PROMPT_FORMAT: str = "markdown"
+  PROMPT_FORMAT_BY_NODE: dict[str, str] = {}
+  # 노드별 프롬프트 이력 항목 토큰 예산 (추정치, 0 이하는 제한 없음), 노드 이름 -> 예산으로 개별 지정
+  PROMPT_TOKEN_BUDGET: int = 16000
+  PROMPT_TOKEN_BUDGETS: dict[str, int] = {"create_progressnote_summary": 24000}
+  # 경과기록에서 앞 기록과 같은 문단을 "동일 (YYYY-MM-DD 참조)"로 접기 (copy-forward 토큰 절감)
+  PROGRESS_NOTE_COLLAPSE_REPEATS: bool = True
+  # 연속으로 반복되는 간호기록(간호 문제/처치)과 진단을 "2024-03-01~03-14 (42회)" 형태로 합치기
+  RUN_LENGTH_COMPACTION: bool = True
+  # 섹션 입력(경과기록, 활력징후+간호기록, 방사선 판독)이 이 추정 토큰을 넘으면 map-reduce 요약 (0 이하는 사용 안 함)
+  MAP_REDUCE_THRESHOLD_TOKENS: int = 20000
+  MAP_REDUCE_THRESHOLDS: dict[str, int] = {}
+  # map 구간 최대 추정 토큰 (날짜 경계로 분할) / 동시 구간 요약 수
+  MAP_REDUCE_CHUNK_TOKENS: int = 6000
+  MAP_REDUCE_CONCURRENCY: int = 8
+
+  # summarize_patient 응답의 lawData 기본 전송 모드 (full / hash / downsampled)
+  LAW_DATA_MODE: Literal["full", "hash", "downsampled"] = "hash"
+  # downsampled 모드에서 전송할 최대 활력징후 건수
+  LAW_DATA_MAX_POINTS: int = 48
+
+  # Socket.IO client manager (memory: 단일 프로세스 / redis: 멀티 노드 pub/sub)
+  SIO_CLIENT_MANAGER: str = "memory"
+  # Redis 호환 서버 주소 (Redis, Valkey, KeyDB 등)
+  REDIS_URL: str = "redis://localhost:6379/0"
+  # 노드 간 Socket.IO 메시지를 주고받는 pub/sub 채널 이름
+  SIO_CHANNEL: str = "medical-socketio"
+  # room 전송 시 클라이언트별 ack 대기 시간(초)
+  SIO_ACK_TIMEOUT_SECONDS: float = 10
+  # room presence 키 prefix / 참여자 만료(초) / 갱신 주기(초) - SIO_CLIENT_MANAGER=redis 일 때 사용
+  # 각 노드가 자기 클라이언트의 마지막 확인 시각을 주기적으로 갱신하고, 만료 시간 동안 갱신되지 않은
+  # 참여자(비정상 종료된 노드의 클라이언트)는 제외
+  ROOM_PRESENCE_KEY_PREFIX: str = "medical:presence"
+  ROOM_PRESENCE_TTL_SECONDS: int = 90
+  ROOM_PRESENCE_HEARTBEAT_SECONDS: float = 30
+  # 결과를 받을 클라이언트가 room에 없을 때 처리
+  # - abort: 실행 전/단계 사이에 요약 취소
+  # - park: 계속 실행하되 전송하지 않고 결과를 보관소에만 저장 (재접속 시 전달)
+  EMPTY_ROOM_POLICY: str = "park"
+
+  # 환자 요약 작업 큐 (local: 웹 프로세스 내부 / redis: 브로커 + 별도 워커 프로세스)
+  SUMMARY_QUEUE: str = "local"
+  # redis 큐 사용 시 작업 리스트 키
+  SUMMARY_QUEUE_KEY: str = "medical:summary-jobs"
+  # 프로세스당 동시에 실행할 요약 작업 수
+  SUMMARY_WORKER_CONCURRENCY: int = 4
+  # 프로세스당 대기열 상한 (초과 시 retryAfter와 함께 즉시 거절)
+  SUMMARY_MAX_BACKLOG: int = 20
+  # 실행 이력이 없을 때 사용할 요약 1건 예상 소요 시간(초)
+  SUMMARY_DEFAULT_DURATION_SECONDS: float = 30.0
+  # 노드 완료 알림(loading)을 모아 보내는 간격(초), 0이면 즉시 전송
+  LOADING_COALESCE_SECONDS: float = 0.5
+  # 남은 시간 추정에 사용할 노드/입력 크기 구간별 최소 실행 이력 수
+  NODE_LATENCY_MIN_SAMPLES: int = 3
+
+  # 기관(saup)별 공정 배분 가중치 (미지정 기관은 1.0), 예: {"01": 2, "02": 1}
+  TENANT_WEIGHTS: dict[str, float] = {}
+  # 기관별 프로세스당 동시 실행 수 상한 (미지정 기관은 TENANT_DEFAULT_MAX_CONCURRENCY, 0이면 제한 없음)
+  TENANT_MAX_CONCURRENCY: dict[str, int] = {}
+  TENANT_DEFAULT_MAX_CONCURRENCY: int = 0
+  # 기관별 토큰 한도 (TENANT_TOKEN_QUOTA_WINDOW_SECONDS 동안, 미지정/0이면 제한 없음)
+  TENANT_TOKEN_QUOTAS: dict[str, int] = {}
+  TENANT_TOKEN_QUOTA_WINDOW_SECONDS: int = 3600
+
+  # background lane(사전 계산/배치) 프로세스당 동시 실행 수 (미지정 시 SUMMARY_WORKER_CONCURRENCY의 절반)
+  SUMMARY_BACKGROUND_MAX_CONCURRENCY: int | None = None
+  # background lane 대기열 상한
+  SUMMARY_BACKGROUND_MAX_BACKLOG: int = 200
+  # 완료/진행 중 작업 보관 기간(초) - 재접속 클라이언트에게 재전송
+  SUMMARY_RESULT_TTL_SECONDS: int = 1800
+  # 완료 결과 보관 기간(초) - 입력이 같은 요청에 즉시 응답(warm hit), 사전 계산 결과가 회진 때까지 남도록 길게 유지
+  SUMMARY_DONE_TTL_SECONDS: int = 43200
+  # local 보관소 최대 작업 수
+  SUMMARY_RESULT_MAX_JOBS: int = 1000
+  # redis 보관소 키 prefix
+  SUMMARY_RESULT_KEY_PREFIX: str = "medical:summary"
+  # 취소 요청 확인 주기(초)
+  SUMMARY_CANCEL_POLL_SECONDS: float = 0.5
+  # 실행 중인 작업의 heartbeat(updated_at) 갱신 주기(초)
+  SUMMARY_JOB_HEARTBEAT_SECONDS: float = 30
+  # heartbeat가 이 시간(초) 이상 끊긴 대기/실행 작업은 중단된 것으로 보고 체크포인트를 이어받음
+  SUMMARY_JOB_STALE_SECONDS: float = 120
+
+  # HTTP 배치 요약(NDJSON) 요청당 동시 실행 수
+  SUMMARY_BATCH_CONCURRENCY: int = 4
+  # 배치 요청 한 줄(요청 1건) 최대 크기
+  SUMMARY_BATCH_MAX_LINE_BYTES: int = 16 * 1024 * 1024
+  # HTTP 스트리밍(SSE) 이벤트가 없을 때 keepalive 주석 전송 주기(초)
+  SSE_KEEPALIVE_SECONDS: float = 15
+
+  # 회진 전 요약 사전 계산 (chartRef로 요청된 입원 환자의 차트 변경 감시 -> background 재요약)
+  PREWARM_ENABLED: bool = False
+  # 사전 계산 시간대 (서버 로컬 시각, 자정을 넘는 구간 허용)
+  PREWARM_WINDOWS: list[str] = ["22:00-06:00", "06:30-08:00"]
+  # 차트 변경 확인 주기(초)
+  PREWARM_POLL_SECONDS: float = 300
+  # 마지막 요청 후 감시 목록에 유지하는 기간(초)
+  PREWARM_WATCH_SECONDS: int = 259200
+  # 한 번 확인할 때 등록할 최대 작업 수
+  PREWARM_MAX_JOBS_PER_SCAN: int = 50
+
+  # 그래프 체크포인터 (none / memory / sqlite)
+  GRAPH_CHECKPOINTER: str = "none"
+  # sqlite 체크포인터 파일 경로
+  GRAPH_CHECKPOINT_PATH: str = "checkpoints.sqlite"
+  # 체크포인트 보관 기간(초) - 체크포인트에는 환자 정보(PHI)가 포함됩니다.
+  # 정상 완료된 실행의 스레드는 즉시 삭제하고, 중단된 실행의 스레드는 재시도에서 이어받을 수 있도록
+  # 이 기간 동안만 남긴 뒤 주기적으로 삭제합니다.
+  GRAPH_CHECKPOINT_RETENTION_SECONDS: int = 1800
 
   model_config = {
       "env_file": ".env",
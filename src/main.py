@@ -3,9 +3,18 @@ from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
+from src.api import api_router
+from src.core import settings
 from src.core.exceptions.handlers import register_exception_handlers
 from src.core.logging_conf import setup_loguru
-from src.sio import get_socketio_app, register_all_namespaces
+from src.sio import MedicalNamespace, get_socketio_app, register_all_namespaces
+from src.sio.features.medical import medical_graph
+from src.sio.features.medical.checkpoint import open_checkpointer
+from src.sio.features.medical.job_store import summary_job_store
+from src.sio.features.medical.jobs import SummaryWorkerPool, summary_queue
+from src.sio.features.medical.prewarm import PrewarmScheduler
+from src.services import close_emr_service
+from src.sio.presence import room_presence
 
 if sys.platform != "win32":
   import asyncio
@@ -23,10 +32,32 @@ async def lifespan(app: FastAPI):
   register_all_namespaces()
   logger.info("Socket.IO 설정 완료")
 
-  yield  # FastAPI 애플리케이션 실행
+  async with open_checkpointer() as checkpointer:
+    medical_graph.compile_workflow(checkpointer)
 
-  # 종료할 때 리소스 정리
-  logger.info("애플리케이션 종료: 리소스 정리 중...")
+    # 로컬 큐는 웹 프로세스 안에서 소비 (redis 큐는 `python -m src.worker`가 소비)
+    # HTTP 스트리밍 요청은 큐 종류와 관계없이 웹 프로세스의 워커 풀에서 실행
+    summary_workers = SummaryWorkerPool(summary_queue, emitter=MedicalNamespace())
+    summary_workers.start(dispatch=settings.SUMMARY_QUEUE == "local")
+    app.state.summary_workers = summary_workers
+
+    # 감시 목록은 요청을 받은 웹 프로세스에 있으므로 사전 계산도 웹 프로세스에서 등록
+    prewarm: PrewarmScheduler | None = None
+    if settings.PREWARM_ENABLED:
+      prewarm = PrewarmScheduler()
+      prewarm.start()
+
+    yield  # FastAPI 애플리케이션 실행
+
+    # 종료할 때 리소스 정리
+    logger.info("애플리케이션 종료: 리소스 정리 중...")
+    if prewarm:
+      await prewarm.stop()
+    await summary_workers.stop()
+    await summary_queue.close()
+    await summary_job_store.close()
+    await room_presence.close()
+    await close_emr_service()
   logger.info("정리 완료")
 
 app = FastAPI(
@@ -48,7 +79,7 @@ app.add_middleware(
 # Exception Handler 등록
 register_exception_handlers(app)
 
-# app.include_router(router=api_router, prefix="/api")
+app.include_router(router=api_router, prefix="/api")
 
 # Socket.IO와 FastAPI를 통합한 ASGI 앱
 asgi_app = get_socketio_app(app)
@@ -0,0 +1,45 @@
+"""모델에 선언한 인덱스의 DDL 출력
+
+EMR 테이블은 이미 운영 DB에 있으므로 테이블 생성문이 아닌 CREATE INDEX 문만 출력합니다.
+DBA 검토/마이그레이션 스크립트에 그대로 사용할 수 있습니다.
+
+  python -m src.models.ddl --dialect mysql
+  python -m src.models.ddl --dialect mysql --drop
+"""
+import argparse
+
+from sqlalchemy import Index, Table
+from sqlalchemy.dialects import registry
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from src.models.ns import Ns
+from src.models.progressnote import ProgressNote
+from src.models.vs import Vs
+
+
+TABLES: tuple[Table, ...] = (Vs.__table__, Ns.__table__, ProgressNote.__table__)
+
+
+def model_indexes() -> list[Index]:
+  """모델에 선언된 인덱스 목록 (테이블, 이름 순)"""
+  return [index for table in TABLES for index in sorted(table.indexes, key=lambda i: i.name)]
+
+
+def export_index_ddl(dialect: str = "mysql", drop: bool = False) -> str:
+  """인덱스 생성(drop=True면 삭제) DDL 문자열
+
+  Args:
+      dialect: SQLAlchemy dialect 이름 (mysql, sqlite, postgresql ...)
+      drop: 롤백용 DROP INDEX 문 출력
+  """
+  sql_dialect = registry.load(dialect)()
+  ddl = DropIndex if drop else CreateIndex
+  return "\n".join(f"{str(ddl(index).compile(dialect=sql_dialect)).strip()};" for index in model_indexes())
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="모델 인덱스 DDL 출력")
+  parser.add_argument("--dialect", default="mysql")
+  parser.add_argument("--drop", action="store_true", help="롤백용 DROP INDEX 출력")
+  args = parser.parse_args()
+  print(export_index_ddl(args.dialect, args.drop))
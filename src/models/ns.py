@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlalchemy import String, Integer, BigInteger, Text, LargeBinary, CHAR, VARCHAR
+from sqlalchemy import String, Integer, BigInteger, Text, LargeBinary, CHAR, VARCHAR, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -9,6 +9,10 @@ class Base(DeclarativeBase):
 
 class Ns(Base):
   __tablename__ = "ns"
+  __table_args__ = (
+      # 입원 기간 조회 (saup/chart/ibymd + 유효 행, 기록 순서 정렬)
+      Index("ix_ns_chart_window", "ns_saup", "ns_chart", "ns_ibymd", "ns_dc", "ns_ymd", "ns_time"),
+  )
 
   auto: Mapped[int] = mapped_column(
       "ns_auto", BigInteger, primary_key=True, autoincrement=True)
@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlalchemy import String, Integer, BigInteger, Text, LargeBinary, CHAR, VARCHAR
+from sqlalchemy import String, Integer, BigInteger, Text, LargeBinary, CHAR, VARCHAR, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -9,6 +9,10 @@ class Base(DeclarativeBase):
 
 class ProgressNote(Base):
   __tablename__ = "progressnote"
+  __table_args__ = (
+      # 입원 기간 조회 (saup/chart/ibymd + 유효 행, 기록 순서 정렬)
+      Index("ix_progressnote_chart_window", "prog_saup", "prog_chart", "prog_ibymd", "prog_dc", "prog_ymd", "prog_time"),
+  )
 
   auto: Mapped[int] = mapped_column(
       "prog_auto", BigInteger, primary_key=True, autoincrement=True)
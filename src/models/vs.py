@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlalchemy import String, Integer, BigInteger, Text, LargeBinary, CHAR, VARCHAR
+from sqlalchemy import String, Integer, BigInteger, Text, LargeBinary, CHAR, VARCHAR, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 class Base(DeclarativeBase):
@@ -7,6 +7,10 @@ class Base(DeclarativeBase):
 
 class Vs(Base):
     __tablename__ = "vs"
+    __table_args__ = (
+        # 입원 기간 조회 (saup/chart/ibymd + 유효 행, 기록 순서 정렬)
+        Index("ix_vs_chart_window", "vs_saup", "vs_chart", "vs_ibymd", "vs_dc", "vs_ymd", "vs_time"),
+    )
 
     auto: Mapped[int] = mapped_column("vs_auto", BigInteger, primary_key=True, autoincrement=True)
     saup: Mapped[str] = mapped_column("vs_saup", VARCHAR(2), nullable=False)
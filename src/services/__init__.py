@@ -0,0 +1 @@
+from .emr_service import ChartData, ChartRefresh, EmrService, close_emr_service, get_emr_service, resolve_chart
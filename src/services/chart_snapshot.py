@@ -0,0 +1,157 @@
+"""입원 단위 차트 스냅샷 (증분 갱신용)
+
+테이블별로 변환된 행과 지금까지 본 최대 auto / 최대 변경 시각(update, dcdate)을 보관합니다.
+다시 조회할 때는 이 워터마크 이후에 추가/수정/삭제된 행만 가져와 반영하므로,
+장기 입원 환자도 새로 생긴 데이터만큼만 비용이 듭니다.
+"""
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+from src.core import settings
+from src.sio.features.medical.dto import ChartRef
+
+
+@dataclass
+class TableSnapshot:
+  """테이블 1개의 유효 행(auto -> 변환된 요청 행)과 워터마크"""
+  rows: dict[int, dict[str, Any]] = field(default_factory=dict)
+  max_auto: int = 0
+  # update/dcdate 중 지금까지 본 가장 늦은 값 (문자열 비교)
+  max_changed: str = ""
+
+  def apply(self, auto: int, dc: str, changed: str, record: dict[str, Any]) -> None:
+    """조회된 행 반영 (삭제 행은 제거)"""
+    if dc == "0":
+      self.rows[auto] = record
+    else:
+      self.rows.pop(auto, None)
+    self.max_auto = max(self.max_auto, auto)
+    self.max_changed = max(self.max_changed, changed)
+
+  def records(self) -> list[dict[str, Any]]:
+    """기록 일시 순 행 목록"""
+    return [
+        record for _, record in
+        sorted(self.rows.items(), key=lambda item: (item[1]["ymd"], item[1]["time"], item[0]))]
+
+
+@dataclass
+class ChartSnapshot:
+  ref: ChartRef
+  tables: dict[str, TableSnapshot] = field(default_factory=dict)
+
+  def table(self, key: str) -> TableSnapshot:
+    return self.tables.setdefault(key, TableSnapshot())
+
+  def to_json(self) -> str:
+    return json.dumps({
+        "ref": self.ref,
+        "tables": {
+            key: {**asdict(table), "rows": list(table.rows.items())}
+            for key, table in self.tables.items()},
+    }, ensure_ascii=False)
+
+  @classmethod
+  def from_json(cls, raw: str) -> "ChartSnapshot":
+    payload = json.loads(raw)
+    tables = {
+        key: TableSnapshot(rows=dict(table["rows"]), max_auto=table["max_auto"], max_changed=table["max_changed"])
+        for key, table in payload["tables"].items()}
+    return cls(ref=payload["ref"], tables=tables)
+
+
+def snapshot_key(ref: ChartRef) -> str:
+  return f'{ref["saup"]}:{ref["chart"]}:{ref["ibymd"]}'
+
+
+class ChartSnapshotStore(ABC):
+  """차트 스냅샷 보관소"""
+
+  @abstractmethod
+  async def get(self, ref: ChartRef) -> Optional[ChartSnapshot]:
+    """스냅샷 조회"""
+
+  @abstractmethod
+  async def save(self, snapshot: ChartSnapshot) -> None:
+    """스냅샷 저장"""
+
+  async def close(self) -> None:
+    """리소스 정리"""
+
+
+class LocalChartSnapshotStore(ChartSnapshotStore):
+  """프로세스 메모리 보관소 (최근 사용 차트 max_charts개 유지)"""
+
+  def __init__(self, max_charts: int) -> None:
+    self.max_charts = max_charts
+    self._snapshots: OrderedDict[str, ChartSnapshot] = OrderedDict()
+
+  async def get(self, ref: ChartRef) -> Optional[ChartSnapshot]:
+    key = snapshot_key(ref)
+    snapshot = self._snapshots.get(key)
+    if snapshot:
+      self._snapshots.move_to_end(key)
+    return snapshot
+
+  async def save(self, snapshot: ChartSnapshot) -> None:
+    key = snapshot_key(snapshot.ref)
+    self._snapshots[key] = snapshot
+    self._snapshots.move_to_end(key)
+    while len(self._snapshots) > self.max_charts:
+      self._snapshots.popitem(last=False)
+
+
+class SqliteChartSnapshotStore(ChartSnapshotStore):
+  """로컬 SQLite 보관소 (프로세스 재시작 후에도 워터마크 유지)"""
+
+  def __init__(self, path: str) -> None:
+    try:
+      import aiosqlite
+    except ImportError as e:
+      raise RuntimeError("CHART_SNAPSHOT_STORE=sqlite 사용 시 aiosqlite 패키지가 필요합니다") from e
+
+    self._aiosqlite = aiosqlite
+    self.path = path
+    self._db = None
+    self._lock = asyncio.Lock()
+
+  async def _connection(self):
+    async with self._lock:
+      if self._db is None:
+        self._db = await self._aiosqlite.connect(self.path)
+        await self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chart_snapshot (chart_key TEXT PRIMARY KEY, payload TEXT NOT NULL)")
+        await self._db.commit()
+      return self._db
+
+  async def get(self, ref: ChartRef) -> Optional[ChartSnapshot]:
+    db = await self._connection()
+    async with db.execute("SELECT payload FROM chart_snapshot WHERE chart_key = ?", (snapshot_key(ref),)) as cursor:
+      row = await cursor.fetchone()
+    return ChartSnapshot.from_json(row[0]) if row else None
+
+  async def save(self, snapshot: ChartSnapshot) -> None:
+    db = await self._connection()
+    await db.execute(
+        "INSERT OR REPLACE INTO chart_snapshot (chart_key, payload) VALUES (?, ?)",
+        (snapshot_key(snapshot.ref), snapshot.to_json()))
+    await db.commit()
+
+  async def close(self) -> None:
+    if self._db is not None:
+      await self._db.close()
+      self._db = None
+
+
+def create_chart_snapshot_store() -> ChartSnapshotStore:
+  """settings.CHART_SNAPSHOT_STORE에 맞는 보관소 생성"""
+  kind = settings.CHART_SNAPSHOT_STORE
+  if kind == "memory":
+    return LocalChartSnapshotStore(settings.CHART_SNAPSHOT_MAX_CHARTS)
+  if kind == "sqlite":
+    return SqliteChartSnapshotStore(settings.CHART_SNAPSHOT_PATH)
+  raise ValueError(f"지원하지 않는 CHART_SNAPSHOT_STORE: {kind}")
@@ -0,0 +1,243 @@
+"""EMR 데이터베이스 조회 서비스
+
+saup/chart/ibymd(입원일)로 한 입원 기간의 바이탈, 간호기록, 경과기록을 테이블별 1회 조회로 읽어
+요약 요청 형식(VitalSign/NursingRecord/ProgressNote)으로 변환합니다.
+필요한 컬럼만 조회하고, 삭제(dc != '0') 행은 SQL에서 제외하며, 결과는 묶음 단위로 스트리밍합니다.
+클라이언트가 차트 전체를 소켓으로 올리는 대신 chartRef만 보내면 서버가 직접 채웁니다.
+차트 스냅샷 보관소가 있으면 두 번째 조회부터는 워터마크 이후 변경분만 읽습니다.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Optional, TypedDict
+
+from loguru import logger
+from sqlalchemy import Row, Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import settings
+from src.models.ns import Ns
+from src.models.progressnote import ProgressNote as ProgressNoteModel
+from src.models.vs import Vs
+from src.services.chart_snapshot import ChartSnapshot, ChartSnapshotStore, TableSnapshot, create_chart_snapshot_store
+from src.sio.features.medical.dto import ChartRef, LoadingCompleteTarget, NursingRecord, ProgressNote, VitalSign
+from src.sio.features.medical.progress import affected_targets
+
+
+type SessionFactory = Callable[[], AsyncSession]
+
+
+class ChartData(TypedDict):
+  vitalSigns: list[VitalSign]
+  nursingRecords: list[NursingRecord]
+  progressNotes: list[ProgressNote]
+
+
+# 요약에 필요한 컬럼만 조회 (서명 LargeBinary, 인증서 Text, RTF 컬럼은 읽지 않음)
+VS_COLUMNS = (Vs.ymd, Vs.time, Vs.hulap1, Vs.hulap2, Vs.maekbak, Vs.weight, Vs.cheon, Vs.hohup, Vs.spo2)
+NS_COLUMNS = (Ns.ymd, Ns.time, Ns.neyong1, Ns.neyong2)
+PROGRESS_NOTE_COLUMNS = (
+    ProgressNoteModel.ymd, ProgressNoteModel.time, ProgressNoteModel.progress, ProgressNoteModel.soapuse,
+    ProgressNoteModel.s, ProgressNoteModel.o, ProgressNoteModel.a, ProgressNoteModel.p)
+
+
+def chart_query(model: Any, ref: ChartRef, columns: tuple[Any, ...]) -> Select:
+  """입원 기간 + 유효(dc='0') 행을 기록 순서대로 조회하는 쿼리"""
+  order_by = [model.ymd, model.time, model.dup] if hasattr(model, "dup") else [model.ymd, model.time]
+  return (
+      select(*columns)
+      .where(
+          model.saup == ref["saup"],
+          model.chart == ref["chart"],
+          model.ibymd == ref["ibymd"],
+          model.dc == "0")
+      .order_by(*order_by, model.auto)
+  )
+
+
+def to_vital_sign(row: Row) -> VitalSign:
+  return VitalSign(
+      ymd=row.ymd,
+      time=row.time,
+      highPressure=row.hulap1 or "",
+      lowPressure=row.hulap2 or "",
+      pulse=row.maekbak or "",
+      weight=row.weight or "",
+      temperature=row.cheon or "",
+      respiration=row.hohup or "",
+      spo2=row.spo2 or "",
+  )
+
+
+def to_nursing_record(row: Row) -> NursingRecord:
+  return NursingRecord(
+      ymd=row.ymd,
+      time=row.time,
+      nursingDiagnosis=row.neyong1 or "",
+      nursingIntervention=row.neyong2 or "",
+  )
+
+
+def to_progress_note(row: Row) -> ProgressNote:
+  # SOAP 형식으로 작성된 기록은 본문 대신 S/O/A/P 항목을 이어 붙임
+  progress = row.progress or ""
+  if row.soapuse == "1":
+    soap = [(label, text) for label, text in (("S", row.s), ("O", row.o), ("A", row.a), ("P", row.p)) if text]
+    progress = "\n".join(f"{label}: {text}" for label, text in soap) or progress
+  return ProgressNote(ymd=row.ymd, time=row.time or "", progress=progress)
+
+
+def changes_query(model: Any, ref: ChartRef, columns: tuple[Any, ...], table: TableSnapshot) -> Select:
+  """워터마크 이후 추가(auto)/수정(update)/삭제(dcdate)된 행 조회 (삭제 행도 반영해야 하므로 dc 필터 없음)"""
+  return (
+      select(*columns, model.auto, model.dc, model.update, model.dcdate)
+      .where(
+          model.saup == ref["saup"],
+          model.chart == ref["chart"],
+          model.ibymd == ref["ibymd"],
+          or_(model.auto > table.max_auto, model.update > table.max_changed, model.dcdate > table.max_changed))
+  )
+
+
+# 요청 항목별 (모델, 조회 컬럼, 변환 함수)
+CHART_TABLES: dict[str, tuple[Any, tuple[Any, ...], Callable[[Row], Any]]] = {
+    "vitalSigns": (Vs, VS_COLUMNS, to_vital_sign),
+    "nursingRecords": (Ns, NS_COLUMNS, to_nursing_record),
+    "progressNotes": (ProgressNoteModel, PROGRESS_NOTE_COLUMNS, to_progress_note),
+}
+
+
+@dataclass
+class ChartRefresh:
+  """스냅샷 갱신 결과"""
+  data: ChartData
+  # 추가/수정/삭제된 행이 있는 요청 항목과 그 항목을 입력으로 쓰는 그래프 노드
+  changed_keys: set[str]
+  changed_sections: set[LoadingCompleteTarget]
+  # 이번 갱신에서 DB에서 읽은 행 수
+  fetched_rows: int
+  # 스냅샷이 없어 전체 조회했는지 여부
+  full: bool
+
+
+class EmrService:
+  """입원 단위 차트 데이터 조회"""
+
+  def __init__(
+      self,
+      session_factory: SessionFactory,
+      batch_size: int = 1000,
+      snapshots: Optional[ChartSnapshotStore] = None,
+  ) -> None:
+    self.session_factory = session_factory
+    self.batch_size = batch_size
+    self.snapshots = snapshots
+
+  async def load_chart(self, ref: ChartRef) -> ChartData:
+    """입원 기간의 바이탈/간호기록/경과기록 조회 (테이블별 세션으로 동시 조회)
+
+    Args:
+        ref: 기관(saup) + 차트번호(chart) + 입원일(ibymd)
+    """
+    vss, nss, notes = await asyncio.gather(
+        self._collect(self.stream_vital_signs(ref)),
+        self._collect(self.stream_nursing_records(ref)),
+        self._collect(self.stream_progress_notes(ref)),
+    )
+    return ChartData(vitalSigns=vss, nursingRecords=nss, progressNotes=notes)
+
+  def stream_vital_signs(self, ref: ChartRef) -> AsyncIterator[list[VitalSign]]:
+    return self._stream(chart_query(Vs, ref, VS_COLUMNS), to_vital_sign)
+
+  def stream_nursing_records(self, ref: ChartRef) -> AsyncIterator[list[NursingRecord]]:
+    return self._stream(chart_query(Ns, ref, NS_COLUMNS), to_nursing_record)
+
+  def stream_progress_notes(self, ref: ChartRef) -> AsyncIterator[list[ProgressNote]]:
+    return self._stream(chart_query(ProgressNoteModel, ref, PROGRESS_NOTE_COLUMNS), to_progress_note)
+
+  async def _stream[T](self, stmt: Select, convert: Callable[[Row], T]) -> AsyncIterator[list[T]]:
+    """서버 측 커서로 batch_size 행씩 읽어 변환한 묶음을 차례로 반환 (장기 입원도 메모리 일정)"""
+    async with self.session_factory() as session:
+      result = await session.stream(stmt.execution_options(yield_per=self.batch_size))
+      async for partition in result.partitions():
+        yield [convert(row) for row in partition]
+
+  @staticmethod
+  async def _collect[T](batches: AsyncIterator[list[T]]) -> list[T]:
+    rows: list[T] = []
+    async for batch in batches:
+      rows.extend(batch)
+    return rows
+
+  async def refresh(self, ref: ChartRef) -> ChartRefresh:
+    """스냅샷 워터마크 이후 변경분만 조회해 반영한 차트 데이터 (스냅샷 보관소가 없으면 전체 조회)"""
+    if self.snapshots is None:
+      chart = await self.load_chart(ref)
+      return ChartRefresh(
+          data=chart, changed_keys=set(chart), changed_sections=affected_targets(set(chart)),
+          fetched_rows=sum(len(rows) for rows in chart.values()), full=True)
+
+    snapshot = await self.snapshots.get(ref)
+    full = snapshot is None
+    snapshot = snapshot or ChartSnapshot(ref=ref)
+    fetched = await asyncio.gather(*(
+        self._refresh_table(ref, key, snapshot.table(key), full) for key in CHART_TABLES))
+    await self.snapshots.save(snapshot)
+
+    changed_keys = {key for key, count in zip(CHART_TABLES, fetched) if count}
+    refresh = ChartRefresh(
+        data=ChartData(**{key: snapshot.table(key).records() for key in CHART_TABLES}),
+        changed_keys=changed_keys,
+        changed_sections=affected_targets(changed_keys),
+        fetched_rows=sum(fetched),
+        full=full)
+    logger.debug(
+        f"[emr] 차트 갱신 - chart: {ref['chart']}, 전체 조회: {full}, 조회 행: {refresh.fetched_rows}, "
+        f"변경 항목: {sorted(changed_keys)}")
+    return refresh
+
+  async def _refresh_table(self, ref: ChartRef, key: str, table: TableSnapshot, full: bool) -> int:
+    """테이블 변경분을 스냅샷에 반영하고 읽은 행 수 반환"""
+    model, columns, convert = CHART_TABLES[key]
+    stmt = (
+        chart_query(model, ref, (*columns, model.auto, model.dc, model.update, model.dcdate)) if full
+        else changes_query(model, ref, columns, table))
+    count = 0
+    async for batch in self._stream(stmt, lambda row: row):
+      for row in batch:
+        table.apply(row.auto, row.dc, max(row.update or "", row.dcdate or ""), convert(row))
+      count += len(batch)
+    return count
+
+  async def resolve(self, data: dict[str, Any]) -> dict[str, Any]:
+    """요청에 chartRef가 있으면 비어 있는 바이탈/간호기록/경과기록을 DB에서 채운 요청 반환"""
+    ref: Optional[ChartRef] = data.get("chartRef")
+    if not ref:
+      return data
+    chart = (await self.refresh(ref)).data
+    return {**data, **{key: value for key, value in chart.items() if not data.get(key)}}
+
+
+_emr_service: Optional[EmrService] = None
+
+
+def get_emr_service() -> EmrService:
+  """DATABASE_URL 엔진을 사용하는 기본 서비스 (엔진은 첫 사용 시 생성)"""
+  global _emr_service
+  if _emr_service is None:
+    from src.core.db import async_session
+    _emr_service = EmrService(
+        async_session, batch_size=settings.EMR_FETCH_BATCH_SIZE, snapshots=create_chart_snapshot_store())
+  return _emr_service
+
+
+async def resolve_chart(data: dict[str, Any]) -> dict[str, Any]:
+  """chartRef가 있는 요청만 기본 서비스로 차트 데이터를 채움 (chartRef가 없으면 DB 엔진을 만들지 않음)"""
+  if not data.get("chartRef"):
+    return data
+  return await get_emr_service().resolve(data)
+
+
+async def close_emr_service() -> None:
+  """기본 서비스의 스냅샷 보관소 정리"""
+  if _emr_service is not None and _emr_service.snapshots is not None:
+    await _emr_service.snapshots.close()
@@ -1,7 +1,10 @@
 """Socket.IO 네임스페이스 기본 클래스"""
+import asyncio
 from typing import Optional, Any
 from abc import ABC, abstractmethod
+from loguru import logger
 from src.sio.config import sio
+from src.sio.presence import is_http_stream_sid, room_presence
 
 
 class BaseNamespace(ABC):
@@ -40,10 +43,38 @@ class BaseNamespace(ABC):
   async def enter_room(self, sid: str, room: str) -> None:
     """클라이언트를 룸에 추가"""
     await sio.enter_room(sid, room, namespace=self.namespace)
+    await room_presence.add(self.namespace, room, sid)
 
   async def leave_room(self, sid: str, room: str) -> None:
     """클라이언트를 룸에서 제거"""
     await sio.leave_room(sid, room, namespace=self.namespace)
+    await room_presence.remove(self.namespace, room, sid)
+
+  async def forget_client(self, sid: str) -> list[str]:
+    """연결 해제된 클라이언트를 참여 중이던 모든 room의 presence에서 제거
+
+    Returns:
+        클라이언트가 참여하고 있던 room 목록
+    """
+    rooms = self.rooms_of(sid)
+    for room in rooms:
+      await room_presence.remove(self.namespace, room, sid)
+    return rooms
+
+  def rooms_of(self, sid: str) -> list[str]:
+    """클라이언트가 참여한 room 목록 (자기 sid room 제외)"""
+    return [room for room in sio.rooms(sid, namespace=self.namespace) if room != sid]
+
+  def participants(self, room: str) -> list[str]:
+    """room 참여자 sid 목록 (이 프로세스에 연결된 클라이언트 기준)"""
+    try:
+      return [sid for sid, _ in sio.manager.get_participants(self.namespace, room)]
+    except KeyError:
+      return []
+
+  async def has_participants(self, room: str, exclude_sid: Optional[str] = None) -> bool:
+    """room에 exclude_sid 외의 참여자가 있는지 확인 (presence 기준, 모든 노드 포함)"""
+    return await room_presence.count(self.namespace, room, exclude_sid=exclude_sid) > 0
 
   # ========== 개별 클라이언트 메서드 ==========
 
@@ -80,4 +111,66 @@ class BaseNamespace(ABC):
       return response
     except Exception as e:
       print(f"[{self.namespace}] emit_with_ack 오류 - event: {event}, to: {to}, error: {e}")
-      raise
\ No newline at end of file
+      raise
+
+  # ========== Room 단위 acknowledgment 메서드 ==========
+
+  async def send_with_acks(
+      self,
+      event: str,
+      data: Any,
+      room: str
+  ) -> dict[str, asyncio.Future]:
+    """room의 모든 클라이언트에게 개별 전송하고 sid별 ack Future 반환
+
+    sid별 전송을 동시에 시작하고 모두 전송되면 바로 반환하므로, 호출자는 ack를 기다리지 않고
+    다음 작업을 진행할 수 있습니다.
+    """
+    loop = asyncio.get_running_loop()
+    futures: dict[str, asyncio.Future] = {}
+
+    def make_callback(future: asyncio.Future):
+      def callback(*args):
+        if not future.done():
+          future.set_result(args[0] if len(args) == 1 else (args or None))
+      return callback
+
+    sends = []
+    for sid in await room_presence.members(self.namespace, room):
+      if is_http_stream_sid(sid):
+        continue
+      future = loop.create_future()
+      futures[sid] = future
+      sends.append(sio.emit(event, data, to=sid, namespace=self.namespace, callback=make_callback(future)))
+    await asyncio.gather(*sends)
+    return futures
+
+  async def collect_acks(
+      self,
+      futures: dict[str, asyncio.Future],
+      timeout: float = 10
+  ) -> dict[str, Any]:
+    """sid별 ack를 개별 타임아웃으로 병렬 수집 (미응답 sid는 None)"""
+    async def wait_one(sid: str, future: asyncio.Future) -> tuple[str, Any]:
+      try:
+        return sid, await asyncio.wait_for(future, timeout)
+      except asyncio.TimeoutError:
+        logger.warning(f"[{self.namespace}] ack 타임아웃 - sid: {sid}")
+        return sid, None
+
+    results = await asyncio.gather(*(wait_one(sid, f) for sid, f in futures.items()))
+    return dict(results)
+
+  async def emit_with_ack_room(
+      self,
+      event: str,
+      data: Any,
+      room: str,
+      timeout: float = 10
+  ) -> dict[str, Any]:
+    """room의 모든 클라이언트에게 병렬 전송 후 {sid: response} 수집
+
+    sio.call은 단일 클라이언트만 지원하므로 room 전송 시 이 메서드를 사용합니다.
+    """
+    futures = await self.send_with_acks(event, data, room)
+    return await self.collect_acks(futures, timeout)
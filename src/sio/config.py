@@ -1,10 +1,39 @@
 """Socket.IO 설정 및 초기화"""
+from typing import Any, Optional
+
 from fastapi import FastAPI
-from socketio import ASGIApp, AsyncServer
+from socketio import AsyncManager, AsyncRedisManager, ASGIApp, AsyncServer
 
 from src.core import config
 
-# mgr = AsyncRedisManager('redis://localhost:6379/0')
+
+def create_client_manager(write_only: bool = False, redis_options: Optional[dict[str, Any]] = None) -> AsyncManager:
+  """settings.SIO_CLIENT_MANAGER에 맞는 client manager 생성.
+
+  redis 매니저를 사용하면 room/emit이 pub/sub 채널을 통해 모든 노드(프로세스, 파드)로
+  전달되므로, 같은 환자 room에 참여한 클라이언트가 서로 다른 replica에 붙어 있어도
+  동일한 이벤트를 받습니다.
+
+  Args:
+      write_only: 연결을 받지 않고 emit만 하는 외부 프로세스(워커 등)용 여부
+      redis_options: redis 매니저의 Redis.from_url() 추가 인자 (테스트용 대체 서버 연결 등)
+
+  Returns:
+      Socket.IO client manager
+  """
+  kind = config.settings.SIO_CLIENT_MANAGER
+  if kind == "memory":
+    return AsyncManager()
+  if kind == "redis":
+    return AsyncRedisManager(
+        config.settings.REDIS_URL,
+        channel=config.settings.SIO_CHANNEL,
+        write_only=write_only,
+        redis_options=redis_options,
+    )
+  raise ValueError(f"지원하지 않는 SIO_CLIENT_MANAGER: {kind}")
+
+
 sio = AsyncServer(
     async_mode="asgi",
     cors_allowed_origins=[
@@ -17,7 +46,7 @@ sio = AsyncServer(
     logger=config.settings.debug,
     ping_timeout=60,
     ping_interval=25,
-    # client_manager=mgr,  # Redis 매니저 사용 시 주석 해제
+    client_manager=create_client_manager(),
 )
 
 
@@ -0,0 +1,136 @@
+"""Socket.IO room 전송 인터페이스"""
+import asyncio
+from typing import Any, Optional, Protocol
+
+from socketio import AsyncManager
+
+from src.sio.config import create_client_manager
+
+
+class RoomEmitter(Protocol):
+  """room 단위 이벤트 전송 인터페이스
+
+  BaseNamespace(웹 프로세스)와 ManagerEmitter(워커 프로세스)가 모두 만족합니다.
+  """
+
+  namespace: str
+
+  async def emit(
+      self,
+      event: str,
+      data: Any,
+      room: Optional[str] = None,
+      skip_sid: Optional[str] = None
+  ) -> None:
+    ...
+
+  async def emit_with_ack(
+      self,
+      event: str,
+      data: Any,
+      to: str,
+      timeout: int = 10
+  ) -> Any:
+    ...
+
+  async def send_with_acks(
+      self,
+      event: str,
+      data: Any,
+      room: str
+  ) -> dict[str, asyncio.Future]:
+    ...
+
+  async def collect_acks(
+      self,
+      futures: dict[str, asyncio.Future],
+      timeout: float = 10
+  ) -> dict[str, Any]:
+    ...
+
+
+class NullEmitter:
+  """아무것도 전송하지 않는 RoomEmitter (사전 계산처럼 결과를 보관소에만 남기는 작업용)"""
+
+  def __init__(self, namespace: str) -> None:
+    self.namespace = namespace
+
+  async def emit(
+      self,
+      event: str,
+      data: Any,
+      room: Optional[str] = None,
+      skip_sid: Optional[str] = None
+  ) -> None:
+    return None
+
+  async def emit_with_ack(
+      self,
+      event: str,
+      data: Any,
+      to: str,
+      timeout: int = 10
+  ) -> Any:
+    return None
+
+  async def send_with_acks(
+      self,
+      event: str,
+      data: Any,
+      room: str
+  ) -> dict[str, asyncio.Future]:
+    return {}
+
+  async def collect_acks(
+      self,
+      futures: dict[str, asyncio.Future],
+      timeout: float = 10
+  ) -> dict[str, Any]:
+    return {}
+
+
+class ManagerEmitter:
+  """Socket.IO 서버가 없는 프로세스에서 client manager로 room에 전송
+
+  write-only 매니저는 ack를 받을 수 없으므로 ack 관련 메서드는 일반 emit 후 빈 응답을 반환합니다.
+  """
+
+  def __init__(self, namespace: str, manager: Optional[AsyncManager] = None):
+    self.namespace = namespace
+    self.manager = manager or create_client_manager(write_only=True)
+
+  async def emit(
+      self,
+      event: str,
+      data: Any,
+      room: Optional[str] = None,
+      skip_sid: Optional[str] = None
+  ) -> None:
+    await self.manager.emit(
+        event, data, namespace=self.namespace, room=room, skip_sid=skip_sid)
+
+  async def emit_with_ack(
+      self,
+      event: str,
+      data: Any,
+      to: str,
+      timeout: int = 10
+  ) -> Any:
+    await self.emit(event, data, room=to)
+    return None
+
+  async def send_with_acks(
+      self,
+      event: str,
+      data: Any,
+      room: str
+  ) -> dict[str, asyncio.Future]:
+    await self.emit(event, data, room=room)
+    return {}
+
+  async def collect_acks(
+      self,
+      futures: dict[str, asyncio.Future],
+      timeout: float = 10
+  ) -> dict[str, Any]:
+    return {}
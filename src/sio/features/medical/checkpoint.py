@@ -0,0 +1,94 @@
+"""medical_graph 체크포인터 설정
+
+체크포인트에는 요약 입력(환자 정보, PHI)이 그대로 들어갑니다. 보관 정책:
+
+- 실행이 정상 완료되면 해당 스레드를 즉시 삭제합니다 (summary.run_patient_summary).
+- 취소/실패/프로세스 종료로 중단된 스레드는 같은 입력의 재시도가 이어받을 수 있도록
+  settings.GRAPH_CHECKPOINT_RETENTION_SECONDS 동안만 남기고, 주기적으로 마지막 체크포인트가
+  보관 기간을 넘은 스레드를 삭제합니다 (체크포인터를 여는 시점에도 1회 정리).
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from loguru import logger
+from src.core import settings
+
+# 보관 기간이 지난 스레드 정리 주기(초)
+_PRUNE_INTERVAL_SECONDS = 300
+
+
+@asynccontextmanager
+async def open_checkpointer() -> AsyncIterator[Optional[BaseCheckpointSaver]]:
+  """settings.GRAPH_CHECKPOINTER에 맞는 체크포인터를 열고 종료 시 정리
+
+  - none: 체크포인트 없음 (기존 동작)
+  - memory: 프로세스 메모리 (재시도는 같은 프로세스에서만 재개)
+  - sqlite: 로컬 SQLite 파일 (프로세스 재시작 후에도 재개)
+  """
+  kind = settings.GRAPH_CHECKPOINTER
+  if kind == "none":
+    yield None
+  elif kind == "memory":
+    async with _pruning(InMemorySaver()) as saver:
+      yield saver
+  elif kind == "sqlite":
+    try:
+      from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as e:
+      raise RuntimeError(
+          "GRAPH_CHECKPOINTER=sqlite 사용 시 langgraph-checkpoint-sqlite 패키지가 필요합니다") from e
+
+    async with AsyncSqliteSaver.from_conn_string(settings.GRAPH_CHECKPOINT_PATH) as saver:
+      await saver.setup()
+      logger.info(
+          f"[checkpoint] SQLite 체크포인터 사용: {settings.GRAPH_CHECKPOINT_PATH}, "
+          f"보관 기간: {settings.GRAPH_CHECKPOINT_RETENTION_SECONDS}초")
+      async with _pruning(saver):
+        yield saver
+  else:
+    raise ValueError(f"지원하지 않는 GRAPH_CHECKPOINTER: {kind}")
+
+
+async def prune_checkpoints(saver: BaseCheckpointSaver, retention_seconds: int) -> int:
+  """마지막 체크포인트가 보관 기간을 넘은 스레드 삭제
+
+  Returns:
+      삭제한 스레드 수
+  """
+  cutoff = datetime.now(timezone.utc) - timedelta(seconds=retention_seconds)
+  latest: dict[str, datetime] = {}
+  async for item in saver.alist(None):
+    thread_id = item.config["configurable"]["thread_id"]
+    created_at = datetime.fromisoformat(item.checkpoint["ts"])
+    if thread_id not in latest or created_at > latest[thread_id]:
+      latest[thread_id] = created_at
+
+  expired = [thread_id for thread_id, created_at in latest.items() if created_at < cutoff]
+  for thread_id in expired:
+    await saver.adelete_thread(thread_id)
+  if expired:
+    logger.info(f"[checkpoint] 보관 기간이 지난 스레드 삭제: {len(expired)}건")
+  return len(expired)
+
+
+@asynccontextmanager
+async def _pruning(saver: BaseCheckpointSaver) -> AsyncIterator[BaseCheckpointSaver]:
+  """체크포인터를 사용하는 동안 보관 기간이 지난 스레드를 주기적으로 삭제"""
+  async def prune_periodically() -> None:
+    while True:
+      try:
+        await prune_checkpoints(saver, settings.GRAPH_CHECKPOINT_RETENTION_SECONDS)
+      except Exception as e:
+        logger.warning(f"[checkpoint] 스레드 정리 실패: {e}")
+      await asyncio.sleep(_PRUNE_INTERVAL_SECONDS)
+
+  task = asyncio.create_task(prune_periodically(), name="checkpoint-prune")
+  try:
+    yield saver
+  finally:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
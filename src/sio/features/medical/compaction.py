@@ -0,0 +1,95 @@
+"""반복 기록 run-length 압축
+
+장기 입원 환자는 같은 간호 문제/처치가 근무조마다, 같은 진단(ICD)이 매일 반복됩니다.
+연속으로 같은 항목을 하나로 합치고 기간과 횟수(`2024-03-01~03-14 (42회)`)로 표시하여
+프롬프트와 메모리 사용량을 줄입니다. 기록을 한 번만 훑습니다.
+"""
+from dataclasses import dataclass
+from typing import Callable, Hashable, Iterable, Sequence
+
+from src.sio.features.medical.dto import DiagnosisRecord
+from src.utils.format_util import ymd_to_date
+
+
+def period_label(start: str, end: str, count: int) -> str:
+  """기간/횟수 표시 (같은 해는 끝 날짜의 연도 생략)
+
+  예: 2024-03-01~03-14 (42회), 2024-03-01 (3회)
+  """
+  label = ymd_to_date(start)
+  if end != start:
+    end_date = ymd_to_date(end)
+    label += "~" + (end_date[5:] if end[:4] == start[:4] else end_date)
+  return f"{label} ({count}회)"
+
+
+@dataclass
+class Run[T]:
+  """연속으로 같은 항목 묶음"""
+  first: T
+  start: str
+  end: str
+  count: int = 1
+
+
+def run_length[T](items: Iterable[T], key: Callable[[T], Hashable], ymd: Callable[[T], str]) -> list[Run[T]]:
+  """연속으로 key가 같은 항목을 하나로 합침 (items는 시간순)"""
+  runs: list[Run[T]] = []
+  last_key = None
+  for item in items:
+    item_key = key(item)
+    if runs and item_key == last_key:
+      runs[-1].end = ymd(item)
+      runs[-1].count += 1
+    else:
+      runs.append(Run(first=item, start=ymd(item), end=ymd(item)))
+      last_key = item_key
+  return runs
+
+
+@dataclass
+class DiagnosisRun:
+  """연속된 진단 기록 일자에 계속 포함된 진단"""
+  icd_code: str
+  diagnosis_name: str
+  start: str
+  end: str
+  # 포함된 진단 기록(일자) 수
+  count: int = 1
+
+  @property
+  def period(self) -> str:
+    return self.start if self.count == 1 else period_label(self.start, self.end, self.count)
+
+
+def compact_diagnoses(records: Sequence[DiagnosisRecord]) -> list[DiagnosisRun]:
+  """진단 기록을 진단(ICD 코드)별 연속 구간으로 압축 (시작 일자 순)
+
+  진단 기록 일자를 순서대로 보며, 바로 앞 기록에도 있던 진단은 기존 구간을 늘리고
+  빠졌다가 다시 나온 진단은 새 구간을 시작합니다.
+  """
+  runs: list[DiagnosisRun] = []
+  # 진단 키 -> (진행 중인 구간, 마지막으로 포함된 기록 순번)
+  open_runs: dict[tuple[str, str], tuple[DiagnosisRun, int]] = {}
+  for index, record in enumerate(sorted(records, key=lambda r: r['ymd'])):
+    for diagnosis in record.get('diagnoses', []):
+      key = (diagnosis.get('icdCode', ''), diagnosis.get('diagnosisName', ''))
+      current = open_runs.get(key)
+      if current and current[1] in (index - 1, index):
+        run = current[0]
+        if current[1] != index:
+          run.end = record['ymd']
+          run.count += 1
+      else:
+        run = DiagnosisRun(icd_code=key[0], diagnosis_name=key[1], start=record['ymd'], end=record['ymd'])
+        runs.append(run)
+      open_runs[key] = (run, index)
+  return runs
+
+
+def group_by_period(runs: Sequence[DiagnosisRun]) -> list[tuple[DiagnosisRun, list[DiagnosisRun]]]:
+  """기간이 같은 진단 구간끼리 묶음 ((대표 구간, 같은 기간의 구간들), 처음 나온 순서)"""
+  groups: dict[tuple[str, str, int], list[DiagnosisRun]] = {}
+  for run in runs:
+    groups.setdefault((run.start, run.end, run.count), []).append(run)
+  return [(group[0], group) for group in groups.values()]
@@ -1,9 +1,9 @@
-from typing import Literal
+from typing import Any, Literal
 
 from src.common import CamelModel
 
 
-type LoadingStatus = Literal["processing", "done"]
+type LoadingStatus = Literal["queued", "processing", "done", "cancelled"]
 type LoadingCompleteTarget = Literal[
     "progress_notes", "ns_vs",
     "prescriptions", "labs",
@@ -13,6 +13,25 @@ type LoadingCompleteTarget = Literal[
 class Loading(CamelModel):
   status: LoadingStatus = "processing"
   complete_target: LoadingCompleteTarget | None = None
+  job_id: str | None = None
+  # 대기 중(queued)일 때 대기열 위치(1부터)와 예상 시작까지 남은 시간(초)
+  queue_position: int | None = None
+  estimated_start_seconds: float | None = None
+  # 처리 중(processing)일 때 지금까지 완료된 노드와 예상 남은 시간(초, 이력이 없으면 None)
+  completed_targets: list[LoadingCompleteTarget] | None = None
+  estimated_remaining_seconds: float | None = None
+
+  def to_json(self):
+    return self.model_dump(by_alias=True)
+
+
+class SectionResult(CamelModel):
+  """섹션 완료 결과 (최종 summarize_patient 전에 섹션별로 전송)"""
+  target: LoadingCompleteTarget
+  # PatientSummaryResponse에서의 필드명 (camelCase)
+  key: str
+  result: dict[str, Any]
+  job_id: str | None = None
 
   def to_json(self):
     return self.model_dump(by_alias=True)
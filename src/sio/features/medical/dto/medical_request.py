@@ -1,4 +1,4 @@
-from typing import NotRequired, TypedDict
+from typing import Literal, NotRequired, TypedDict
 from src.sio.features.medical.dto.radiology_dto import RadiologyReport
 
 class PatientInfo(TypedDict):
@@ -65,6 +65,12 @@ class Lab(TypedDict):
   normalRange: str
   note: str
 
+class ChartRef(TypedDict):
+  saup: str     # 기관
+  chart: str    # 차트번호
+  ibymd: str    # 입원일
+
+
 class SummarizePatientRequest(TypedDict):
   patientInfo: PatientInfo
   nursingRecords: list[NursingRecord]
@@ -79,4 +85,27 @@ class SummarizePatientRequest(TypedDict):
   # - 기존 클라이언트 호환을 위해 optional(NotRequired)로 둡니다.
   mainSymptoms: NotRequired[str]       # 주요증상
   specialNotes: NotRequired[str]      # 특이사항
-  wardNotes: NotRequired[str]         # 병동 참고사항
\ No newline at end of file
+  wardNotes: NotRequired[str]         # 병동 참고사항
+
+  # === 요청 기관 (선택) ===
+  # - 미지정 시 연결 시 전달한 saup(쿼리스트링/auth) 사용
+  saup: NotRequired[str]
+
+  # === 차트 참조 (선택) ===
+  # - 지정 시 비어 있는 vitalSigns/nursingRecords/progressNotes를 서버가 EMR DB에서 조회
+  chartRef: NotRequired[ChartRef]
+
+  # === 재요약 (선택) ===
+  # - true면 직전 완료 결과와 입력 fingerprint가 같은 섹션은 다시 실행하지 않고 재사용
+  resummarize: NotRequired[bool]
+  # - true면 보관된 결과(사전 계산 포함)와 섹션 결과를 쓰지 않고 전체를 다시 요약
+  force: NotRequired[bool]
+
+  # === 우선순위 (선택) ===
+  # - interactive(기본): 화면 앞에서 기다리는 요청 / background: 사전 계산, 배치
+  priority: NotRequired[Literal["interactive", "background"]]
+
+  # === 응답 옵션 (선택) ===
+  # - lawData 전송 모드: full(전체) / hash(해시만) / downsampled(일부 + 해시)
+  # - 미지정 시 settings.LAW_DATA_MODE 사용
+  lawDataMode: NotRequired[Literal["full", "hash", "downsampled"]]
\ No newline at end of file
@@ -1,7 +1,8 @@
 from pydantic import Field
-from typing import Optional, Literal
+from typing import Optional, Literal, get_args
 
 from src.common import CamelModel
+from src.utils.hash_util import stable_hash
 from src.sio.features.medical.dto.medical_request import VitalSign
 from src.sio.features.medical.dto.radiology_dto import RadiologyAnalysisSummary
 from src.sio.features.medical.dto.clinical_summary_dto import ClinicalSummaryResult
@@ -272,8 +273,73 @@ class LabSummaryResult(CamelModel):
   test_count: int = Field(..., description="조회 기간 내 총 검사 횟수")
 
 
+type LawDataMode = Literal["full", "hash", "downsampled"]
+
+
 class LawData(CamelModel):
-  vital_signs: list[VitalSign]
+  """원본 데이터 참조 정보
+
+  - full: vital_signs 전체를 그대로 전송
+  - hash: vital_signs_hash만 전송 (클라이언트가 보유한 원본과 대조)
+  - downsampled: 균등 간격으로 추린 vital_signs + 전체 해시
+  """
+  mode: LawDataMode = Field("full", description="전송 모드")
+  vital_signs: Optional[list[VitalSign]] = Field(
+      None, description="활력징후 목록 (full: 전체, downsampled: 일부, hash: None)")
+  vital_signs_hash: Optional[str] = Field(
+      None, description="요청 vitalSigns 전체의 sha256 (canonical JSON 기준)")
+  vital_signs_count: int = Field(0, description="요청 vitalSigns 전체 건수")
+
+  @staticmethod
+  def supports(mode: str) -> bool:
+    """지원하는 전송 모드인지 확인"""
+    return mode in get_args(LawDataMode.__value__)
+
+  @classmethod
+  def from_vital_signs(
+      cls,
+      vital_signs: list[VitalSign],
+      mode: LawDataMode = "full",
+      max_points: int = 48,
+  ) -> "LawData":
+    """요청 vitalSigns로 LawData 생성
+
+    이미 검증된 요청 데이터이므로 model_construct로 재검증을 생략합니다.
+    지원하지 않는 mode는 다른 모드로 대체하지 않고 ValueError를 발생시킵니다.
+    """
+    if not cls.supports(mode):
+      raise ValueError(f"지원하지 않는 lawData 모드: {mode}")
+    vital_signs = vital_signs or []
+    if mode == "full":
+      return cls.model_construct(
+          mode=mode,
+          vital_signs=vital_signs,
+          vital_signs_hash=None,
+          vital_signs_count=len(vital_signs))
+
+    vital_signs_hash = stable_hash(vital_signs)
+    sampled: Optional[list[VitalSign]] = None
+    if mode == "downsampled":
+      sampled = _downsample(vital_signs, max_points)
+
+    return cls.model_construct(
+        mode=mode,
+        vital_signs=sampled,
+        vital_signs_hash=vital_signs_hash,
+        vital_signs_count=len(vital_signs))
+
+
+def _downsample[T](items: list[T], max_points: int) -> list[T]:
+  """처음/마지막 항목을 포함하여 균등 간격으로 최대 max_points개 추출"""
+  if max_points <= 0:
+    return []
+  if len(items) <= max_points:
+    return list(items)
+  if max_points == 1:
+    return [items[0]]
+
+  step = (len(items) - 1) / (max_points - 1)
+  return [items[round(i * step)] for i in range(max_points)]
 
 
 class PatientSummaryResponse(CamelModel):
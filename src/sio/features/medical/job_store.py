@@ -0,0 +1,369 @@
+"""환자 요약 작업 상태/결과 보관소
+
+작업 id와 room(환자) 기준으로 진행 중/완료된 작업을 보관 기간 동안 유지하여,
+연결이 끊겼다가 다시 join_room 한 클라이언트에게 결과를 재전송하거나 진행 중 작업에 붙여줍니다.
+"""
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal, Optional
+
+from src.core import settings
+
+
+type JobStatus = Literal["queued", "running", "done", "failed", "cancelled", "rejected"]
+# 취소 요청을 받을 수 있는 (대기/실행 중) 상태
+ACTIVE_STATUSES: tuple[JobStatus, ...] = ("queued", "running")
+
+
+@dataclass
+class JobRecord:
+  """작업 상태 기록"""
+  job_id: str
+  room: str
+  status: JobStatus = "queued"
+  result: Optional[dict[str, Any]] = None
+  error: Optional[str] = None
+  # 작업을 요청한 클라이언트 sid
+  requester_sid: Optional[str] = None
+  # 취소 요청 여부 (워커가 확인 후 실행 중인 태스크를 취소)
+  cancel_requested: bool = False
+  # 취소 시 중단된 LLM 호출 수 / 절감 추정 토큰
+  cancelled_calls: int = 0
+  saved_tokens: int = 0
+  # 완료 결과의 섹션별 입력 fingerprint (재요약 시 바뀌지 않은 섹션 재사용)
+  fingerprints: dict[str, str] = field(default_factory=dict)
+  # 그래프 체크포인트 스레드 id / 요청 입력 hash (같은 입력의 중단된 작업을 이어서 실행)
+  thread_id: Optional[str] = None
+  input_hash: Optional[str] = None
+  # 사전 계산(prewarm) 작업 여부 - room의 최근 작업(get_latest)으로 잡히지 않음
+  silent: bool = False
+  updated_at: float = field(default_factory=time.time)
+
+  @property
+  def is_active(self) -> bool:
+    return self.status in ACTIVE_STATUSES
+
+  @property
+  def is_abandoned(self) -> bool:
+    """끝나지 않은 채 멈춘 작업 (실패/취소, 또는 워커 heartbeat가 끊긴 대기/실행 작업)"""
+    if self.status in ("failed", "cancelled"):
+      return True
+    return self.is_active and self.updated_at < time.time() - settings.SUMMARY_JOB_STALE_SECONDS
+
+  def to_json(self) -> str:
+    return json.dumps(asdict(self), ensure_ascii=False)
+
+  @classmethod
+  def from_json(cls, raw: str | bytes) -> "JobRecord":
+    return cls(**json.loads(raw))
+
+
+class SummaryJobStore(ABC):
+  """작업 상태 보관소"""
+
+  @abstractmethod
+  async def save(self, record: JobRecord) -> None:
+    """작업 상태 저장 (room의 최신 작업으로 갱신)"""
+
+  @abstractmethod
+  async def get(self, job_id: str) -> Optional[JobRecord]:
+    """작업 id로 조회"""
+
+  @abstractmethod
+  async def get_latest(self, room: str) -> Optional[JobRecord]:
+    """room의 가장 최근 작업 조회 (사전 계산 작업 제외)
+
+    join_room 재전송, room 지정 취소, 빈 room 취소가 사용자 요청 대신 사전 계산 작업을 가리키지 않도록
+    사전 계산 작업은 완료되었을 때 get_latest_done으로만 보입니다.
+    """
+
+  @abstractmethod
+  async def get_latest_silent(self, room: str) -> Optional[JobRecord]:
+    """room의 가장 최근 사전 계산 작업 조회"""
+
+  @abstractmethod
+  async def get_latest_done(self, room: str) -> Optional[JobRecord]:
+    """room의 가장 최근 완료 작업 조회"""
+
+  async def update(self, job_id: str, room: str, status: JobStatus, **fields: Any) -> JobRecord:
+    """작업 상태 변경 후 저장"""
+    record = await self.get(job_id) or JobRecord(job_id=job_id, room=room)
+    record.status = status
+    for key, value in fields.items():
+      setattr(record, key, value)
+    record.updated_at = time.time()
+    await self.save(record)
+    return record
+
+  async def request_cancel(self, job_id: str) -> Optional[JobRecord]:
+    """진행 중/대기 중 작업에 취소 요청 표시"""
+    record = await self.get(job_id)
+    if record is None or not record.is_active:
+      return None
+    record.cancel_requested = True
+    record.updated_at = time.time()
+    await self.save(record)
+    return record
+
+  async def touch(self, job_id: str) -> None:
+    """실행 중인 작업의 heartbeat 갱신 (updated_at만 변경)"""
+    record = await self.get(job_id)
+    if record is not None and record.is_active:
+      record.updated_at = time.time()
+      await self.save(record)
+
+  @abstractmethod
+  async def claim_thread(self, job_id: str, room: str, input_hash: str, thread_id: str) -> str:
+    """작업이 사용할 체크포인트 스레드 결정 후 기록
+
+    room + 입력이 같은 직전 작업이 중단된(abandoned) 작업이면 그 스레드를 이어받고,
+    아니면(실행 중이거나 정상 완료) thread_id를 사용합니다. 조회와 기록은 원자적으로 처리하여
+    동시에 들어온 같은 입력의 요청이 같은 스레드를 이어받지 않도록 합니다.
+
+    Returns:
+        작업이 사용할 스레드 id
+    """
+
+  async def close(self) -> None:
+    """보관소 리소스 정리"""
+
+
+class LocalSummaryJobStore(SummaryJobStore):
+  """프로세스 메모리 보관소 (보관 기간 + 최대 건수 제한)"""
+
+  def __init__(self, ttl_seconds: int, max_jobs: int, done_ttl_seconds: Optional[int] = None) -> None:
+    self.ttl_seconds = ttl_seconds
+    self.done_ttl_seconds = done_ttl_seconds or ttl_seconds
+    self.max_jobs = max_jobs
+    self._jobs: OrderedDict[str, JobRecord] = OrderedDict()
+    self._latest_by_room: dict[str, str] = {}
+    self._latest_silent_by_room: dict[str, str] = {}
+    self._latest_done_by_room: dict[str, str] = {}
+    self._latest_by_input: dict[tuple[str, str], str] = {}
+
+  async def save(self, record: JobRecord) -> None:
+    self._jobs[record.job_id] = record
+    self._jobs.move_to_end(record.job_id)
+    latest = self._latest_silent_by_room if record.silent else self._latest_by_room
+    latest[record.room] = record.job_id
+    if record.status == "done":
+      self._latest_done_by_room[record.room] = record.job_id
+    self._prune()
+
+  async def get(self, job_id: str) -> Optional[JobRecord]:
+    self._prune()
+    return self._jobs.get(job_id)
+
+  async def get_latest(self, room: str) -> Optional[JobRecord]:
+    job_id = self._latest_by_room.get(room)
+    return await self.get(job_id) if job_id else None
+
+  async def get_latest_silent(self, room: str) -> Optional[JobRecord]:
+    job_id = self._latest_silent_by_room.get(room)
+    return await self.get(job_id) if job_id else None
+
+  async def get_latest_done(self, room: str) -> Optional[JobRecord]:
+    job_id = self._latest_done_by_room.get(room)
+    return await self.get(job_id) if job_id else None
+
+  async def claim_thread(self, job_id: str, room: str, input_hash: str, thread_id: str) -> str:
+    # 조회와 기록 사이에 await가 없으므로 같은 이벤트 루프에서 원자적
+    self._prune()
+    previous = self._jobs.get(self._latest_by_input.get((room, input_hash), ""))
+    if previous and previous.job_id != job_id and previous.thread_id and previous.is_abandoned:
+      thread_id = previous.thread_id
+    record = self._jobs.get(job_id)
+    if record is not None:
+      record.thread_id = thread_id
+      record.input_hash = input_hash
+      self._latest_by_input[(room, input_hash)] = job_id
+    return thread_id
+
+  def _prune(self) -> None:
+    # 완료 작업은 보관 기간이 달라 저장 순서와 만료 순서가 다를 수 있으므로 전체 확인
+    now = time.time()
+    expired = [
+        job_id for job_id, record in self._jobs.items()
+        if record.updated_at < now - (self.done_ttl_seconds if record.status == "done" else self.ttl_seconds)]
+    overflow = max(0, len(self._jobs) - len(expired) - self.max_jobs)
+    if overflow:
+      skip = set(expired)
+      expired += [job_id for job_id in self._jobs if job_id not in skip][:overflow]
+    for job_id in expired:
+      record = self._jobs.pop(job_id)
+      if self._latest_by_room.get(record.room) == job_id:
+        del self._latest_by_room[record.room]
+      if self._latest_silent_by_room.get(record.room) == job_id:
+        del self._latest_silent_by_room[record.room]
+      if self._latest_done_by_room.get(record.room) == job_id:
+        del self._latest_done_by_room[record.room]
+      if record.input_hash and self._latest_by_input.get((record.room, record.input_hash)) == job_id:
+        del self._latest_by_input[(record.room, record.input_hash)]
+
+
+class RedisSummaryJobStore(SummaryJobStore):
+  """Redis 호환 보관소 (키 TTL로 보관 기간 관리, 워커/웹 프로세스 간 공유)
+
+  작업은 필드별 JSON 값을 가진 hash로 저장합니다. update()는 바뀐 필드만 HSET 하므로
+  워커의 상태 변경이 웹 프로세스가 방금 기록한 cancel_requested를 덮어쓰지 않고,
+  request_cancel()은 WATCH/MULTI로 상태 확인과 취소 표시를 원자적으로 처리합니다.
+  """
+
+  def __init__(
+      self,
+      url: str,
+      prefix: str,
+      ttl_seconds: int,
+      done_ttl_seconds: Optional[int] = None,
+      **redis_options: Any,
+  ) -> None:
+    try:
+      from redis import asyncio as aioredis
+      from redis.exceptions import WatchError
+    except ImportError as e:
+      raise RuntimeError("SUMMARY_QUEUE=redis 사용 시 redis 패키지가 필요합니다") from e
+
+    self._redis = aioredis.Redis.from_url(url, **redis_options)
+    self._watch_error = WatchError
+    self._prefix = prefix
+    self.ttl_seconds = ttl_seconds
+    self.done_ttl_seconds = done_ttl_seconds or ttl_seconds
+
+  def _job_key(self, job_id: str) -> str:
+    return f"{self._prefix}:job-fields:{job_id}"
+
+  def _room_key(self, room: str) -> str:
+    return f"{self._prefix}:room:{room}"
+
+  def _room_silent_key(self, room: str) -> str:
+    return f"{self._prefix}:room-silent:{room}"
+
+  def _room_done_key(self, room: str) -> str:
+    return f"{self._prefix}:room-done:{room}"
+
+  def _input_key(self, room: str, input_hash: str) -> str:
+    return f"{self._prefix}:room-input:{room}:{input_hash}"
+
+  async def save(self, record: JobRecord) -> None:
+    await self._write(record.job_id, record.room, record.status, asdict(record))
+
+  async def update(self, job_id: str, room: str, status: JobStatus, **fields: Any) -> JobRecord:
+    """바뀐 필드만 기록 (다른 프로세스가 기록한 필드는 유지)"""
+    return await self._write(job_id, room, status, {**fields, "status": status, "updated_at": time.time()})
+
+  async def request_cancel(self, job_id: str) -> Optional[JobRecord]:
+    return await self._update_active(job_id, {"cancel_requested": True})
+
+  async def touch(self, job_id: str) -> None:
+    await self._update_active(job_id, {})
+
+  async def _update_active(self, job_id: str, values: dict[str, Any]) -> Optional[JobRecord]:
+    """대기/실행 중인 작업만 필드 변경 (WATCH/MULTI로 상태 확인과 변경을 원자적으로)"""
+    key = self._job_key(job_id)
+    async with self._redis.pipeline(transaction=True) as pipe:
+      while True:
+        try:
+          await pipe.watch(key)
+          status = await pipe.hget(key, "status")
+          if status is None or json.loads(status) not in ACTIVE_STATUSES:
+            await pipe.reset()
+            return None
+          pipe.multi()
+          pipe.hset(key, mapping=_encode_fields({**values, "updated_at": time.time()}))
+          pipe.hgetall(key)
+          _, raw = await pipe.execute()
+          return _decode_record(raw)
+        except self._watch_error:
+          # 확인 후 다른 프로세스가 상태를 바꿨으면 다시 확인
+          continue
+
+  async def claim_thread(self, job_id: str, room: str, input_hash: str, thread_id: str) -> str:
+    pointer = self._input_key(room, input_hash)
+    key = self._job_key(job_id)
+    async with self._redis.pipeline(transaction=True) as pipe:
+      while True:
+        try:
+          await pipe.watch(pointer)
+          claimed = thread_id
+          previous_id = await pipe.get(pointer)
+          if previous_id:
+            previous_id = previous_id.decode() if isinstance(previous_id, bytes) else previous_id
+            raw = await pipe.hgetall(self._job_key(previous_id)) if previous_id != job_id else None
+            previous = _decode_record(raw) if raw else None
+            if previous and previous.thread_id and previous.is_abandoned:
+              claimed = previous.thread_id
+          pipe.multi()
+          pipe.hset(key, mapping=_encode_fields({"thread_id": claimed, "input_hash": input_hash}))
+          pipe.expire(key, self.ttl_seconds)
+          pipe.set(pointer, job_id, ex=self.ttl_seconds)
+          await pipe.execute()
+          return claimed
+        except self._watch_error:
+          # 다른 작업이 먼저 스레드를 가져갔으면 다시 확인
+          continue
+
+  async def _write(self, job_id: str, room: str, status: JobStatus, values: dict[str, Any]) -> JobRecord:
+    key = self._job_key(job_id)
+    ttl = self.done_ttl_seconds if status == "done" else self.ttl_seconds
+    # silent는 작업을 처음 기록할 때만 지정되고 바뀌지 않으므로 미리 읽어도 됨
+    silent = values["silent"] if "silent" in values else json.loads(await self._redis.hget(key, "silent") or "false")
+    async with self._redis.pipeline(transaction=True) as pipe:
+      pipe.hset(key, mapping=_encode_fields({**values, "job_id": job_id, "room": room}))
+      pipe.expire(key, ttl)
+      pipe.set(self._room_silent_key(room) if silent else self._room_key(room), job_id, ex=self.ttl_seconds)
+      if status == "done":
+        pipe.set(self._room_done_key(room), job_id, ex=ttl)
+      pipe.hgetall(key)
+      *_, raw = await pipe.execute()
+    return _decode_record(raw)
+
+  async def get(self, job_id: str) -> Optional[JobRecord]:
+    raw = await self._redis.hgetall(self._job_key(job_id))
+    return _decode_record(raw) if raw else None
+
+  async def get_latest(self, room: str) -> Optional[JobRecord]:
+    return await self._get_by_pointer(self._room_key(room))
+
+  async def get_latest_silent(self, room: str) -> Optional[JobRecord]:
+    return await self._get_by_pointer(self._room_silent_key(room))
+
+  async def get_latest_done(self, room: str) -> Optional[JobRecord]:
+    return await self._get_by_pointer(self._room_done_key(room))
+
+  async def _get_by_pointer(self, key: str) -> Optional[JobRecord]:
+    job_id = await self._redis.get(key)
+    if not job_id:
+      return None
+    return await self.get(job_id.decode() if isinstance(job_id, bytes) else job_id)
+
+  async def close(self) -> None:
+    await self._redis.aclose()
+
+
+def _encode_fields(values: dict[str, Any]) -> dict[str, str]:
+  return {name: json.dumps(value, ensure_ascii=False) for name, value in values.items()}
+
+
+def _decode_record(raw: dict[bytes | str, bytes | str]) -> JobRecord:
+  fields = {
+      (name.decode() if isinstance(name, bytes) else name): json.loads(value) for name, value in raw.items()}
+  return JobRecord(**fields)
+
+
+def create_summary_job_store() -> SummaryJobStore:
+  """settings.SUMMARY_QUEUE에 맞는 보관소 생성 (redis 큐는 워커와 공유해야 하므로 redis 보관소)"""
+  kind = settings.SUMMARY_QUEUE
+  if kind == "local":
+    return LocalSummaryJobStore(
+        settings.SUMMARY_RESULT_TTL_SECONDS, settings.SUMMARY_RESULT_MAX_JOBS, settings.SUMMARY_DONE_TTL_SECONDS)
+  if kind == "redis":
+    return RedisSummaryJobStore(
+        settings.REDIS_URL, settings.SUMMARY_RESULT_KEY_PREFIX, settings.SUMMARY_RESULT_TTL_SECONDS,
+        settings.SUMMARY_DONE_TTL_SECONDS)
+  raise ValueError(f"지원하지 않는 SUMMARY_QUEUE: {kind}")
+
+
+summary_job_store: SummaryJobStore = create_summary_job_store()
@@ -0,0 +1,337 @@
+"""환자 요약 작업 큐 및 워커 풀
+
+- local: 웹 프로세스 내부 asyncio.Queue + 워커 태스크 (기본값)
+- redis: Redis 호환 리스트 기반 브로커, `python -m src.worker` 프로세스가 소비
+"""
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional
+
+from loguru import logger
+from src.core import settings
+from src.core.exceptions import ValidationException
+from src.sio.emitter import NullEmitter, RoomEmitter
+from src.sio.features.medical.dto import Loading, SummarizePatientRequest
+from src.sio.features.medical.job_store import SummaryJobStore, summary_job_store
+from src.sio.features.medical.llm_usage import LlmUsage
+from src.sio.features.medical.scheduler import DEFAULT_TENANT, AdmissionController, AdmissionRejected, Lane
+from src.sio.features.medical.summary import run_patient_summary, send_warm_result
+
+
+@dataclass
+class SummaryJob:
+  """환자 요약 작업"""
+  room: str
+  data: SummarizePatientRequest
+  job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+  # 요청 기관 (saup) - 공정 배분 단위
+  tenant: str = DEFAULT_TENANT
+  # 우선순위 lane
+  priority: Lane = "interactive"
+  # True면 진행 상태/결과를 room에 전송하지 않고 보관소에만 기록 (사전 계산)
+  silent: bool = False
+
+  def to_json(self) -> str:
+    return json.dumps(
+        {
+            "jobId": self.job_id,
+            "room": self.room,
+            "data": self.data,
+            "tenant": self.tenant,
+            "priority": self.priority,
+            "silent": self.silent,
+        },
+        ensure_ascii=False)
+
+  @classmethod
+  def from_json(cls, raw: str | bytes) -> "SummaryJob":
+    payload = json.loads(raw)
+    return cls(
+        room=payload["room"],
+        data=payload["data"],
+        job_id=payload["jobId"],
+        tenant=payload.get("tenant", DEFAULT_TENANT),
+        priority=payload.get("priority", "interactive"),
+        silent=payload.get("silent", False))
+
+
+def resolve_tenant(requested: Optional[str], bound: Optional[str] = None) -> str:
+  """작업 tenant(saup) 결정
+
+  연결할 때 정해진 기관(bound)을 우선합니다. 요청 본문의 saup은 그 기관과 같을 때만 허용하고,
+  연결에 묶인 기관이 없으면 설정(TENANT_*)에 있는 기관일 때만 사용합니다 (그 외는 DEFAULT_TENANT).
+  요청마다 saup을 바꿔 기관별 동시 실행/토큰 한도를 피할 수 없게 합니다.
+
+  Raises:
+      ValidationException: 연결된 기관과 다른 saup
+  """
+  if bound:
+    if requested and requested != bound:
+      raise ValidationException(
+          f"연결된 기관({bound})과 다른 saup({requested})으로 요청할 수 없습니다", details={"saup": requested})
+    return bound
+  configured = (
+      requested in settings.TENANT_WEIGHTS
+      or requested in settings.TENANT_MAX_CONCURRENCY
+      or requested in settings.TENANT_TOKEN_QUOTAS)
+  return requested if requested and configured else DEFAULT_TENANT
+
+
+class SummaryJobQueue(ABC):
+  """환자 요약 작업 큐"""
+
+  @abstractmethod
+  async def put(self, job: SummaryJob) -> None:
+    """작업 등록"""
+
+  @abstractmethod
+  async def get(self) -> SummaryJob:
+    """작업 하나를 꺼낼 때까지 대기"""
+
+  async def close(self) -> None:
+    """큐 리소스 정리"""
+
+
+class LocalSummaryJobQueue(SummaryJobQueue):
+  """프로세스 내부 asyncio 큐"""
+
+  def __init__(self) -> None:
+    self._queue: asyncio.Queue[SummaryJob] = asyncio.Queue()
+
+  async def put(self, job: SummaryJob) -> None:
+    await self._queue.put(job)
+
+  async def get(self) -> SummaryJob:
+    return await self._queue.get()
+
+
+class RedisSummaryJobQueue(SummaryJobQueue):
+  """Redis 호환 리스트(LPUSH/BRPOP) 기반 큐"""
+
+  def __init__(self, url: str, key: str) -> None:
+    try:
+      from redis import asyncio as aioredis
+    except ImportError as e:
+      raise RuntimeError("SUMMARY_QUEUE=redis 사용 시 redis 패키지가 필요합니다") from e
+
+    self._redis = aioredis.Redis.from_url(url)
+    self._key = key
+
+  async def put(self, job: SummaryJob) -> None:
+    await self._redis.lpush(self._key, job.to_json())
+
+  async def get(self) -> SummaryJob:
+    while True:
+      item = await self._redis.brpop([self._key], timeout=5)
+      if item is not None:
+        _, raw = item
+        return SummaryJob.from_json(raw)
+
+  async def close(self) -> None:
+    await self._redis.aclose()
+
+
+def create_summary_job_queue() -> SummaryJobQueue:
+  """settings.SUMMARY_QUEUE에 맞는 작업 큐 생성"""
+  kind = settings.SUMMARY_QUEUE
+  if kind == "local":
+    return LocalSummaryJobQueue()
+  if kind == "redis":
+    return RedisSummaryJobQueue(settings.REDIS_URL, settings.SUMMARY_QUEUE_KEY)
+  raise ValueError(f"지원하지 않는 SUMMARY_QUEUE: {kind}")
+
+
+class SummaryWorkerPool:
+  """작업 큐를 소비하여 환자 요약을 실행하는 워커 풀
+
+  큐에서 꺼낸 작업은 AdmissionController를 거쳐 실행되므로, 프로세스당 동시 실행 수가
+  제한되고 대기 중인 요청은 room으로 대기 위치/예상 시작 시간을 받습니다.
+  큐에서는 동시 실행 수 + 대기열 상한만큼만 꺼내 두고, 나머지는 큐(브로커)에 남겨 둡니다.
+  HTTP 스트리밍처럼 요청 연결이 직접 결과를 받아야 하는 작업은 run()으로 큐를 거치지 않고
+  같은 AdmissionController(동시 실행 제한/공정 배분/토큰 쿼터)를 거쳐 실행합니다.
+  """
+
+  def __init__(
+      self,
+      queue: SummaryJobQueue,
+      emitter: RoomEmitter,
+      concurrency: Optional[int] = None,
+      store: SummaryJobStore = summary_job_store,
+  ) -> None:
+    self.queue = queue
+    self.emitter = emitter
+    self.store = store
+    self.admission = AdmissionController(
+        max_concurrency=concurrency or settings.SUMMARY_WORKER_CONCURRENCY,
+        max_backlog=settings.SUMMARY_MAX_BACKLOG,
+        default_duration=settings.SUMMARY_DEFAULT_DURATION_SECONDS,
+        tenant_weights=settings.TENANT_WEIGHTS,
+        tenant_max_concurrency=settings.TENANT_MAX_CONCURRENCY,
+        default_tenant_max_concurrency=settings.TENANT_DEFAULT_MAX_CONCURRENCY,
+        tenant_token_quotas=settings.TENANT_TOKEN_QUOTAS,
+        quota_window=settings.TENANT_TOKEN_QUOTA_WINDOW_SECONDS,
+        background_max_concurrency=settings.SUMMARY_BACKGROUND_MAX_CONCURRENCY,
+        background_max_backlog=settings.SUMMARY_BACKGROUND_MAX_BACKLOG,
+    )
+    # 큐에서 꺼내 이 프로세스가 맡고 있는 작업 수 상한 (실행 + 대기열 상한)
+    # 여유가 있을 때만 꺼내므로, 처리할 수 없는 작업은 브로커에 남아 다른 워커 프로세스가 가져감
+    self._capacity = asyncio.Semaphore(self.admission.max_concurrency + self.admission.max_backlog)
+    self._tasks: list[asyncio.Task] = []
+    # 대기/실행 중인 작업 id -> 요약 태스크
+    self._running: dict[str, asyncio.Task] = {}
+
+  def start(self, dispatch: bool = True) -> None:
+    """워커 태스크 시작
+
+    Args:
+        dispatch: False면 큐를 소비하지 않고 run()으로 실행한 작업의 취소 요청만 감시
+    """
+    if dispatch:
+      self._tasks.append(asyncio.create_task(self._dispatch(), name="summary-dispatcher"))
+    self._tasks.append(asyncio.create_task(self._watch_cancellations(), name="summary-cancel-watcher"))
+    logger.info(
+        f"[jobs] 요약 워커 시작 - 최대 동시 실행: {self.admission.max_concurrency}, 큐 소비: {dispatch}")
+
+  async def stop(self) -> None:
+    """워커 태스크 종료"""
+    tasks = self._tasks + list(self._running.values())
+    for task in tasks:
+      task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    self._tasks.clear()
+    logger.info("[jobs] 요약 워커 종료")
+
+  async def _dispatch(self) -> None:
+    while True:
+      # 맡을 여유가 생길 때까지 큐에서 꺼내지 않음
+      await self._capacity.acquire()
+      job = await self.queue.get()
+      record = await self.store.get(job.job_id)
+      if record and record.cancel_requested:
+        logger.info(f"[jobs] 대기 중 취소된 작업 건너뜀 - job: {job.job_id}")
+        await self.store.update(job.job_id, job.room, "cancelled")
+        self._capacity.release()
+        continue
+
+      task = self._spawn(job, NullEmitter(self.emitter.namespace) if job.silent else self.emitter)
+      task.add_done_callback(lambda _: self._capacity.release())
+
+  async def run(self, job: SummaryJob, emitter: RoomEmitter) -> None:
+    """큐를 거치지 않고 작업을 실행하고 끝날 때까지 대기 (진행 상태/결과는 emitter로 전송)
+
+    호출한 쪽이 취소되면(요청 연결 종료 등) 실행 중인 작업도 취소합니다.
+    """
+    task = self._spawn(job, emitter)
+    try:
+      await asyncio.shield(task)
+    except asyncio.CancelledError:
+      task.cancel()
+      await asyncio.gather(task, return_exceptions=True)
+      raise
+
+  def _spawn(self, job: SummaryJob, emitter: RoomEmitter) -> asyncio.Task:
+    task = asyncio.create_task(self._execute(job, emitter), name=f"summary-job-{job.job_id}")
+    self._running[job.job_id] = task
+    task.add_done_callback(lambda _, job_id=job.job_id: self._running.pop(job_id, None))
+    return task
+
+  async def _execute(self, job: SummaryJob, emitter: RoomEmitter) -> None:
+    # src.services는 sio dto를 import하므로 모듈 수준에서 import하면 순환 import가 됨
+    from src.services import resolve_chart
+
+    async def send_position(position: int, estimated_start: float) -> None:
+      await emitter.emit("loading", Loading(
+          status="queued",
+          job_id=job.job_id,
+          queue_position=position,
+          estimated_start_seconds=round(estimated_start, 1),
+      ).to_json(), room=job.room)
+
+    usage = LlmUsage()
+    try:
+      if not job.silent:
+        await self._cancel_prewarm(job.room)
+      # chartRef 요청은 DB에서 차트를 한 번만 채워 보관 결과 확인과 요약 실행에 함께 사용
+      data = await resolve_chart(job.data)
+      # 입력이 보관된 결과(사전 계산 포함)와 같으면 슬롯을 기다리지 않고 바로 응답
+      if await send_warm_result(emitter, job.room, data, job.job_id):
+        return
+
+      async with self.admission.slot(
+          job.job_id, tenant=job.tenant, on_position=send_position, lane=job.priority):
+        if job.silent and await self._has_active_request(job.room):
+          # 대기하는 동안 들어온 사용자 요청이 같은 차트를 요약 중이면 사전 계산은 중복
+          logger.info(f"[jobs] 사용자 요청이 진행 중이라 사전 계산 건너뜀 - job: {job.job_id}, room: {job.room}")
+          await self.store.update(job.job_id, job.room, "cancelled")
+          return
+        logger.info(
+            f"[jobs] 작업 시작 - job: {job.job_id}, room: {job.room}, tenant: {job.tenant}, lane: {job.priority}")
+        await self.store.update(job.job_id, job.room, "running")
+        try:
+          await run_patient_summary(
+              emitter, job.room, data, job_id=job.job_id, usage=usage,
+              require_listener=job.priority == "interactive")
+        finally:
+          self.admission.record_tokens(job.tenant, usage.input_tokens + usage.output_tokens)
+      logger.debug(f"[jobs] lane 지표: {self.admission.lane_metrics_snapshot()}")
+    except AdmissionRejected as e:
+      await self._reject(job, e, emitter)
+    except asyncio.CancelledError:
+      # 실행 중 취소는 run_patient_summary에서 기록, 대기 중 취소만 여기서 기록
+      record = await self.store.get(job.job_id)
+      if record and record.status == "queued":
+        await self.store.update(job.job_id, job.room, "cancelled")
+        await emitter.emit(
+            "loading", Loading(status="cancelled", job_id=job.job_id).to_json(), room=job.room)
+    except Exception as e:
+      logger.exception(f"[jobs] 작업 실패 - job: {job.job_id}, error: {e}")
+      await self.store.update(job.job_id, job.room, "failed", error=str(e))
+      await emitter.emit(
+          "error", {"message": str(e), "jobId": job.job_id}, room=job.room)
+
+  async def _has_active_request(self, room: str) -> bool:
+    latest = await self.store.get_latest(room)
+    return latest is not None and latest.is_active
+
+  async def _cancel_prewarm(self, room: str) -> None:
+    """사용자 요청이 들어온 room의 대기/실행 중인 사전 계산 취소 요청 (같은 차트를 두 번 요약하지 않도록)"""
+    prewarm = await self.store.get_latest_silent(room)
+    if prewarm and await self.store.request_cancel(prewarm.job_id):
+      logger.info(f"[jobs] 사용자 요청으로 사전 계산 취소 - job: {prewarm.job_id}, room: {room}")
+
+  async def _reject(self, job: SummaryJob, e: AdmissionRejected, emitter: RoomEmitter) -> None:
+    logger.warning(
+        f"[jobs] 실행 거절 - job: {job.job_id}, tenant: {job.tenant}, retry_after: {e.retry_after}, "
+        f"tenant 지표: {self.admission.metrics().get(job.tenant)}")
+    await self.store.update(job.job_id, job.room, "rejected", error=str(e))
+    await emitter.emit(
+        "error",
+        {"message": str(e), "jobId": job.job_id, "retryAfter": e.retry_after},
+        room=job.room)
+
+  async def _watch_cancellations(self) -> None:
+    """대기/실행 중인 작업의 취소 요청을 주기적으로 확인하여 태스크 취소 (+ 작업 heartbeat 갱신)
+
+    취소 요청은 보관소를 통해 전달되므로 별도 워커 프로세스에서도 동일하게 동작합니다.
+    """
+    last_heartbeat = time.monotonic()
+    while True:
+      await asyncio.sleep(settings.SUMMARY_CANCEL_POLL_SECONDS)
+      heartbeat = time.monotonic() - last_heartbeat >= settings.SUMMARY_JOB_HEARTBEAT_SECONDS
+      if heartbeat:
+        last_heartbeat = time.monotonic()
+      for job_id, task in list(self._running.items()):
+        record = await self.store.get(job_id)
+        if record and record.cancel_requested and not task.done():
+          logger.info(f"[jobs] 작업 취소 - job: {job_id}, room: {record.room}")
+          task.cancel()
+        elif heartbeat:
+          # 실행 중임을 기록 (heartbeat가 끊긴 작업의 체크포인트만 다른 작업이 이어받음)
+          await self.store.touch(job_id)
+
+
+summary_queue: SummaryJobQueue = create_summary_job_queue()
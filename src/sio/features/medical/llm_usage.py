@@ -0,0 +1,119 @@
+"""LLM 호출 사용량 집계
+
+그래프 실행 설정(configurable.llm_usage)에 LlmUsage를 넣으면 노드의 LLM 호출을 집계합니다.
+실행이 취소되면 진행 중이던 호출 수와 추정 토큰을 절감량으로 기록합니다.
+"""
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from loguru import logger
+from src.utils.token_util import estimate_tokens
+
+
+@dataclass
+class LlmUsage:
+  """요청 1건의 LLM 호출 사용량"""
+  started_calls: int = 0
+  completed_calls: int = 0
+  input_tokens: int = 0
+  output_tokens: int = 0
+  # 진행 중인 호출 id -> 추정 입력 토큰
+  in_flight: dict[int, int] = field(default_factory=dict)
+  # LLM 호출을 시작한 그래프 노드 이름
+  started_nodes: set[str] = field(default_factory=set)
+  # 토큰 예산으로 프롬프트에서 생략한 입력 (노드 -> 목록 이름 -> 생략 내역)
+  trimmed: dict[str, dict[str, dict[str, int]]] = field(default_factory=dict)
+  _ids: itertools.count = field(default_factory=itertools.count, repr=False)
+
+  def start(self, estimated_input_tokens: int, node: Optional[str] = None) -> int:
+    call_id = next(self._ids)
+    self.started_calls += 1
+    if node:
+      self.started_nodes.add(node)
+    self.in_flight[call_id] = estimated_input_tokens
+    return call_id
+
+  def finish(self, call_id: int, input_tokens: int, output_tokens: int) -> None:
+    self.in_flight.pop(call_id, None)
+    self.completed_calls += 1
+    self.input_tokens += input_tokens
+    self.output_tokens += output_tokens
+
+
+@dataclass
+class CancellationMetrics:
+  """취소로 절감한 LLM 호출 누적 지표"""
+  cancelled_jobs: int = 0
+  cancelled_calls: int = 0
+  saved_tokens: int = 0
+
+  def record(self, usage: LlmUsage, pending_nodes: int = 0) -> tuple[int, int]:
+    """취소된 요청의 사용량을 누적
+
+    Args:
+        usage: 취소된 요청의 사용량
+        pending_nodes: 아직 시작하지 않아 호출되지 않은 노드 수
+
+    Returns:
+        (취소된 호출 수, 절감 추정 토큰)
+    """
+    in_flight_calls = len(usage.in_flight)
+    cancelled_calls = in_flight_calls + pending_nodes
+    # 진행 중 호출은 입력 토큰 추정치, 미시작 노드는 완료된 호출의 평균 토큰으로 추정
+    average_tokens = (
+        (usage.input_tokens + usage.output_tokens) // usage.completed_calls
+        if usage.completed_calls else 0)
+    saved_tokens = sum(usage.in_flight.values()) + pending_nodes * average_tokens
+
+    self.cancelled_jobs += 1
+    self.cancelled_calls += cancelled_calls
+    self.saved_tokens += saved_tokens
+    return cancelled_calls, saved_tokens
+
+
+cancellation_metrics = CancellationMetrics()
+
+
+def get_llm_usage(config: Optional[RunnableConfig]) -> Optional[LlmUsage]:
+  """실행 설정에서 LlmUsage 조회"""
+  return (config or {}).get("configurable", {}).get("llm_usage")
+
+
+def _message_text(input: dict[str, Any]) -> str:
+  return "\n".join(str(getattr(m, "content", m)) for m in input.get("messages", []))
+
+
+def _response_tokens(response: dict[str, Any]) -> tuple[int, int]:
+  input_tokens = output_tokens = 0
+  for message in response.get("messages", []):
+    usage_metadata = getattr(message, "usage_metadata", None) or {}
+    input_tokens += usage_metadata.get("input_tokens", 0)
+    output_tokens += usage_metadata.get("output_tokens", 0)
+  return input_tokens, output_tokens
+
+
+async def invoke_agent(agent: Any, input: dict[str, Any], config: Optional[RunnableConfig] = None) -> dict[str, Any]:
+  """agent.ainvoke 실행 + 사용량 집계
+
+  취소(CancelledError) 시에는 in_flight에 남겨 두어 취소 지표에 반영되도록 합니다.
+  """
+  usage = get_llm_usage(config)
+  if usage is None:
+    return await agent.ainvoke(input)
+
+  estimated_tokens = estimate_tokens(_message_text(input))
+  node = (config or {}).get("metadata", {}).get("langgraph_node")
+  call_id = usage.start(estimated_tokens, node)
+  try:
+    response = await agent.ainvoke(input)
+  except Exception:
+    usage.in_flight.pop(call_id, None)
+    raise
+
+  input_tokens, output_tokens = _response_tokens(response)
+  usage.finish(call_id, input_tokens or estimated_tokens, output_tokens)
+  logger.debug(
+      f"[llm_usage] 호출 완료 - input: {input_tokens or estimated_tokens}, output: {output_tokens}")
+  return response
@@ -1,22 +1,21 @@
 """의료 관련 네임스페이스"""
 from typing import Optional
+from urllib.parse import parse_qs
 
 from loguru import logger
+from src.core import settings
+from src.core.exceptions import ValidationException
 from src.sio.config import sio
 from src.sio.base import BaseNamespace
 from src.sio.features.medical import medical_graph
 from src.sio.features.medical.dto import (
-    LawData,
     Loading,
-    PatientSummaryResponse,
-    PrescriptionSummaryResult,
-    ProgressNoteResult,
     SummarizePatientRequest,
-    VsNsSummaryResult,
-    LabSummaryResult,
-    ClinicalSummaryResult,
-  SurgerySummaryResult,
 )
+from src.sio.features.medical.job_store import summary_job_store
+from src.sio.features.medical.jobs import SummaryJob, resolve_tenant, summary_queue
+from src.sio.features.medical.prewarm import prewarm_watchlist
+from src.sio.features.medical.summary import validate_summary_request
 
 class MedicalNamespace(BaseNamespace):
   """의료 관련 네임스페이스"""
@@ -27,21 +26,41 @@ class MedicalNamespace(BaseNamespace):
     """의료 네임스페이스 이벤트 등록"""
 
     @sio.event(namespace=self.namespace)
-    async def connect(sid: str, environ: dict):
-      """클라이언트가 /medical 네임스페이스에 연결"""
+    async def connect(sid: str, environ: dict, auth: Optional[dict] = None):
+      """클라이언트가 /medical 네임스페이스에 연결 (요청 기관은 연결 시점에 정해짐)"""
       logger.info(f"[{self.namespace}] 클라이언트 연결: {sid}")
 
+      # 요청 기관(saup): auth 또는 쿼리스트링으로 전달
+      query = parse_qs(environ.get("QUERY_STRING", ""))
+      saup = (auth or {}).get("saup") or next(iter(query.get("saup", [])), None)
+      if saup:
+        await sio.save_session(sid, {"saup": saup}, namespace=self.namespace)
+
     @sio.event(namespace=self.namespace)
     async def disconnect(sid: str):
       """클라이언트가 /medical 네임스페이스에서 연결 해제"""
       logger.info(f"[{self.namespace}] 클라이언트 연결 해제: {sid}")
 
+      # 마지막 참여자가 나간 room의 진행 중 요약은 취소 (EMPTY_ROOM_POLICY=abort)
+      for room in await self.forget_client(sid):
+        await self.cancel_if_room_empty(room, exclude_sid=sid)
+
     @sio.event(namespace=self.namespace)
     async def join_room(sid: str, room: str):
       """클라이언트를 특정 룸에 참여시키기"""
       logger.info(f"[{self.namespace}] join_room - sid: {sid}, room: {room}")
       await self.enter_room(sid, room)
 
+      # 보관 중인 최근 작업이 있으면 재전송하거나 진행 중 작업에 연결
+      record = await summary_job_store.get_latest(room)
+      if record and record.status == "done" and record.result:
+        await self.emit_to_client("summarize_patient", record.result, to=sid)
+        await self.emit_to_client(
+            "loading", Loading(status="done", job_id=record.job_id).to_json(), to=sid)
+      elif record and record.status in ("queued", "running"):
+        await self.emit_to_client(
+            "loading", Loading(status="processing", job_id=record.job_id).to_json(), to=sid)
+
       return True
 
     @sio.event(namespace=self.namespace)
@@ -49,60 +68,48 @@ class MedicalNamespace(BaseNamespace):
       """클라이언트를 특정 룸에서 나가기"""
       logger.info(f"[{self.namespace}] leave_room - sid: {sid}, room: {room}")
       await self.leave_room(sid, room)
+      await self.cancel_if_room_empty(room)
 
     @sio.event(namespace=self.namespace)
     async def summarize_patient(sid: str, to: str, data: SummarizePatientRequest):
-      """환자 요약 정보 요청"""
-      logger.info(
-          f"[{self.namespace}] summarize_patient - sid: {sid}, patient_id: {to}, data: {data}")
-
-      # 환자 정보 전송
-      await self.emit_with_ack("patient_data", data["patientInfo"], to=to)
+      """환자 요약 정보 요청
 
-      # === 로딩 상태 전송 함수 정의 ===
-      async def send_loading(loading: Loading) -> None:
-        """로딩 상태 전송"""
-        await self.emit("loading", loading.to_json(), room=to)
+      작업 큐에 등록만 하고 즉시 반환합니다. 진행 상태와 결과는 워커가 room으로 전송합니다.
+      입력이 보관된 결과(사전 계산 포함)와 같으면 워커가 LLM 호출 없이 바로 결과를 전송합니다 (force로 무시).
+      잘못된 요청 옵션은 큐에 넣지 않고 ack `{"error"}`로 거절합니다.
+      """
+      session = await sio.get_session(sid, namespace=self.namespace)
+      try:
+        validate_summary_request(data)
+        tenant = resolve_tenant(data.get("saup"), session.get("saup"))
+      except ValidationException as e:
+        logger.warning(f"[{self.namespace}] summarize_patient 거절 - sid: {sid}, patient_id: {to}, error: {e.message}")
+        return {"error": e.message}
+
+      prewarm_watchlist.add(to, data)
+      job = SummaryJob(
+          room=to, data=data, tenant=tenant, priority=data.get("priority", "interactive"))
+      logger.info(
+          f"[{self.namespace}] summarize_patient - sid: {sid}, patient_id: {to}, tenant: {tenant}, "
+          f"lane: {job.priority}, job: {job.job_id}")
 
-      # 처리 중 상태 전송
+      await summary_job_store.update(job.job_id, to, "queued", requester_sid=sid)
+      await summary_queue.put(job)
 
-      await send_loading(Loading(status="processing"))
+      return {"jobId": job.job_id}
 
-      result = await medical_graph.workflow.ainvoke({
-          "send_loading": send_loading,
-          "data": data
-      })
-      # room의 모든 클라이언트로부터 응답 수집
-
-      # Pydantic 모델을 dict로 변환 (JSON 직렬화 가능)
-      progress_notes_summary: Optional[ProgressNoteResult] = result.get(
-          'progress_notes_summary')
-      vs_ns_summary: Optional[VsNsSummaryResult] = result.get("vs_ns_summary")
-      prescription_summary: Optional[PrescriptionSummaryResult] = result.get(
-          "prescription_summary")
-      lab_summary: Optional[LabSummaryResult] = result.get("lab_summary")
-      surgery_summary: Optional[SurgerySummaryResult] = result.get("surgery_summary")
-      clinical_summary: Optional[ClinicalSummaryResult] = result.get("clinical_summary")
-
-      response = PatientSummaryResponse(
-          progress_notes_summary=progress_notes_summary,
-          vs_ns_summary=vs_ns_summary,
-          prescription_summary=prescription_summary,
-          lab_summary=lab_summary,
-          radiology_summary=result.get('radiology_summary'),
-          surgery_summary=surgery_summary,
-          clinical_summary=clinical_summary,
-          law_data=LawData(vital_signs=data['vitalSigns'])
-      )
-      responses = await self.emit_with_ack(
-          "summarize_patient",
-          response.model_dump(by_alias=True),
-          to=to)
-
-      # 완료 상태 전송
-      await send_loading(Loading(status="done"))
-
-      logger.info(f"[{self.namespace}] room 응답 결과: {responses}")
+    @sio.event(namespace=self.namespace)
+    async def cancel_summary(sid: str, data: dict):
+      """진행 중인 환자 요약 취소 (jobId 또는 room 지정)"""
+      job_id: Optional[str] = data.get("jobId")
+      if not job_id and data.get("room"):
+        record = await summary_job_store.get_latest(data["room"])
+        job_id = record.job_id if record else None
+
+      record = await summary_job_store.request_cancel(job_id) if job_id else None
+      logger.info(
+          f"[{self.namespace}] cancel_summary - sid: {sid}, job: {job_id}, 취소 요청: {record is not None}")
+      return {"jobId": job_id, "cancelled": record is not None}
 
     @sio.event(namespace=self.namespace)
     async def query_radiology_analysis(sid: str, to: str, data: SummarizePatientRequest):
@@ -118,10 +125,8 @@ class MedicalNamespace(BaseNamespace):
       await send_loading(Loading(status="processing"))
 
       try:
-        result = await medical_graph.workflow.ainvoke({
-            "send_loading": send_loading,
-            "data": data
-        })
+        result = await medical_graph.run_workflow(
+            data, medical_graph.build_run_config(send_loading))
 
         # 방사선 분석 결과만 추출
         radiology_summary = result.get('radiology_summary')
@@ -134,13 +139,29 @@ class MedicalNamespace(BaseNamespace):
             "integrated_radiology_analysis": integrated_radiology.model_dump(by_alias=True) if integrated_radiology else None
         }
 
-        await self.emit_with_ack(
+        await self.emit_with_ack_room(
             "query_radiology_analysis",
             response,
-            to=to)
+            room=to,
+            timeout=settings.SIO_ACK_TIMEOUT_SECONDS)
 
         await send_loading(Loading(status="done"))
 
       except Exception as e:
         logger.error(f"[{self.namespace}] query_radiology_analysis 오류: {str(e)}")
         await self.emit("error", {"message": str(e)}, room=to)
+
+  async def cancel_if_room_empty(self, room: str, exclude_sid: Optional[str] = None) -> None:
+    """room에 남은 참여자가 없으면 room의 진행 중 요약 작업 취소 요청 (EMPTY_ROOM_POLICY=abort일 때만)
+
+    park 정책이면 계속 실행해서 결과를 보관하고, 다시 참여한 클라이언트에게 전달합니다.
+    """
+    if settings.EMPTY_ROOM_POLICY != "abort":
+      return
+    if await self.has_participants(room, exclude_sid=exclude_sid):
+      return
+
+    record = await summary_job_store.get_latest(room)
+    if record and record.is_active:
+      logger.info(f"[{self.namespace}] 빈 room 요약 취소 요청 - room: {room}, job: {record.job_id}")
+      await summary_job_store.request_cancel(record.job_id)
@@ -0,0 +1,110 @@
+"""큰 섹션 입력의 map-reduce 요약
+
+경과기록/간호기록/방사선 판독처럼 입원 기간에 비례해 길어지는 입력이 임계치(추정 토큰)를 넘으면,
+날짜 경계로 나눈 구간(chunk)을 경량 모델로 병렬 요약(map)하고, 노드는 원문 대신 구간 요약을 받아
+기존 응답 형식(ProgressNoteResult 등)으로 최종 요약(reduce)합니다.
+구간 크기가 일정하므로 전체 소요 시간은 기록 길이가 아니라 구간 1개의 요약 시간에 좌우됩니다.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from langchain.agents import create_agent
+from langchain.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from loguru import logger
+
+from src.constants import llm_models
+from src.core import settings
+from src.sio.features.medical.llm_usage import invoke_agent
+from src.utils.format_util import ymd_to_date
+from src.utils.token_util import estimate_tokens
+
+
+MAP_SYSTEM_PROMPT = """당신은 의사입니다. 입원 환자의 {subject} 중 일부 기간의 기록이 주어집니다.
+이 기간의 기록을 나중에 전체 기간 요약에 사용할 수 있도록 정리합니다.
+- 날짜별 주요 변화, 새로 생긴 문제, 시행한 처치/검사와 결과, 이상 소견을 빠짐없이 남깁니다.
+- 반복되는 내용은 한 번만 쓰고 기간을 표시합니다.
+- 기록에 없는 내용은 추정하지 않습니다.
+- 개조식으로 간결하게 작성합니다."""
+
+
+@dataclass
+class Chunk:
+  """날짜 경계로 나눈 기록 구간"""
+  start: str
+  end: str
+  texts: list[str] = field(default_factory=list)
+  tokens: int = 0
+
+
+def map_reduce_threshold(node: str) -> int:
+  """노드의 map-reduce 전환 임계치 (0 이하는 사용 안 함)"""
+  return settings.MAP_REDUCE_THRESHOLDS.get(node, settings.MAP_REDUCE_THRESHOLD_TOKENS)
+
+
+def is_oversized(node: str, texts: Sequence[str]) -> bool:
+  """입력 추정 토큰이 노드의 map-reduce 임계치를 넘는지"""
+  threshold = map_reduce_threshold(node)
+  if threshold <= 0:
+    return False
+  total = 0
+  for text in texts:
+    total += estimate_tokens(text)
+    if total > threshold:
+      return True
+  return False
+
+
+def chunk_by_date(entries: Sequence[tuple[str, str]], max_tokens: int) -> list[Chunk]:
+  """(ymd, 기록) 목록을 날짜 경계에서 max_tokens 이하 구간으로 분할
+
+  같은 날짜의 기록은 한 구간에 두며, 하루 기록만으로 max_tokens를 넘으면 그날 하나가 한 구간이 됩니다.
+  """
+  days: dict[str, list[str]] = {}
+  for ymd, text in sorted(entries, key=lambda entry: entry[0]):
+    days.setdefault(ymd, []).append(text)
+
+  chunks: list[Chunk] = []
+  for ymd, texts in days.items():
+    tokens = sum(map(estimate_tokens, texts))
+    if not chunks or chunks[-1].tokens + tokens > max_tokens:
+      chunks.append(Chunk(start=ymd, end=ymd))
+    chunk = chunks[-1]
+    chunk.end = ymd
+    chunk.texts.extend(texts)
+    chunk.tokens += tokens
+  return chunks
+
+
+async def condense(
+    config: Optional[RunnableConfig],
+    node: str,
+    subject: str,
+    entries: Sequence[tuple[str, str]],
+) -> str:
+  """기록을 구간별로 병렬 요약(map)하여 노드 프롬프트에 넣을 기간별 요약 반환
+
+  Args:
+      config: 그래프 실행 설정 (LLM 사용량 집계)
+      node: 요청한 노드 이름 (로그용)
+      subject: 기록 종류 (예: "경과기록")
+      entries: (ymd, 기록 문자열) 목록
+  """
+  chunks = chunk_by_date(entries, settings.MAP_REDUCE_CHUNK_TOKENS)
+  logger.info(
+      f"[map_reduce] 구간 요약 - node: {node}, 기록: {len(entries)}건, 구간: {len(chunks)}개, "
+      f"구간 최대 토큰: {max((chunk.tokens for chunk in chunks), default=0)}")
+
+  agent = create_agent(model=llm_models.gemini_flash_lite, system_prompt=MAP_SYSTEM_PROMPT.format(subject=subject))
+  slots = asyncio.Semaphore(settings.MAP_REDUCE_CONCURRENCY)
+
+  async def summarize(chunk: Chunk) -> str:
+    period = f"{ymd_to_date(chunk.start)} ~ {ymd_to_date(chunk.end)}"
+    async with slots:
+      response = await invoke_agent(agent, {
+          "messages": [HumanMessage(content=f"# {subject} ({period})\n\n" + "\n\n".join(chunk.texts))]
+      }, config)
+    return f"### {period} ({len(chunk.texts)}건)\n{response['messages'][-1].text}"
+
+  return "\n\n".join(await asyncio.gather(*map(summarize, chunks)))
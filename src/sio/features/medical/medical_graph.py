@@ -1,13 +1,18 @@
-import pandas as pd
+import functools
+import uuid
 
-from typing import Awaitable, Callable, TypedDict
+from typing import Any, Awaitable, Callable, Optional, TypedDict
 
 from langchain.agents import create_agent
 from langchain.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.func import END, START
 from langgraph.graph import StateGraph
+from loguru import logger
 
 from src.constants import llm_models
+from src.core import settings
 
 from src.sio.features.medical.dto.medical_request import DiagnosisRecord, SummarizePatientRequest
 from src.utils.format_util import hm_to_time, ymd_to_date
@@ -23,11 +28,23 @@ from src.sio.features.medical.dto import (
     SurgerySummaryResult,
     ClinicalSummaryResult,
 )
-from src.sio.features.medical.models import NsModels, VsModel, VsModels
+from src.sio.features.medical.compaction import compact_diagnoses, group_by_period
+from src.sio.features.medical.llm_usage import LlmUsage, invoke_agent
+from src.sio.features.medical.map_reduce import condense, is_oversized
+from src.sio.features.medical.note_dedup import collapse_repeats, fit_progress_notes
+from src.sio.features.medical.models import NS_COLUMNS, VS_COLUMNS, NsModels, VsModel, VsModels
+from src.sio.features.medical.prompt_format import FORMAT_DESCRIPTIONS, node_format, render_table
+from src.sio.features.medical.token_budget import TokenBudget, is_abnormal_lab, is_abnormal_vital
+from src.sio.features.medical import sections
+from src.sio.features.medical.sections import Section
+
+
+type SendLoading = Callable[[Loading], Awaitable[None]]
+# 섹션 완료 시 (섹션, 결과) 전송
+type SendSection = Callable[[Section, Any], Awaitable[None]]
 
 
 class MedicalGraphState(TypedDict, total=False):
-  send_loading: Callable[[Loading], Awaitable[None]]
   data: 'Data'
   progress_notes_summary: ProgressNoteResult
   vs_ns_summary: VsNsSummaryResult
@@ -45,7 +62,50 @@ class Data(SummarizePatientRequest, total=False):
 builder = StateGraph[MedicalGraphState](MedicalGraphState)
 
 
-async def create_progressnote_summary(state: MedicalGraphState) -> MedicalGraphState:
+def build_run_config(
+    send_loading: Optional[SendLoading] = None,
+    thread_id: Optional[str] = None,
+    llm_usage: Optional[LlmUsage] = None,
+    reuse_sections: Optional[dict[str, Any]] = None,
+    send_section: Optional[SendSection] = None,
+) -> RunnableConfig:
+  """그래프 실행 설정 생성
+
+  send_loading은 직렬화할 수 없으므로 state가 아닌 configurable로 전달합니다.
+  (체크포인터 사용 시 state는 노드마다 저장됩니다.)
+
+  Args:
+      send_loading: 로딩 상태 전송 함수
+      thread_id: 체크포인트 스레드 id (중단된 실행의 id로 재요청 시 완료되지 않은 노드만 재실행,
+          실행 중인 스레드를 함께 사용하면 안 됨)
+      llm_usage: LLM 호출 사용량 집계 대상
+      reuse_sections: 다시 실행하지 않고 재사용할 섹션 결과 (state 키 -> 이전 결과)
+      send_section: 섹션 결과 전송 함수 (노드가 끝나는 즉시 섹션 결과를 전송)
+  """
+  return {
+      "configurable": {
+          "send_loading": send_loading,
+          "thread_id": thread_id or uuid.uuid4().hex,
+          "llm_usage": llm_usage,
+          "reuse_sections": reuse_sections or {},
+          "send_section": send_section,
+      }
+  }
+
+
+def _render_row(row: dict[str, Any]) -> str:
+  """표 형식 행의 토큰 추정용 문자열"""
+  return " ".join(str(value) for value in row.values() if value not in (None, ""))
+
+
+async def send_loading(config: RunnableConfig, loading: Loading) -> None:
+  """실행 설정에 로딩 전송 함수가 있으면 전송"""
+  sender: Optional[SendLoading] = config.get("configurable", {}).get("send_loading")
+  if sender:
+    await sender(loading)
+
+
+async def create_progressnote_summary(state: MedicalGraphState, config: RunnableConfig) -> MedicalGraphState:
   progressNotes = state.get('data', {}).get('progressNotes', [])
   if not progressNotes:
     return {}
@@ -55,10 +115,26 @@ async def create_progressnote_summary(state: MedicalGraphState) -> MedicalGraphS
   special_notes = (state.get('data', {}) or {}).get('specialNotes', '')
   ward_notes = (state.get('data', {}) or {}).get('wardNotes', '')
 
-  histories = [
-      f"**일시**: {ymd_to_date(r['ymd'])} {hm_to_time(r['time'])}\n**경과기록**: {r['progress']}"
-      for r in progressNotes
-  ]
+  def render_history(r) -> str:
+    return f"**일시**: {ymd_to_date(r['ymd'])} {hm_to_time(r['time'])}\n**경과기록**: {r['progress']}"
+
+  # copy-forward로 반복된 문단은 처음 나온 날짜 참조로 접은 크기로 판단
+  collapsed = collapse_repeats(progressNotes) if settings.PROGRESS_NOTE_COLLAPSE_REPEATS else progressNotes
+  entries = [(r['ymd'], render_history(r)) for r in collapsed]
+  if is_oversized(sections.PROGRESS_NOTES.node, [text for _, text in entries]):
+    # 기록이 길면 기간별 요약(map)을 받아 최종 요약(reduce)
+    history_heading = "# 경과기록 (기간별 요약)"
+    progressnote_history_text = await condense(config, sections.PROGRESS_NOTES.node, "경과기록", entries)
+  else:
+    # 최근 기록부터 토큰 예산 안에서 포함
+    budget = TokenBudget(sections.PROGRESS_NOTES.node)
+    kept, notes = fit_progress_notes(
+        budget, progressNotes, render_history,
+        collapsed=collapsed if settings.PROGRESS_NOTE_COLLAPSE_REPEATS else None)
+    budget.record(config)
+    history_heading = f"# 경과기록{notes.note('경과기록')}"
+    progressnote_history_text = "\n\n---\n".join(render_history(r) for r in kept)
+
   agent = create_agent(
       model=llm_models.gemini_flash_lite,
       response_format=ProgressNoteResult,
@@ -70,20 +146,18 @@ async def create_progressnote_summary(state: MedicalGraphState) -> MedicalGraphS
 - 병동 참고사항: {ward_notes or '없음'}
 """
 
-  progressnote_history_text = "\n\n---\n".join(histories)
-  response = await agent.ainvoke({
-      "messages": [HumanMessage(content=f"""{input_notes_context}\n\n---\n# 경과기록\n{progressnote_history_text}""")]
-  })
+  response = await invoke_agent(agent, {
+      "messages": [HumanMessage(content=f"""{input_notes_context}\n\n---\n{history_heading}\n{progressnote_history_text}""")]
+  }, config)
 
   result: ProgressNoteResult = response['structured_response']
 
-  if 'send_loading' in state:
-    await state['send_loading'](Loading(complete_target="progress_notes"))
+  await send_loading(config, Loading(complete_target="progress_notes"))
 
   return {"progress_notes_summary": result}
 
 
-async def create_surgery_summary(state: MedicalGraphState) -> MedicalGraphState:
+async def create_surgery_summary(state: MedicalGraphState, config: RunnableConfig) -> MedicalGraphState:
   """경과기록 내 수술/술전/술후 기록을 추출해 급성기 진료 의사에게 유용한 요약을 생성"""
 
   progress_notes = state.get('data', {}).get('progressNotes', [])
@@ -120,11 +194,14 @@ async def create_surgery_summary(state: MedicalGraphState) -> MedicalGraphState:
   merged = surgery_related + [r for r in recent_fallback if r not in surgery_related]
   merged = sorted(merged, key=lambda x: (x.get('ymd', ''), x.get('time', '')))
 
-  histories = [
-      f"**일시**: {ymd_to_date(r['ymd'])} {hm_to_time(r['time'])}\n**기록**: {r['progress']}"
-      for r in merged
-      if r.get('ymd') and r.get('time')
-  ]
+  def render_history(r) -> str:
+    return f"**일시**: {ymd_to_date(r['ymd'])} {hm_to_time(r['time'])}\n**기록**: {r['progress']}"
+
+  # 경과기록이 예산 대부분을 쓰고, 남은 예산으로 바이탈(이상값 우선) 포함
+  budget = TokenBudget(sections.SURGERY.node)
+  kept, notes = fit_progress_notes(
+      budget, [r for r in merged if r.get('ymd') and r.get('time')], render_history, share=0.8)
+  histories = [render_history(r) for r in kept]
   progress_text = "\n\n---\n".join(histories) if histories else "수술 관련 경과기록 없음"
 
   patient_context = f"""
@@ -164,10 +241,13 @@ async def create_surgery_summary(state: MedicalGraphState) -> MedicalGraphState:
     medication_context = "\n".join(meds)
 
   vital_signs_context = "없음"
-  if vss:
+  vital_signs = budget.fit(
+      "vitalSigns", vss, _render_row, recency=lambda vs: (vs['ymd'], vs['time']), priority=is_abnormal_vital)
+  budget.record(config)
+  if vital_signs.kept:
     vs_list = VsModels()
-    vs_list.add_recently_from_vss(vss)
-    vital_signs_context = vs_list.get_markdown_table()
+    vs_list.add_recently_from_vss(vital_signs.kept)
+    vital_signs_context = vs_list.to_prompt(node_format(sections.SURGERY.node))
 
   lab_context = "없음"
   if labs:
@@ -207,7 +287,7 @@ async def create_surgery_summary(state: MedicalGraphState) -> MedicalGraphState:
       response_format=SurgerySummaryResult,
       system_prompt=system_prompt)
 
-  response = await agent.ainvoke({
+  response = await invoke_agent(agent, {
       "messages": [HumanMessage(content=f"""
 {patient_context}
 
@@ -222,7 +302,7 @@ async def create_surgery_summary(state: MedicalGraphState) -> MedicalGraphState:
 {medication_context}
 
 ---
-# 활력징후(요약표)
+# 활력징후(요약표){vital_signs.note("활력징후")}
 {vital_signs_context}
 
 ---
@@ -230,38 +310,56 @@ async def create_surgery_summary(state: MedicalGraphState) -> MedicalGraphState:
 {lab_context}
 
 ---
-# 경과기록(수술 관련 추정 + 최근 보강)
+# 경과기록(수술 관련 추정 + 최근 보강){notes.note("경과기록")}
 {progress_text}
 """.strip())]
-  })
+  }, config)
 
   result: SurgerySummaryResult = response['structured_response']
 
-  if 'send_loading' in state:
-    await state['send_loading'](Loading(complete_target="surgery"))
+  await send_loading(config, Loading(complete_target="surgery"))
 
   return {"surgery_summary": result}
 
 
-async def create_ns_vs_summary(state: MedicalGraphState) -> MedicalGraphState:
-  # ? === vs ===
+async def create_ns_vs_summary(state: MedicalGraphState, config: RunnableConfig) -> MedicalGraphState:
   vss = state.get('data', {}).get('vitalSigns', [])
-  recent_vs = VsModel()
-  recent_vs.add_recently_from_vss(vss)
-
-  vs_list = VsModels()
-  vs_list.add_recently_from_vss(vss)
-  vs_list_md = vs_list.get_markdown_table()
-
-  # ? === ns ===
   nss = state.get('data', {}).get('nursingRecords', [])
-  ns_list = NsModels()
-  ns_list.add_from_nss(nss)
-  ns_list_md = ns_list.get_markdown_table()
-
   if not vss and not nss:
     return {}
 
+  table_format = node_format(sections.NS_VS.node)
+  if is_oversized(sections.NS_VS.node, [*map(_render_row, vss), *map(_render_row, nss)]):
+    # 기록이 길면 기간별 요약(map)을 받아 최종 요약(reduce)
+    input_description = "기간별로 요약한 기록"
+    records_context = await _condense_ns_vs(config, vss, nss)
+  else:
+    # 바이탈(이상값 우선)이 예산의 절반까지, 간호기록이 나머지 사용
+    input_description = f"각각 {FORMAT_DESCRIPTIONS[table_format]} 형식"
+    budget = TokenBudget(sections.NS_VS.node)
+    # ? === vs ===
+    vital_signs = budget.fit(
+        "vitalSigns", vss, _render_row, recency=lambda vs: (vs['ymd'], vs['time']),
+        priority=is_abnormal_vital, share=0.5)
+    vs_list = VsModels()
+    vs_list.add_recently_from_vss(vital_signs.kept)
+
+    # ? === ns === (연속으로 반복된 간호 문제/처치는 기간/횟수로 합친 뒤 예산 적용)
+    ns_list = NsModels()
+    ns_list.add_from_nss(nss)
+    nursing_records = budget.fit(
+        "nursingRecords", ns_list, lambda ns: _render_row(ns.to_row()),
+        recency=lambda ns: (ns.end_date or ns.date, ns.time))
+    budget.record(config)
+    ns_list = NsModels(nursing_records.kept)
+
+    records_context = f"""# 활력징후 기록{vital_signs.note("활력징후")}
+{vs_list.to_prompt(table_format)}
+
+---
+# 간호기록{nursing_records.note("간호기록")}
+{ns_list.to_prompt(table_format)}"""
+
   # 추가 입력 메모
   main_symptoms = (state.get('data', {}) or {}).get('mainSymptoms', '')
   special_notes = (state.get('data', {}) or {}).get('specialNotes', '')
@@ -270,7 +368,7 @@ async def create_ns_vs_summary(state: MedicalGraphState) -> MedicalGraphState:
   agent = create_agent(
       model=llm_models.gemini_flash,
       response_format=VsNsSummaryResult,
-      system_prompt="""당신은 의사입니다.
+      system_prompt=f"""당신은 의사입니다.
 환자의 활력징후와 간호기록을 다음 내용을 작성합니다.
 - 바이탈 사인 종합 요약 정보
 - 간호기록 종합 요약 정보
@@ -279,7 +377,7 @@ async def create_ns_vs_summary(state: MedicalGraphState) -> MedicalGraphState:
 - 전체 임상 평가
 - 주요 소견
 
-활력징후와 간호기록은 각각 마크다운 표 형식으로 제공됩니다.""")
+활력징후와 간호기록은 {input_description}으로 제공됩니다.""")
 
   input_notes_context = f"""# 추가 입력 메모
 - 주요증상: {main_symptoms or '없음'}
@@ -287,24 +385,32 @@ async def create_ns_vs_summary(state: MedicalGraphState) -> MedicalGraphState:
 - 병동 참고사항: {ward_notes or '없음'}
 """
 
-  response = await agent.ainvoke({
-      "messages": [HumanMessage(content=f"""{input_notes_context}\n\n---\n# 활력징후 기록
-{vs_list_md}
-
----
-# 간호기록
-{ns_list_md}""")]
-  })
+  response = await invoke_agent(agent, {
+      "messages": [HumanMessage(content=f"""{input_notes_context}\n\n---\n{records_context}""")]
+  }, config)
 
   result: VsNsSummaryResult = response['structured_response']
 
-  if 'send_loading' in state:
-    await state['send_loading'](Loading(complete_target="ns_vs"))
+  await send_loading(config, Loading(complete_target="ns_vs"))
 
   return {"vs_ns_summary": result}
 
 
-async def create_prescription_summary(state: MedicalGraphState) -> MedicalGraphState:
+async def _condense_ns_vs(config: RunnableConfig, vss: list, nss: list) -> str:
+  """활력징후와 간호기록을 날짜 구간별로 함께 요약 (map)"""
+  vs_list = VsModels()
+  vs_list.add_recently_from_vss(vss)
+  ns_list = NsModels()
+  ns_list.add_from_nss(nss)
+  entries = [
+      (vs.date, f"[활력징후] {render_table([vs.model_dump()], 'kv', columns=VS_COLUMNS)}") for vs in vs_list]
+  entries += [
+      (ns.date, f"[간호기록] {render_table([ns.to_row()], 'kv', columns=NS_COLUMNS)}") for ns in ns_list]
+  condensed = await condense(config, sections.NS_VS.node, "활력징후와 간호기록", entries)
+  return f"# 활력징후 및 간호기록 (기간별 요약)\n{condensed}"
+
+
+async def create_prescription_summary(state: MedicalGraphState, config: RunnableConfig) -> MedicalGraphState:
   medications = state.get('data', {}).get('medications', [])
   diagnosis_records = state.get('data', {}).get('diagnosisRecords', [])
   patient_info = state.get('data', {}).get('patientInfo', {})
@@ -325,25 +431,40 @@ async def create_prescription_summary(state: MedicalGraphState) -> MedicalGraphS
   """.strip()
 
   # 약물 정보를 마크다운 포맷으로 변환
-  medication_details = []
-  for med in medications:
-    med_info = f"""### {med['medicationName']}
+  def render_medication(med) -> str:
+    return f"""### {med['medicationName']}
 - **투여 기간**: {med['sYmd']} ~ {med['eYmd']} ({med['totalDays']}일)
 - **일회투약량**: {med['dose']}
 - **횟수**: {med['frequency']}회/일
 - **용법**: {med['administration']}
 - **참고사항**: {med['note'] or '없음'}"""
-    medication_details.append(med_info)
 
-  medications_text = "\n\n".join(medication_details)
+  # 진행 중인(가장 늦은 종료일까지 투약하는) 약물 우선, 그다음 최근 종료 순으로 예산의 70%까지 포함
+  budget = TokenBudget(sections.PRESCRIPTIONS.node)
+  last_ymd = max((med['eYmd'] for med in medications), default="")
+  prescribed = budget.fit(
+      "medications", medications, render_medication,
+      recency=lambda med: (med['eYmd'], med['sYmd']), priority=lambda med: med['eYmd'] >= last_ymd, share=0.7)
+  medications_text = "\n\n".join(render_medication(med) for med in prescribed.kept)
 
   # 진단 정보를 마크다운 포맷으로 변환
-  diagnosis_info = []
-  for diag_record in diagnosis_records:
+  def render_diagnosis(diag_record) -> str:
     diagnoses_str = ", ".join(
         [f"{d['diagnosisName']} ({d['icdCode']})" for d in diag_record['diagnoses']])
-    diagnosis_info.append(f"**{diag_record['ymd']}**: {diagnoses_str}")
+    return f"**{diag_record['ymd']}**: {diagnoses_str}"
+
+  # (마지막 일자, 진단 줄) 목록
+  if settings.RUN_LENGTH_COMPACTION:
+    # 연속으로 반복된 진단은 기간/횟수로 합치고, 기간이 같은 진단끼리 한 줄로 표시
+    diagnosis_lines = [
+        (run.end, f"**{run.period}**: " + ", ".join(f"{r.diagnosis_name} ({r.icd_code})" for r in group))
+        for run, group in group_by_period(compact_diagnoses(diagnosis_records))]
+  else:
+    diagnosis_lines = [(diag_record['ymd'], render_diagnosis(diag_record)) for diag_record in diagnosis_records]
 
+  diagnosed = budget.fit("diagnosisRecords", diagnosis_lines, lambda line: line[1], recency=lambda line: line[0])
+  budget.record(config)
+  diagnosis_info = [line for _, line in diagnosed.kept]
   diagnoses_text = "\n".join(diagnosis_info) if diagnosis_info else "진단 기록 없음"
 
   system_prompt = """당신은 임상약학 전문가이자 의약학 박사입니다.
@@ -370,7 +491,7 @@ async def create_prescription_summary(state: MedicalGraphState) -> MedicalGraphS
 - 병동 참고사항: {ward_notes or '없음'}
 """
 
-  response = await agent.ainvoke({
+  response = await invoke_agent(agent, {
       "messages": [HumanMessage(content=f"""
 {input_notes_context}
 
@@ -379,23 +500,22 @@ async def create_prescription_summary(state: MedicalGraphState) -> MedicalGraphS
 {patient_info_text}
 
 ---
-# 투약 약물 정보
+# 투약 약물 정보{prescribed.note("약물")}
 {medications_text}
 
 ---
-# 진단 기록
+# 진단 기록{diagnosed.note("진단 기록")}
 {diagnoses_text}""".strip())]
-  })
+  }, config)
 
   result: PrescriptionSummaryResult = response['structured_response']
 
-  if 'send_loading' in state:
-    await state['send_loading'](Loading(complete_target="prescriptions"))
+  await send_loading(config, Loading(complete_target="prescriptions"))
 
   return {"prescription_summary": result}
 
 
-async def create_lab_summary(state: MedicalGraphState) -> MedicalGraphState:
+async def create_lab_summary(state: MedicalGraphState, config: RunnableConfig) -> MedicalGraphState:
   labs = state.get('data', {}).get('labs', [])
   patient_info = state.get('data', {}).get('patientInfo', {})
   diagnosis_records: list[DiagnosisRecord] = state.get(
@@ -416,31 +536,47 @@ async def create_lab_summary(state: MedicalGraphState) -> MedicalGraphState:
 - 나이: {patient_info.get('age', '')}
   """.strip()
 
+  table_format = node_format(sections.LABS.node)
+
   # === 진단 정보 ===
-  # 진단 기록을 마크다운 테이블로 변환
+  # 진단 기록을 표로 변환 ((마지막 일자, 행) 목록)
   diagnosis_rows = []
-  for diagnosis in diagnosis_records:
-    ymd = diagnosis.get('ymd', '')
-    diagnoses = diagnosis.get('diagnoses', [])
-    for diag in diagnoses:
-      icd_code = diag.get('icdCode', '')
-      diagnosis_name = diag.get('diagnosisName', '')
-      diagnosis_rows.append({'일자': ymd, 'ICD 코드': icd_code, '진단명': diagnosis_name})
-
-  if diagnosis_rows:
-    df_diag = pd.DataFrame(diagnosis_rows)
-    diagnoses_text = df_diag.to_markdown(index=False)
+  if settings.RUN_LENGTH_COMPACTION:
+    # 연속으로 반복된 진단은 기간/횟수로 합침
+    for run in compact_diagnoses(diagnosis_records):
+      diagnosis_rows.append(
+          (run.end, {'ymd': run.period, 'icdCode': run.icd_code, 'diagnosisName': run.diagnosis_name}))
+  else:
+    for diagnosis in diagnosis_records:
+      ymd = diagnosis.get('ymd', '')
+      diagnoses = diagnosis.get('diagnoses', [])
+      for diag in diagnoses:
+        icd_code = diag.get('icdCode', '')
+        diagnosis_name = diag.get('diagnosisName', '')
+        diagnosis_rows.append((ymd, {'ymd': ymd, 'icdCode': icd_code, 'diagnosisName': diagnosis_name}))
+
+  # 검사(이상값 우선, 최근 순)가 예산의 80%까지, 진단이 나머지 사용
+  budget = TokenBudget(sections.LABS.node)
+  selected_labs = budget.fit(
+      "labs", labs, _render_row, recency=lambda lab: lab['ymd'], priority=is_abnormal_lab, share=0.8)
+  selected_diagnoses = budget.fit(
+      "diagnoses", diagnosis_rows, lambda pair: _render_row(pair[1]), recency=lambda pair: pair[0])
+  budget.record(config)
+
+  if selected_diagnoses.kept:
+    diagnoses_text = render_table(
+        [row for _, row in selected_diagnoses.kept], table_format,
+        columns={'ymd': '일자', 'icdCode': 'ICD 코드', 'diagnosisName': '진단명'}, date_key='ymd')
   else:
     diagnoses_text = "진단 기록 없음"
  
   # === 검사 목록 ===
   latest_test_date = max(lab['ymd'] for lab in labs)
 
-  # 검사 목록 Markdown으로 변환
-  df = pd.DataFrame([lab for lab in labs])
-  df = df.rename(columns={
-      "ymd": "검사일자(yyyyMMdd)"})
-  labs_markdown = df.to_markdown(index=False)
+  # 검사 목록을 표로 변환
+  lab_columns = {key: key for lab in labs for key in lab}
+  lab_columns["ymd"] = "검사일자(yyyyMMdd)"
+  labs_markdown = render_table(selected_labs.kept, table_format, columns=lab_columns, date_key="ymd")
 
   system_prompt = """당신은 임상병리사이자 의료 데이터 분석 전문가입니다.
 환자의 검사 결과를 분석하여 다음 사항들을 평가합니다:
@@ -466,7 +602,7 @@ async def create_lab_summary(state: MedicalGraphState) -> MedicalGraphState:
 - 병동 참고사항: {ward_notes or '없음'}
 """
 
-  response = await agent.ainvoke({
+  response = await invoke_agent(agent, {
       "messages": [HumanMessage(content=f"""
 {input_notes_context}
 
@@ -475,11 +611,11 @@ async def create_lab_summary(state: MedicalGraphState) -> MedicalGraphState:
 {patient_info_text}
 
 ---
-# 최근 진단
+# 최근 진단{selected_diagnoses.note("진단")}
 {diagnoses_text}
 
 ---
-# 검사 결과
+# 검사 결과{selected_labs.note("검사 결과")}
 {labs_markdown}
 
 ---
@@ -495,17 +631,16 @@ async def create_lab_summary(state: MedicalGraphState) -> MedicalGraphState:
 - test_count: {len(labs)}
 - major_labs: 주요 검사 그룹 (일자별 분류)
 """.strip())]
-  })
+  }, config)
 
   result: LabSummaryResult = response['structured_response']
-  if 'send_loading' in state:
-    await state['send_loading'](Loading(complete_target="labs"))
+  await send_loading(config, Loading(complete_target="labs"))
 
   return {"lab_summary": result}
 
 # ! === 방사선 판독 분석 통합 노드 === #
 
-async def create_radiology_analysis_summary(state: MedicalGraphState) -> MedicalGraphState:
+async def create_radiology_analysis_summary(state: MedicalGraphState, config: RunnableConfig) -> MedicalGraphState:
   """방사선 판독 분석 통합 (단일 + 진행 + 통합 분석) - 1번의 AI 호출로 수행"""
   reports: list[RadiologyReport] = state.get('data', {}).get('radiologyReports', [])
   if not reports:
@@ -535,8 +670,19 @@ async def create_radiology_analysis_summary(state: MedicalGraphState) -> Medical
   
   # 2. 진행 추이 분석용 데이터
   progression_context = ""
-  if len(reports) >= 2:
-    sorted_reports = sorted(reports, key=lambda x: x['ymd'])
+  sorted_reports = sorted(reports, key=lambda x: x['ymd'])
+  report_entries = [
+      (r['ymd'], f"{r['ymd']} {r['time']} - {r['modality']} ({r['examType']})\n   **임상소견**: {r['findings']}")
+      for r in sorted_reports]
+  condensed_reports = None
+  if is_oversized(sections.RADIOLOGY.node, [text for _, text in report_entries]):
+    # 판독이 많으면 기간별 요약(map)을 진행 추이/전체 판독 목록 대신 사용
+    condensed_reports = await condense(config, sections.RADIOLOGY.node, "방사선 판독 결과", report_entries)
+    progression_context = f"""
+## [진행 추이 분석 데이터]
+검사 기록 기간별 요약 (시간순, 총 {len(reports)}건):
+{condensed_reports}"""
+  elif len(reports) >= 2:
     progression_context = "\n## [진행 추이 분석 데이터]\n검사 기록 (시간순):\n"
     for i, r in enumerate(sorted_reports, 1):
       progression_context += f"""
@@ -546,10 +692,18 @@ async def create_radiology_analysis_summary(state: MedicalGraphState) -> Medical
   
   # 3. 통합 임상 분석용 데이터
   # 활력징후 정보
+  # 입원 기간이 길면 바이탈이 프롬프트 대부분을 차지하므로 예산 안에서 이상값/최근 측정 우선
   vss = state.get('data', {}).get('vitalSigns', [])
-  vs_list = VsModels()
-  vs_list.add_recently_from_vss(vss)
-  vital_signs_context = vs_list.get_markdown_table() if vss else "없음"
+  budget = TokenBudget(sections.RADIOLOGY.node)
+  vital_signs = budget.fit(
+      "vitalSigns", vss, _render_row, recency=lambda vs: (vs['ymd'], vs['time']), priority=is_abnormal_vital,
+      share=0.5)
+  budget.record(config)
+  vital_signs_context = "없음"
+  if vital_signs.kept:
+    vs_list = VsModels()
+    vs_list.add_recently_from_vss(vital_signs.kept)
+    vital_signs_context = vs_list.to_prompt(node_format(sections.RADIOLOGY.node))
   
   # 혈액검사 정보
   labs = state.get('data', {}).get('labs', [])
@@ -559,8 +713,6 @@ async def create_radiology_analysis_summary(state: MedicalGraphState) -> Medical
   medications = state.get('data', {}).get('medications', [])
   medication_context = "\n".join([f"- {med['medicationName']}: {med['dose']} x {med['frequency']}회/일" for med in medications[:10]]) if medications else "없음"
   
-  sorted_reports = sorted(reports, key=lambda x: x['ymd'])
-  
   # === 통합 프롬프트 구성 ===
   input_notes_context = f"""## 추가 입력 메모
 - 주요증상: {main_symptoms or '없음'}
@@ -579,7 +731,7 @@ async def create_radiology_analysis_summary(state: MedicalGraphState) -> Medical
 {input_notes_context}
 
 ## [통합 임상 분석 데이터]
-### 활력징후
+### 활력징후{vital_signs.note("활력징후")}
 {vital_signs_context}
 
 ### 혈액 검사
@@ -591,8 +743,11 @@ async def create_radiology_analysis_summary(state: MedicalGraphState) -> Medical
 ### 모든 방사선 판독 결과 (시간순)
 """
   
-  for i, r in enumerate(sorted_reports, 1):
-    unified_prompt += f"""
+  if condensed_reports:
+    unified_prompt += "\n진행 추이 분석 데이터의 기간별 요약 참조\n"
+  else:
+    for i, r in enumerate(sorted_reports, 1):
+      unified_prompt += f"""
 {i}. {r['ymd']} - {r['modality']} ({r['examType']})
    **임상소견**: {r['findings']}
 """
@@ -636,19 +791,18 @@ async def create_radiology_analysis_summary(state: MedicalGraphState) -> Medical
 - progression 필드: 검사 기록이 1개이면 null로 반환, 2개 이상이면 작성
 - summary와 integrated_analysis: 항상 작성""")
   
-  response = await agent.ainvoke({
+  response = await invoke_agent(agent, {
       "messages": [HumanMessage(content=unified_prompt)]
-  })
+  }, config)
    
-  if 'send_loading' in state:
-    await state['send_loading'](Loading(complete_target="radiology"))
+  await send_loading(config, Loading(complete_target="radiology"))
   
   return {"radiology_summary":  response['structured_response']}
 
 
 # ! === 종합 임상 요약 노드 (최종 병합) === #
 
-async def create_clinical_summary(state: MedicalGraphState) -> MedicalGraphState:
+async def create_clinical_summary(state: MedicalGraphState, config: RunnableConfig) -> MedicalGraphState:
   """모든 분석 결과를 통합하여 진료실용 종합 임상 요약 생성"""
   from datetime import datetime
   
@@ -696,12 +850,12 @@ async def create_clinical_summary(state: MedicalGraphState) -> MedicalGraphState
 - 병동 참고사항: {ward_notes or '없음'}
 """.strip()
   
-  # 각 분석 결과 요약 컨텍스트 구성
-  analysis_context = ""
+  # 각 분석 결과 요약 컨텍스트 구성 (섹션별 블록, 토큰 예산을 넘으면 뒤 섹션부터 생략)
+  analysis_blocks: list[str] = []
   
   # 1. 경과기록 요약
   if progress_notes:
-    analysis_context += f"""
+    analysis_blocks.append(f"""
 ---
 ## 경과기록 분석 결과
 - **요약**: {progress_notes.summary}
@@ -713,11 +867,11 @@ async def create_clinical_summary(state: MedicalGraphState) -> MedicalGraphState
   - Assessment: {progress_notes.soap.assessment or '없음'}
   - Plan: {progress_notes.soap.plan or '없음'}
 - **주의사항**: {progress_notes.precautions or '없음'}
-"""
+""")
   
   # 2. 활력징후/간호기록 요약
   if vs_ns:
-    analysis_context += f"""
+    analysis_blocks.append(f"""
 ---
 ## 활력징후 및 간호기록 분석 결과
 - **VS 점수**: {vs_ns.vs_score}/5
@@ -726,13 +880,13 @@ async def create_clinical_summary(state: MedicalGraphState) -> MedicalGraphState
 - **전반적 위험도**: {vs_ns.overall_risk_level}
 - **핵심 권고**: {vs_ns.key_recommendation}
 - **임상 예측**:
-"""
+""")
     for pred in vs_ns.clinical_predictions[:3]:
-      analysis_context += f"  - [{pred.timeframe}] {pred.predicted_risk}: {pred.recommended_action}\n"
+      analysis_blocks[-1] += f"  - [{pred.timeframe}] {pred.predicted_risk}: {pred.recommended_action}\n"
   
   # 3. 처방 분석 요약
   if prescription:
-    analysis_context += f"""
+    analysis_blocks.append(f"""
 ---
 ## 처방/투약 분석 결과
 - **약물 부담 지수**: {prescription.medication_burden_index}/100
@@ -743,13 +897,13 @@ async def create_clinical_summary(state: MedicalGraphState) -> MedicalGraphState
 - **종합 평가**: {prescription.overall_assessment}
 - **숨은 위험 신호**: {', '.join(prescription.hidden_risk_signals[:3]) if prescription.hidden_risk_signals else '없음'}
 - **우선 권고**:
-"""
+""")
     for rec in prescription.priority_recommendations[:3]:
-      analysis_context += f"  - {rec}\n"
+      analysis_blocks[-1] += f"  - {rec}\n"
   
   # 4. 검사 결과 요약
   if lab:
-    analysis_context += f"""
+    analysis_blocks.append(f"""
 ---
 ## 검사 결과 분석
 - **검사 위험도**: {lab.lab_risk_level}
@@ -758,13 +912,13 @@ async def create_clinical_summary(state: MedicalGraphState) -> MedicalGraphState
 - **종합 평가**: {lab.overall_assessment}
 - **우선 권고**: {lab.priority_recommendation}
 - **이상 항목 알림**:
-"""
+""")
     for alert in lab.abnormality_alerts[:3]:
-      analysis_context += f"  - [{alert.priority}] {alert.test_name}: {alert.result_value} ({alert.clinical_significance})\n"
+      analysis_blocks[-1] += f"  - [{alert.priority}] {alert.test_name}: {alert.result_value} ({alert.clinical_significance})\n"
   
   # 5. 영상 판독 요약
   if radiology and radiology.summary:
-    analysis_context += f"""
+    analysis_blocks.append(f"""
 ---
 ## 영상 판독 분석 결과
 - **주요 소견**: {radiology.summary.main_finding}
@@ -772,24 +926,24 @@ async def create_clinical_summary(state: MedicalGraphState) -> MedicalGraphState
 - **진행 분석**: {radiology.summary.progression_analysis}
 - **긴급 소견**: {', '.join(radiology.summary.urgent_findings) if radiology.summary.urgent_findings else '없음'}
 - **임상 의견**: {radiology.summary.clinical_opinion}
-"""
+""")
     if radiology.integrated_analysis:
-      analysis_context += f"""- **통합 위험도**: {radiology.integrated_analysis.risk_level}
+      analysis_blocks[-1] += f"""- **통합 위험도**: {radiology.integrated_analysis.risk_level}
 - **통합 임상 의견**: {radiology.integrated_analysis.integrated_clinical_opinion}
 """
 
   # 6. 수술/술전/술후 요약
   if surgery and surgery.has_surgery_related_content:
-    analysis_context += f"""
+    analysis_blocks.append(f"""
 ---
 ## 수술/술전/술후 요약
 - **한 줄 요약**: {surgery.one_liner}
 - **개요**: {surgery.overview}
 - **즉시 조치**: {', '.join(surgery.immediate_actions[:5]) if surgery.immediate_actions else '없음'}
 - **주요 위험**:
-"""
+""")
     for risk in surgery.key_risks[:5]:
-      analysis_context += f"  - [{risk.severity}] ({risk.category}) {risk.message} / 조치: {risk.recommended_action or '확인 필요'}\n"
+      analysis_blocks[-1] += f"  - [{risk.severity}] ({risk.category}) {risk.message} / 조치: {risk.recommended_action or '확인 필요'}\n"
 
   system_prompt = """당신은 대학병원 수석 전문의이자 임상 의사결정 지원 전문가입니다.
 여러 임상 데이터 분석 결과를 통합하여 진료실 의료진이 즉시 활용할 수 있는 종합 임상 요약을 작성합니다.
@@ -822,11 +976,17 @@ ClinicalSummaryResult 스키마를 정확히 따라 작성하세요.
       response_format=ClinicalSummaryResult,
       system_prompt=system_prompt)
 
-  response = await agent.ainvoke({
+  budget = TokenBudget(sections.CLINICAL.node)
+  analysis = budget.fit(
+      "sections", list(enumerate(analysis_blocks)), lambda block: block[1], recency=lambda block: -block[0])
+  budget.record(config)
+  analysis_context = "".join(block for _, block in analysis.kept)
+
+  response = await invoke_agent(agent, {
       "messages": [HumanMessage(content=f"""
 {patient_context}
 
-# 분석 결과 통합
+# 분석 결과 통합{analysis.note("분석 결과")}
 
 사용 가능한 데이터 소스: {', '.join(data_sources)}
 데이터 완전성: {data_completeness}
@@ -842,27 +1002,56 @@ ClinicalSummaryResult 스키마를 정확히 따라 작성하세요.
 진료실 의료진이 환자를 보기 직전 1분 내에 전체 상황을 파악하고 
 핵심 조치사항을 인지할 수 있도록 작성해주세요.
 """.strip())]
-  })
+  }, config)
   
   result: ClinicalSummaryResult = response['structured_response']
   
-  if 'send_loading' in state:
-    await state['send_loading'](Loading(complete_target="clinical_summary"))
+  await send_loading(config, Loading(complete_target="clinical_summary"))
   
   return {"clinical_summary": result}
 
 
+type Node = Callable[[MedicalGraphState, RunnableConfig], Awaitable[MedicalGraphState]]
+
+
+def section_node(section: Section, node: Node) -> Node:
+  """재사용할 이전 결과가 실행 설정에 있으면 LLM 호출 없이 그 결과를 반환하는 노드
+
+  섹션별 입력 항목 선언은 sections.py에 있으며, 재사용 여부는 입력 fingerprint로 결정합니다.
+  실행 설정에 send_section이 있으면 섹션 결과를 최종 응답을 기다리지 않고 바로 전송합니다.
+  """
+  @functools.wraps(node)
+  async def run(state: MedicalGraphState, config: RunnableConfig) -> MedicalGraphState:
+    configurable = config.get("configurable", {})
+    reused = configurable.get("reuse_sections", {}).get(section.result_key)
+    if reused is None:
+      update = await node(state, config)
+      if update.get(section.result_key) is None:
+        # 입력이 없어 결과 없이 끝난 노드도 완료로 알려야 진행률/남은 시간이 수렴
+        await send_loading(config, Loading(complete_target=section.target))
+    else:
+      logger.info(f"[medical_graph] 이전 결과 재사용 - node: {section.node}")
+      await send_loading(config, Loading(complete_target=section.target))
+      update = {section.result_key: reused}
+
+    sender: Optional[SendSection] = configurable.get("send_section")
+    if sender and update.get(section.result_key) is not None:
+      await sender(section, update[section.result_key])
+    return update
+  return run
+
+
 # ! === Define the workflow structure === #
 # 병렬 처리 노드
-builder.add_node('create_progressnote_summary', create_progressnote_summary)
-builder.add_node('create_surgery_summary', create_surgery_summary)
-builder.add_node('create_ns_vs_summary', create_ns_vs_summary)
-builder.add_node('create_prescription_summary', create_prescription_summary)
-builder.add_node('create_lab_summary', create_lab_summary)
-builder.add_node('create_radiology_analysis_summary', create_radiology_analysis_summary)
+builder.add_node(sections.PROGRESS_NOTES.node, section_node(sections.PROGRESS_NOTES, create_progressnote_summary))
+builder.add_node(sections.SURGERY.node, section_node(sections.SURGERY, create_surgery_summary))
+builder.add_node(sections.NS_VS.node, section_node(sections.NS_VS, create_ns_vs_summary))
+builder.add_node(sections.PRESCRIPTIONS.node, section_node(sections.PRESCRIPTIONS, create_prescription_summary))
+builder.add_node(sections.LABS.node, section_node(sections.LABS, create_lab_summary))
+builder.add_node(sections.RADIOLOGY.node, section_node(sections.RADIOLOGY, create_radiology_analysis_summary))
 
 # 최종 통합 노드
-builder.add_node('create_clinical_summary', create_clinical_summary)
+builder.add_node(sections.CLINICAL.node, section_node(sections.CLINICAL, create_clinical_summary))
 
 # 시작 -> 병렬 처리
 builder.add_edge(START, 'create_progressnote_summary')
@@ -884,3 +1073,37 @@ builder.add_edge('create_radiology_analysis_summary', 'create_clinical_summary')
 builder.add_edge('create_clinical_summary', END)
 
 workflow = builder.compile()
+
+
+def compile_workflow(checkpointer: Optional[BaseCheckpointSaver] = None) -> None:
+  """체크포인터를 지정하여 workflow 재컴파일 (애플리케이션 시작 시 1회)"""
+  global workflow
+  workflow = builder.compile(checkpointer=checkpointer)
+
+
+def checkpointing_enabled() -> bool:
+  return workflow.checkpointer is not None
+
+
+async def delete_thread(config: RunnableConfig) -> None:
+  """완료된 실행의 체크포인트 스레드 삭제 (체크포인트에 남은 환자 정보 정리)"""
+  if workflow.checkpointer:
+    await workflow.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+
+
+async def run_workflow(data: 'Data', config: RunnableConfig) -> MedicalGraphState:
+  """workflow 실행
+
+  체크포인터가 있고 같은 thread_id의 이전 실행이 중간에 멈췄다면(다음 노드가 남아 있으면)
+  처음부터 다시 시작하지 않고 완료되지 않은 노드만 이어서 실행합니다.
+  thread_id는 작업마다 새로 만들고, 중단이 확인된 작업의 스레드만 넘겨받아야 합니다
+  (SummaryJobStore.claim_thread).
+  """
+  if workflow.checkpointer:
+    snapshot = await workflow.aget_state(config)
+    if snapshot.next:
+      logger.info(
+          f"[medical_graph] 체크포인트에서 재개 - thread: {config['configurable']['thread_id']}, next: {snapshot.next}")
+      return await workflow.ainvoke(None, config)
+
+  return await workflow.ainvoke({"data": data}, config)
@@ -1,8 +1,28 @@
-import pandas as pd
-
 from typing import Iterable, Optional
 from pydantic import BaseModel, Field
+from src.core import settings
+from src.sio.features.medical.compaction import period_label, run_length
 from src.sio.features.medical.dto import NursingRecord, VitalSign
+from src.sio.features.medical.prompt_format import PromptFormat, render_table
+
+
+# 프롬프트 표 열 이름
+VS_COLUMNS = {
+    "date": "측정일자",
+    "high_pressure": "수축기 혈압",
+    "low_pressure": "이완기 혈압",
+    "pulse": "심박수",
+    "weight": "weight",
+    "temperature": "체온",
+    "respiration": "호흡수",
+    "spo2": "spo2",
+}
+NS_COLUMNS = {
+    "date": "작성일자",
+    "time": "작성시간",
+    "nursing_diagnosis": "간호 문제",
+    "nursing_intervention": "간호 처치",
+}
 
 
 class VsModel(BaseModel):
@@ -63,16 +83,10 @@ class VsModels(list[VsModel]):
       self.append(vs_model)
 
   def get_markdown_table(self):
-    pd_vs = pd.DataFrame([vs_model.model_dump() for vs_model in self])
-    pd_vs = pd_vs.rename(columns={
-        "date": "측정일자",
-        "high_pressure": "수축기 혈압",
-        "low_pressure": "이완기 혈압",
-        "pulse": "심박수",
-        "temperature": "체온",
-        "respiration": "호흡수"
-    })
-    return pd_vs.to_markdown(index=False)
+    return self.to_prompt("markdown")
+
+  def to_prompt(self, fmt: PromptFormat) -> str:
+    return render_table(self.get_jsonable(), fmt, columns=VS_COLUMNS, date_key="date")
 
   def get_jsonable(self) -> list[dict]:
     return [vs_model.model_dump() for vs_model in self]
@@ -83,26 +97,53 @@ class NsModel(BaseModel):
   time: str
   nursing_diagnosis: str = Field(..., description="간호 문제")
   nursing_intervention: str = Field(..., description="간호 처치")
+  # 연속으로 같은 간호 문제/처치가 반복된 횟수와 마지막 작성일자 (압축된 기록)
+  count: int = Field(default=1, description="반복 횟수")
+  end_date: Optional[str] = Field(default=None, description="마지막 작성일자 (YYYYMMDD)")
+
+  def to_row(self) -> dict:
+    """프롬프트 표 행 (반복 기록은 작성일자에 기간/횟수 표시, 작성시간 생략)"""
+    row = self.model_dump(exclude={"count", "end_date"})
+    if self.count > 1:
+      row["date"] = period_label(self.date, self.end_date or self.date, self.count)
+      row["time"] = ""
+    return row
 
 
 class NsModels(list[NsModel]):
-  def add_from_nss(self, nss: list[NursingRecord]) -> None:
-    for ns in nss:
-      ns_model = NsModel(
-          date=ns['ymd'],
-          time=ns['time'],
-          nursing_diagnosis=ns['nursingDiagnosis'] or "",
-          nursing_intervention=ns['nursingIntervention'] or ""
-      )
+  def add_from_nss(self, nss: list[NursingRecord], compact: Optional[bool] = None) -> None:
+    """간호기록 추가
+
+    compact(미지정 시 settings.RUN_LENGTH_COMPACTION)면 시간순으로 정렬한 뒤
+    연속으로 같은 간호 문제/처치를 한 건으로 합칩니다.
+    """
+    if not (settings.RUN_LENGTH_COMPACTION if compact is None else compact):
+      for ns in nss:
+        self.append(self.__to_model(ns))
+      return
+
+    runs = run_length(
+        sorted(nss, key=lambda ns: (ns['ymd'], ns['time'] or "")),
+        key=lambda ns: ((ns['nursingDiagnosis'] or "").strip(), (ns['nursingIntervention'] or "").strip()),
+        ymd=lambda ns: ns['ymd'])
+    for run in runs:
+      ns_model = self.__to_model(run.first)
+      if run.count > 1:
+        ns_model.count = run.count
+        ns_model.end_date = run.end
       self.append(ns_model)
 
+  @staticmethod
+  def __to_model(ns: NursingRecord) -> NsModel:
+    return NsModel(
+        date=ns['ymd'],
+        time=ns['time'],
+        nursing_diagnosis=ns['nursingDiagnosis'] or "",
+        nursing_intervention=ns['nursingIntervention'] or ""
+    )
+
   def get_markdown_table(self):
-    import pandas as pd
-    pd_ns = pd.DataFrame([ns_model.model_dump() for ns_model in self])
-    pd_ns = pd_ns.rename(columns={
-        "date": "작성일자",
-        "time": "작성시간",
-        "nursing_diagnosis": "간호 문제",
-        "nursing_intervention": "간호 처치"
-    })
-    return pd_ns.to_markdown(index=False)
+    return self.to_prompt("markdown")
+
+  def to_prompt(self, fmt: PromptFormat) -> str:
+    return render_table([ns_model.to_row() for ns_model in self], fmt, columns=NS_COLUMNS, date_key="date")
@@ -0,0 +1,110 @@
+"""경과기록 copy-forward 문단 접기
+
+경과기록은 전날 기록을 복사해 일부만 고쳐 쓰는 경우가 많아 같은 문단이 수십 번 반복됩니다.
+문단(줄) 단위로 정규화한 내용을 처음 나온 날짜와 함께 기억해 두고, 다시 나온 문단은
+`동일 (YYYY-MM-DD 참조)`로 바꿔 새로 쓰인 내용(delta)만 남깁니다.
+기록 전체를 한 번 훑으므로 문단 수에 비례하는 시간이 듭니다.
+"""
+import hashlib
+import re
+from typing import Callable, Optional, Sequence
+
+from src.core import settings
+from src.sio.features.medical.dto import ProgressNote
+from src.sio.features.medical.token_budget import BudgetResult, TokenBudget
+from src.utils.format_util import ymd_to_date
+from src.utils.token_util import estimate_tokens
+
+
+_SPACES = re.compile(r"\s+")
+# 이보다 짧은 문단(머리말 등)은 참조가 원문보다 길어지므로 그대로 둠
+_MIN_PARAGRAPH_CHARS = 15
+
+
+def repeat_reference(ymd: str) -> str:
+  return f"동일 ({ymd_to_date(ymd)} 참조)"
+
+
+def _paragraph_key(paragraph: str) -> bytes:
+  """공백/끝 문장부호 차이는 같은 문단으로 보는 키"""
+  normalized = _SPACES.sub(" ", paragraph).strip().rstrip(".。").lower()
+  return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+def collapse_repeats(notes: Sequence[ProgressNote]) -> list[ProgressNote]:
+  """앞 기록에 이미 나온 문단을 처음 나온 날짜 참조로 바꾼 경과기록 목록 (순서 유지)
+
+  같은 날짜를 참조하는 연속 문단은 참조 하나로 합치며, 기록 전체가 반복이면 참조만 남습니다.
+  """
+  first_seen: dict[bytes, str] = {}
+  collapsed: list[ProgressNote] = []
+  for note in notes:
+    lines: list[str] = []
+    reference = None
+    for paragraph in (note.get('progress') or "").splitlines():
+      if not paragraph.strip():
+        continue
+      if len(paragraph.strip()) < _MIN_PARAGRAPH_CHARS:
+        lines.append(paragraph)
+        reference = None
+        continue
+      key = _paragraph_key(paragraph)
+      seen = first_seen.get(key)
+      if seen is None:
+        first_seen[key] = note['ymd']
+        lines.append(paragraph)
+        reference = None
+      elif seen != reference:
+        reference = seen
+        lines.append(repeat_reference(seen))
+    collapsed.append({**note, 'progress': "\n".join(lines)})
+  return collapsed
+
+
+def fit_progress_notes(
+    budget: TokenBudget,
+    notes: Sequence[ProgressNote],
+    render: Callable[[ProgressNote], str],
+    share: float = 1.0,
+    collapsed: Optional[Sequence[ProgressNote]] = None,
+) -> tuple[list[ProgressNote], BudgetResult]:
+  """반복 문단을 접은 크기로 토큰 예산에 맞춘 경과기록 (최근 기록 우선)
+
+  예산으로 생략된 기록을 참조하지 않도록 포함된 기록끼리 다시 접습니다. 생략된 기록을 참조하던 문단은
+  원문으로 돌아와 커질 수 있으므로, 다시 잰 크기가 예산을 넘으면 오래된 기록부터 빼고 다시 접습니다.
+  settings.PROGRESS_NOTE_COLLAPSE_REPEATS가 False면 접지 않고 예산만 적용합니다.
+
+  Args:
+      collapsed: 이미 collapse_repeats(notes)로 접은 목록 (같은 순서, 미지정 시 여기서 접음)
+  """
+  def recency(note: ProgressNote) -> tuple[str, str]:
+    return note['ymd'], note['time']
+
+  if not settings.PROGRESS_NOTE_COLLAPSE_REPEATS:
+    result = budget.fit("progressNotes", notes, render, recency=recency, share=share)
+    return result.kept, result
+
+  pairs = list(zip(notes, collapsed if collapsed is not None else collapse_repeats(notes)))
+  result = budget.fit(
+      "progressNotes", pairs, lambda pair: render(pair[1]), recency=lambda pair: recency(pair[0]), share=share)
+  if not result.dropped and not result.duplicates:
+    return [note for _, note in result.kept], result
+
+  # fit이 이 목록에 허용한 토큰 수 (fit과 같은 기준)
+  available = budget.total - (budget.used - result.kept_tokens)
+  limit = min(available, int(budget.total * share)) if budget.limited else None
+  kept = list(result.kept)
+  refolded = collapse_repeats([note for note, _ in kept])
+  tokens = sum(estimate_tokens(render(note)) for note in refolded)
+  while limit is not None and tokens > limit:
+    oldest = min(range(len(kept)), key=lambda i: recency(kept[i][0]))
+    dropped = kept.pop(oldest)
+    result.dropped.append(dropped)
+    result.dropped_tokens += estimate_tokens(render(dropped[1]))
+    refolded = collapse_repeats([note for note, _ in kept])
+    tokens = sum(estimate_tokens(render(note)) for note in refolded)
+
+  budget.used -= result.kept_tokens - tokens
+  result.kept = list(zip([note for note, _ in kept], refolded))
+  result.kept_tokens = tokens
+  return refolded, result
@@ -0,0 +1,155 @@
+"""회진 전 환자 요약 사전 계산(prewarm)
+
+chartRef로 요약을 요청한 입원 환자를 감시 목록에 올려 두고, 설정한 시간대(예: 야간, 회진 전)에
+주기적으로 차트 스냅샷을 갱신(auto/update 워터마크 이후 변경분만 조회)합니다.
+변경이 있거나 보관된 결과가 없는 환자는 background lane 재요약 작업으로 등록하여,
+interactive 요청이 쓰고 남은 LLM 처리량으로 결과를 미리 만들어 둡니다.
+다음 summarize_patient는 입력 fingerprint가 같으면 보관된 결과로 즉시 응답합니다.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time
+from typing import TYPE_CHECKING, Any, Optional
+
+from loguru import logger
+from src.core import settings
+from src.sio.features.medical.job_store import SummaryJobStore, summary_job_store
+from src.sio.features.medical.jobs import SummaryJob, SummaryJobQueue, summary_queue
+from src.sio.features.medical.scheduler import DEFAULT_TENANT
+from src.sio.features.medical.summary import find_warm_result
+
+if TYPE_CHECKING:
+  from src.services import EmrService
+
+# src.services는 sio dto를 import하므로 모듈 수준에서 import하면 순환 import가 됩니다 (함수 안에서 import).
+# 요청 옵션 외에 DB에서 다시 읽는 항목(emr_service.CHART_TABLES)도 감시 요청에서 제외합니다.
+_EXCLUDED_OPTIONS = {"resummarize", "force", "priority"}
+
+
+@dataclass
+class WatchedChart:
+  room: str
+  # 재요약 요청에 사용할 마지막 요청 (DB에서 다시 읽는 바이탈/간호기록/경과기록 제외)
+  request: dict[str, Any]
+  last_requested_at: float
+
+
+def parse_windows(windows: list[str]) -> list[tuple[dt_time, dt_time]]:
+  """["22:00-06:00", "07:00-08:30"] 형식의 시간대 목록 파싱 (자정을 넘는 구간 허용)"""
+  parsed = []
+  for window in windows:
+    start, end = window.split("-")
+    parsed.append((dt_time.fromisoformat(start.strip()), dt_time.fromisoformat(end.strip())))
+  return parsed
+
+
+def in_windows(now: dt_time, windows: list[tuple[dt_time, dt_time]]) -> bool:
+  for start, end in windows:
+    if start <= end and start <= now < end:
+      return True
+    if start > end and (now >= start or now < end):
+      return True
+  return False
+
+
+class PrewarmWatchlist:
+  """최근 chartRef로 요청된 입원 환자 목록 (room 단위, watch_seconds 동안 요청이 없으면 제외)"""
+
+  def __init__(self, watch_seconds: int) -> None:
+    self.watch_seconds = watch_seconds
+    self._charts: dict[str, WatchedChart] = {}
+
+  def add(self, room: str, data: dict[str, Any]) -> None:
+    if not data.get("chartRef") or not data.get("patientInfo"):
+      return
+    # 처방/검사 등 클라이언트가 올린 항목은 그대로 두어야 실제 요청과 입력 fingerprint가 같아짐
+    from src.services.emr_service import CHART_TABLES
+
+    request = {
+        key: value for key, value in data.items() if key not in _EXCLUDED_OPTIONS and key not in CHART_TABLES}
+    self._charts[room] = WatchedChart(room=room, request=request, last_requested_at=time.time())
+
+  def charts(self) -> list[WatchedChart]:
+    expire_before = time.time() - self.watch_seconds
+    for room in [room for room, chart in self._charts.items() if chart.last_requested_at < expire_before]:
+      del self._charts[room]
+    return list(self._charts.values())
+
+
+prewarm_watchlist = PrewarmWatchlist(settings.PREWARM_WATCH_SECONDS)
+
+
+class PrewarmScheduler:
+  """감시 목록 환자의 차트 변경을 확인해 background 재요약 작업 등록"""
+
+  def __init__(
+      self,
+      watchlist: PrewarmWatchlist = prewarm_watchlist,
+      queue: SummaryJobQueue = summary_queue,
+      store: SummaryJobStore = summary_job_store,
+      emr_service: Optional["EmrService"] = None,
+  ) -> None:
+    self.watchlist = watchlist
+    self.queue = queue
+    self.store = store
+    self.emr_service = emr_service
+    self.windows = parse_windows(settings.PREWARM_WINDOWS)
+    self._task: Optional[asyncio.Task] = None
+
+  def start(self) -> None:
+    self._task = asyncio.create_task(self._run(), name="summary-prewarm")
+    logger.info(f"[prewarm] 사전 계산 시작 - 시간대: {settings.PREWARM_WINDOWS}")
+
+  async def stop(self) -> None:
+    if self._task:
+      self._task.cancel()
+      await asyncio.gather(self._task, return_exceptions=True)
+      self._task = None
+
+  async def _run(self) -> None:
+    while True:
+      await asyncio.sleep(settings.PREWARM_POLL_SECONDS)
+      if not in_windows(datetime.now().time(), self.windows):
+        continue
+      try:
+        await self.scan()
+      except Exception as e:
+        logger.exception(f"[prewarm] 감시 실패: {e}")
+
+  async def scan(self) -> int:
+    """감시 목록을 한 번 확인하고 등록한 작업 수 반환"""
+    from src.services import get_emr_service
+
+    emr_service = self.emr_service or get_emr_service()
+    enqueued = 0
+    for chart in self.watchlist.charts():
+      if enqueued >= settings.PREWARM_MAX_JOBS_PER_SCAN:
+        break
+
+      # 사용자 요청이 대기/실행 중이면 그 결과가 보관되므로 건너뜀 (이전 사전 계산이 진행 중일 때도)
+      latest = await self.store.get_latest(chart.room)
+      if latest and latest.is_active:
+        continue
+      pending = await self.store.get_latest_silent(chart.room)
+      if pending and pending.is_active:
+        continue
+      # 스냅샷 갱신은 변경분만 조회, 보관된 결과와 입력 fingerprint가 모두 같으면 건너뜀
+      refresh = await emr_service.refresh(chart.request["chartRef"])
+      if await find_warm_result(chart.room, {**chart.request, **refresh.data}):
+        continue
+
+      job = SummaryJob(
+          room=chart.room,
+          data={**chart.request, "resummarize": True, "priority": "background"},
+          tenant=chart.request.get("saup") or DEFAULT_TENANT,
+          priority="background",
+          # 사전 계산 결과는 보관소에만 남기고, 회진 중인 room에는 전송하지 않음
+          silent=True)
+      await self.store.update(job.job_id, chart.room, "queued", silent=True)
+      await self.queue.put(job)
+      enqueued += 1
+      logger.info(
+          f"[prewarm] 재요약 등록 - room: {chart.room}, job: {job.job_id}, "
+          f"변경 항목: {sorted(refresh.changed_keys)}")
+    return enqueued
@@ -0,0 +1,172 @@
+"""노드별 실행 시간 통계와 요약 진행률/남은 시간 추정
+
+노드 완료 시간을 입력 크기(경과기록 수, 검사 행 수 등) 구간별로 누적하여,
+같은 규모의 요청이 들어오면 남은 시간을 추정해 Loading 이벤트에 포함합니다.
+통계는 프로세스(웹/워커)마다 따로 쌓입니다.
+"""
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional
+
+from src.core import settings
+from src.sio.features.medical.dto import Loading, LoadingCompleteTarget
+from src.sio.features.medical.scheduler import RollingStats
+from src.sio.features.medical.sections import CLINICAL, PARALLEL_SECTIONS
+
+
+# 노드(complete_target)별 입력 요청 항목
+NODE_INPUTS: dict[LoadingCompleteTarget, tuple[str, ...]] = {
+    section.target: section.inputs for section in PARALLEL_SECTIONS}
+# 병렬 노드가 모두 끝난 뒤 실행되는 최종 통합 노드
+FINAL_TARGET: LoadingCompleteTarget = CLINICAL.target
+PARALLEL_TARGETS: tuple[LoadingCompleteTarget, ...] = tuple(NODE_INPUTS)
+
+
+def affected_targets(keys: set[str]) -> set[LoadingCompleteTarget]:
+  """변경된 요청 항목을 입력으로 쓰는 노드 (하나라도 있으면 최종 노드 포함)"""
+  targets = {target for target, inputs in NODE_INPUTS.items() if keys & set(inputs)}
+  return targets | {FINAL_TARGET} if targets else targets
+
+
+def input_size(data: Any, target: LoadingCompleteTarget) -> int:
+  """노드 입력 크기 (관련 목록 항목 행 수 합계, 최종 노드는 전체 행 수)"""
+  keys = NODE_INPUTS.get(target) or {key for keys in NODE_INPUTS.values() for key in keys}
+  return sum(len(value) for key in keys if isinstance(value := data.get(key), list))
+
+
+def _size_bucket(size: int) -> int:
+  """입력 크기 구간 (0, 1, 2~3, 4~7, ... 2배 간격)"""
+  return size.bit_length()
+
+
+class NodeLatencyStats:
+  """노드 + 입력 크기 구간별 실행 시간 통계"""
+
+  def __init__(self, min_samples: int) -> None:
+    self.min_samples = min_samples
+    self._stats: dict[tuple[LoadingCompleteTarget, int], RollingStats] = defaultdict(RollingStats)
+
+  def observe(self, target: LoadingCompleteTarget, size: int, seconds: float) -> None:
+    self._stats[(target, _size_bucket(size))].observe(seconds)
+
+  def estimate(self, target: LoadingCompleteTarget, size: int) -> Optional[float]:
+    """같은 구간 최근 평균, 표본이 부족하면 가장 가까운 구간, 이력이 없으면 None"""
+    bucket = _size_bucket(size)
+    candidates = [
+        (abs(b - bucket), stats) for (t, b), stats in self._stats.items()
+        if t == target and stats.count >= self.min_samples]
+    if not candidates:
+      return None
+    _, stats = min(candidates, key=lambda c: c[0])
+    return sum(stats.recent) / len(stats.recent)
+
+  def snapshot(self) -> dict[str, dict[int, dict[str, float]]]:
+    """노드별/구간별 통계 (로그/모니터링용)"""
+    result: dict[str, dict[int, dict[str, float]]] = defaultdict(dict)
+    for (target, bucket), stats in sorted(self._stats.items()):
+      result[target][bucket] = {"count": stats.count, **stats.to_dict("")}
+    return dict(result)
+
+
+node_latency_stats = NodeLatencyStats(settings.NODE_LATENCY_MIN_SAMPLES)
+
+
+class SummaryProgress:
+  """요약 1건의 노드 완료 기록과 남은 시간 추정
+
+  병렬 노드는 동시에 시작하고 최종 노드는 병렬 노드가 모두 끝난 뒤 시작하므로,
+  남은 시간 = max(미완료 병렬 노드 예상 - 경과) + 최종 노드 예상 입니다.
+  """
+
+  def __init__(
+      self,
+      data: Any,
+      stats: NodeLatencyStats = node_latency_stats,
+      reused: Optional[set[LoadingCompleteTarget]] = None,
+  ) -> None:
+    self.stats = stats
+    self.sizes = {target: input_size(data, target) for target in (*PARALLEL_TARGETS, FINAL_TARGET)}
+    # 이전 결과를 재사용하는 노드 (즉시 완료되므로 실행 시간 통계/남은 시간에서 제외)
+    self.reused = reused or set()
+    self.started_at = time.monotonic()
+    self.completed: list[LoadingCompleteTarget] = []
+    self._parallel_done_at: Optional[float] = None
+
+  def complete(self, target: LoadingCompleteTarget) -> None:
+    """노드 완료 기록 및 실행 시간 통계 반영"""
+    if target in self.completed:
+      return
+    now = time.monotonic()
+    self.completed.append(target)
+    if target == FINAL_TARGET:
+      # 최종 노드는 병렬 노드가 모두 끝난 시점부터 계산
+      # (체크포인트 재개로 병렬 노드 완료 시점을 모르면 통계에 반영하지 않음)
+      if target not in self.reused and self._parallel_done_at is not None:
+        self.stats.observe(target, self.sizes[target], now - self._parallel_done_at)
+      return
+
+    if target not in self.reused:
+      self.stats.observe(target, self.sizes[target], now - self.started_at)
+    if all(t in self.completed for t in PARALLEL_TARGETS):
+      self._parallel_done_at = now
+
+  def remaining_seconds(self) -> Optional[float]:
+    """예상 남은 시간(초), 이력이 없는 노드가 있으면 None"""
+    if FINAL_TARGET in self.completed:
+      return 0.0
+    now = time.monotonic()
+
+    final_estimate = (
+        0.0 if FINAL_TARGET in self.reused else self.stats.estimate(FINAL_TARGET, self.sizes[FINAL_TARGET]))
+    if final_estimate is None:
+      return None
+    if self._parallel_done_at is not None:
+      return round(max(final_estimate - (now - self._parallel_done_at), 0.0), 1)
+
+    parallel_remaining = 0.0
+    for target in PARALLEL_TARGETS:
+      if target in self.completed or target in self.reused:
+        continue
+      estimate = self.stats.estimate(target, self.sizes[target])
+      if estimate is None:
+        return None
+      parallel_remaining = max(parallel_remaining, estimate - (now - self.started_at))
+    return round(max(parallel_remaining, 0.0) + final_estimate, 1)
+
+
+class LoadingCoalescer:
+  """interval 안에 몰린 노드 완료 알림을 마지막 것 하나로 모아 전송
+
+  병렬 노드가 거의 동시에 끝나면 완료 알림이 연달아 발생하므로, 전송 시점에 누적 완료 목록을
+  채우는 send와 함께 사용하면 알림 수를 줄이면서도 완료 정보는 잃지 않습니다.
+  노드 완료가 아닌 상태 변경(processing 시작/done)은 대기 중 알림을 버리고 즉시 전송합니다.
+  """
+
+  def __init__(self, send: Callable[[Loading], Awaitable[None]], interval: float) -> None:
+    self.send = send
+    self.interval = interval
+    self._pending: Optional[Loading] = None
+    self._task: Optional[asyncio.Task] = None
+
+  async def push(self, loading: Loading) -> None:
+    if loading.complete_target is None or self.interval <= 0:
+      self.close()
+      await self.send(loading)
+      return
+
+    self._pending = loading
+    if self._task is None:
+      self._task = asyncio.create_task(self._flush_later())
+
+  async def _flush_later(self) -> None:
+    await asyncio.sleep(self.interval)
+    loading, self._pending, self._task = self._pending, None, None
+    if loading:
+      await self.send(loading)
+
+  def close(self) -> None:
+    """대기 중 알림 폐기"""
+    if self._task:
+      self._task.cancel()
+    self._pending = self._task = None
@@ -0,0 +1,82 @@
+"""프롬프트에 넣는 표 형식 데이터 인코딩
+
+활력징후/간호기록/검사/진단처럼 행 단위 데이터를 노드별로 지정한 형식으로 렌더링합니다.
+- markdown: pandas 마크다운 표 (기존 형식, 열 너비 맞춤 공백과 | 때문에 토큰이 많음)
+- tsv: 탭 구분 표 (첫 줄은 열 이름)
+- kv: 한 줄에 한 건, `열=값` 목록 (빈 값 생략)
+- by_date: 날짜별로 묶은 kv (같은 날짜를 반복하지 않음)
+
+노드별 형식은 settings.PROMPT_FORMAT_BY_NODE(노드 이름 -> 형식)로 지정하고,
+지정하지 않은 노드는 settings.PROMPT_FORMAT을 사용합니다.
+"""
+from typing import Any, Iterable, Literal, Mapping, Optional
+
+import pandas as pd
+
+from src.core import settings
+
+
+type PromptFormat = Literal["markdown", "tsv", "kv", "by_date"]
+
+# 시스템 프롬프트에서 입력 형식을 설명할 때 사용
+FORMAT_DESCRIPTIONS: dict[PromptFormat, str] = {
+    "markdown": "마크다운 표",
+    "tsv": "탭으로 구분한 표(첫 줄은 열 이름)",
+    "kv": "한 줄에 한 건씩 '열=값' 목록(빈 값은 생략)",
+    "by_date": "날짜별로 묶은 '열=값' 목록(빈 값은 생략)",
+}
+
+
+def node_format(node: str) -> PromptFormat:
+  """노드에 지정된 프롬프트 형식"""
+  fmt = settings.PROMPT_FORMAT_BY_NODE.get(node, settings.PROMPT_FORMAT)
+  if fmt not in FORMAT_DESCRIPTIONS:
+    raise ValueError(f"지원하지 않는 프롬프트 형식: {fmt}")
+  return fmt
+
+
+def render_table(
+    rows: Iterable[Mapping[str, Any]],
+    fmt: PromptFormat,
+    columns: Optional[Mapping[str, str]] = None,
+    date_key: Optional[str] = None,
+) -> str:
+  """행 목록을 프롬프트용 문자열로 렌더링
+
+  Args:
+      rows: 행 목록 (키 -> 값)
+      fmt: 출력 형식
+      columns: 출력할 키 -> 열 이름 (미지정 시 행에 나오는 모든 키를 그대로 사용)
+      date_key: by_date 형식에서 묶을 날짜 키 (미지정 시 kv와 같음)
+  """
+  rows = list(rows)
+  if columns is None:
+    columns = {key: key for row in rows for key in row}
+
+  if fmt == "markdown":
+    return pd.DataFrame(rows, columns=list(columns)).rename(columns=dict(columns)).to_markdown(index=False)
+  if fmt == "tsv":
+    lines = ["\t".join(columns.values())]
+    lines += ["\t".join(_cell(row.get(key)) for key in columns) for row in rows]
+    return "\n".join(lines)
+  if fmt == "kv" or date_key is None:
+    return "\n".join(_kv_line(row, columns) for row in rows)
+  if fmt == "by_date":
+    groups: dict[str, list[Mapping[str, Any]]] = {}
+    for row in rows:
+      groups.setdefault(_cell(row.get(date_key)), []).append(row)
+    row_columns = {key: label for key, label in columns.items() if key != date_key}
+    return "\n".join(
+        f"[{date}]\n" + "\n".join(_kv_line(row, row_columns) for row in group)
+        for date, group in groups.items())
+  raise ValueError(f"지원하지 않는 프롬프트 형식: {fmt}")
+
+
+def _cell(value: Any) -> str:
+  if value is None:
+    return ""
+  return str(value).replace("\t", " ").replace("\n", " ").strip()
+
+
+def _kv_line(row: Mapping[str, Any], columns: Mapping[str, str]) -> str:
+  return ", ".join(f"{label}={cell}" for key, label in columns.items() if (cell := _cell(row.get(key))))
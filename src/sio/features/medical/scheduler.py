@@ -0,0 +1,472 @@
+"""그래프 실행 수락(admission) 제어
+
+프로세스당 동시 실행 수를 제한하고, 대기열 위치/예상 시작 시간을 알려주며,
+대기열이 상한을 넘으면 재시도 시간(retry-after)과 함께 즉시 거절합니다.
+
+여러 병원(saup)이 한 배포를 공유하므로 대기열은 tenant별로 나뉘며,
+가중치 기반 stride 스케줄링으로 슬롯을 배분하여 한 tenant의 대량 요청이
+다른 tenant를 굶기지 않도록 합니다. tenant별 동시 실행 수/토큰 한도도 적용합니다.
+
+요청은 우선순위 lane(interactive / background)으로 구분됩니다.
+- interactive: 의사가 화면 앞에서 기다리는 요청, 대기 중인 background보다 항상 먼저 배정
+- background: 사전 계산/배치 요청, interactive 대기자가 없고 background 상한 이내일 때만 배정
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Optional
+
+from loguru import logger
+
+
+type PositionCallback = Callable[[int, float], Awaitable[None]]
+type Lane = Literal["interactive", "background"]
+
+DEFAULT_TENANT = "default"
+LANES: tuple[Lane, ...] = ("interactive", "background")
+
+
+class AdmissionRejected(Exception):
+  """대기열 상한 또는 tenant 토큰 한도 초과로 실행 거절"""
+
+  def __init__(self, retry_after: float, message: Optional[str] = None):
+    self.retry_after = retry_after
+    super().__init__(message or f"요청이 많아 처리할 수 없습니다. {retry_after:.0f}초 후 다시 시도하세요.")
+
+
+@dataclass
+class _Waiter:
+  key: str
+  tenant: str
+  lane: Lane
+  future: asyncio.Future
+  on_position: Optional[PositionCallback] = None
+  enqueued_at: float = field(default_factory=time.monotonic)
+  # 마지막으로 알린 대기 위치 (바뀐 경우에만 다시 알림)
+  notified_position: int = 0
+
+
+@dataclass
+class RollingStats:
+  """누적 평균/최대 + 최근 구간 p95"""
+  count: int = 0
+  total: float = 0.0
+  max: float = 0.0
+  recent: deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+  def observe(self, value: float) -> None:
+    self.count += 1
+    self.total += value
+    self.max = max(self.max, value)
+    self.recent.append(value)
+
+  @property
+  def avg(self) -> float:
+    return self.total / self.count if self.count else 0.0
+
+  @property
+  def p95(self) -> float:
+    if not self.recent:
+      return 0.0
+    values = sorted(self.recent)
+    return values[min(len(values) - 1, math.ceil(len(values) * 0.95) - 1)]
+
+  def to_dict(self, prefix: str) -> dict[str, float]:
+    return {
+        f"avg{prefix}Seconds": round(self.avg, 3),
+        f"p95{prefix}Seconds": round(self.p95, 3),
+        f"max{prefix}Seconds": round(self.max, 3),
+    }
+
+
+@dataclass
+class TenantMetrics:
+  """tenant별 대기 시간/사용량 지표"""
+  rejected: int = 0
+  tokens_used: int = 0
+  wait: RollingStats = field(default_factory=RollingStats)
+
+  def to_dict(self) -> dict[str, Any]:
+    return {
+        "admitted": self.wait.count,
+        "rejected": self.rejected,
+        "tokensUsed": self.tokens_used,
+        **self.wait.to_dict("Wait"),
+    }
+
+
+@dataclass
+class LaneMetrics:
+  """우선순위 lane별 대기/실행 지연 지표"""
+  rejected: int = 0
+  wait: RollingStats = field(default_factory=RollingStats)
+  run: RollingStats = field(default_factory=RollingStats)
+
+  def to_dict(self) -> dict[str, Any]:
+    return {
+        "admitted": self.wait.count,
+        "rejected": self.rejected,
+        **self.wait.to_dict("Wait"),
+        **self.run.to_dict("Run"),
+    }
+
+
+@dataclass
+class _TenantState:
+  weight: float
+  # 0이면 제한 없음
+  max_concurrency: int
+  token_quota: int
+  active: int = 0
+  # stride 스케줄링 진행값 (작을수록 먼저 배정, 배정마다 1/weight 증가)
+  pass_value: float = 0.0
+  waiters: dict[Lane, deque[_Waiter]] = field(
+      default_factory=lambda: {lane: deque() for lane in LANES})
+  window_started: float = field(default_factory=time.monotonic)
+  window_tokens: int = 0
+  metrics: TenantMetrics = field(default_factory=TenantMetrics)
+
+  @property
+  def waiting(self) -> int:
+    return sum(len(q) for q in self.waiters.values())
+
+
+class AdmissionController:
+  """동시 실행 수 제한 + tenant 가중치 공정 배분 대기열"""
+
+  def __init__(
+      self,
+      max_concurrency: int,
+      max_backlog: int,
+      default_duration: float,
+      tenant_weights: Optional[dict[str, float]] = None,
+      tenant_max_concurrency: Optional[dict[str, int]] = None,
+      default_tenant_max_concurrency: int = 0,
+      tenant_token_quotas: Optional[dict[str, int]] = None,
+      quota_window: float = 3600,
+      background_max_concurrency: Optional[int] = None,
+      background_max_backlog: Optional[int] = None,
+  ) -> None:
+    self.max_concurrency = max_concurrency
+    self.max_backlog = max_backlog
+    # background lane 동시 실행/대기열 상한 (interactive용 여유 슬롯 확보)
+    self.background_max_concurrency = (
+        background_max_concurrency if background_max_concurrency is not None
+        else max(1, max_concurrency // 2))
+    self.background_max_backlog = (
+        background_max_backlog if background_max_backlog is not None else max_backlog)
+    self.active = 0
+    self.active_by_lane: dict[Lane, int] = {lane: 0 for lane in LANES}
+    self.lane_metrics: dict[Lane, LaneMetrics] = {lane: LaneMetrics() for lane in LANES}
+    self.tenant_weights = tenant_weights or {}
+    self.tenant_max_concurrency = tenant_max_concurrency or {}
+    self.default_tenant_max_concurrency = default_tenant_max_concurrency
+    self.tenant_token_quotas = tenant_token_quotas or {}
+    self.quota_window = quota_window
+    self._tenants: dict[str, _TenantState] = {}
+    # 마지막으로 배정된 tenant의 pass 값 (새로 대기열에 들어온 tenant의 시작점)
+    self._virtual_time = 0.0
+    # 실행 시간 지수 이동 평균 (예상 시작 시간 계산용)
+    self._avg_duration = default_duration
+    # 대기 위치 알림은 이벤트 루프 한 차례에 한 번만 계산 (같은 틱의 대기열 변경을 모아서 처리)
+    self._notify_scheduled = False
+    # 전송 중인 대기 위치 알림 태스크 (GC 방지용 참조)
+    self._notify_tasks: set[asyncio.Task] = set()
+    # 토큰 한도로 막힌 대기자를 한도 구간이 바뀔 때 다시 배정하는 타이머
+    self._quota_timer: Optional[asyncio.TimerHandle] = None
+
+  @property
+  def backlog(self) -> int:
+    return sum(t.waiting for t in self._tenants.values())
+
+  def lane_backlog(self, lane: Lane) -> int:
+    return sum(len(t.waiters[lane]) for t in self._tenants.values())
+
+  def estimate_start(self, position: int) -> float:
+    """대기열 position(1부터)번째 요청의 예상 시작까지 남은 시간(초)
+
+    모든 슬롯이 사용 중이면 평균적으로 avg_duration / max_concurrency 마다 슬롯 하나가 비므로,
+    position번째 요청은 그만큼의 슬롯 반환을 기다립니다.
+    """
+    return position * self._avg_duration / self.max_concurrency
+
+  def check(self, tenant: str = DEFAULT_TENANT, lane: Lane = "interactive") -> None:
+    """대기열 상한/tenant 토큰 한도 확인 (초과 시 AdmissionRejected)
+
+    slot()은 대기열에 들어가기 직전에 같은 확인을 하므로, 미리 거절 여부만 알아볼 때 사용합니다.
+    """
+    state = self._tenant(tenant)
+    max_backlog = self.max_backlog if lane == "interactive" else self.background_max_backlog
+    if self.active >= self.max_concurrency and self.lane_backlog(lane) >= max_backlog:
+      state.metrics.rejected += 1
+      self.lane_metrics[lane].rejected += 1
+      self._evict_idle(tenant)
+      raise AdmissionRejected(retry_after=math.ceil(self.estimate_start(1)))
+
+    if self._quota_exhausted(state):
+      state.metrics.rejected += 1
+      self.lane_metrics[lane].rejected += 1
+      retry_after = math.ceil(state.window_started + self.quota_window - time.monotonic())
+      raise AdmissionRejected(
+          retry_after=retry_after,
+          message=f"기관({tenant}) 토큰 한도를 초과했습니다. {retry_after}초 후 다시 시도하세요.")
+
+  def record_tokens(self, tenant: str, tokens: int) -> None:
+    """실행 완료된 요청의 토큰 사용량을 tenant 한도에 반영"""
+    state = self._tenant(tenant)
+    self._roll_window(state)
+    state.window_tokens += tokens
+    state.metrics.tokens_used += tokens
+
+  def metrics(self) -> dict[str, dict[str, Any]]:
+    """tenant별 지표"""
+    return {
+        name: {**state.metrics.to_dict(), "active": state.active, "waiting": state.waiting}
+        for name, state in self._tenants.items()
+    }
+
+  def lane_metrics_snapshot(self) -> dict[Lane, dict[str, Any]]:
+    """lane별 지표"""
+    return {
+        lane: {
+            **metrics.to_dict(),
+            "active": self.active_by_lane[lane],
+            "waiting": self.lane_backlog(lane),
+        }
+        for lane, metrics in self.lane_metrics.items()
+    }
+
+  @asynccontextmanager
+  async def slot(
+      self,
+      key: str,
+      tenant: str = DEFAULT_TENANT,
+      on_position: Optional[PositionCallback] = None,
+      lane: Lane = "interactive",
+  ) -> AsyncIterator[None]:
+    """실행 슬롯을 얻을 때까지 대기한 후 실행 구간 제공
+
+    대기열 상한/토큰 한도 확인과 대기열 등록을 await 없이 함께 처리하므로,
+    동시에 몰린 요청도 상한을 넘어 대기열에 들어가지 않습니다.
+
+    Raises:
+        AdmissionRejected: 대기열 상한 또는 tenant 토큰 한도 초과
+
+    Args:
+        key: 요청 식별자 (작업 id)
+        tenant: 요청 기관 (saup)
+        on_position: 대기 중 위치가 바뀔 때마다 (위치, 예상 시작 초)로 호출
+        lane: 우선순위 lane
+    """
+    await self._acquire(key, tenant, lane, on_position)
+    started = time.monotonic()
+    try:
+      yield
+    finally:
+      duration = time.monotonic() - started
+      self._observe_duration(duration)
+      self.lane_metrics[lane].run.observe(duration)
+      self._release(tenant, lane)
+
+  def _configured(self, name: str) -> bool:
+    return name in self.tenant_weights or name in self.tenant_max_concurrency or name in self.tenant_token_quotas
+
+  def _evict_idle(self, name: str) -> None:
+    """대기/실행 중인 요청이 없는 미설정 tenant 상태 제거
+
+    미설정 tenant는 토큰 한도가 없고, 쉬던 tenant는 현재 시점부터 다시 경쟁하므로 상태를 버려도
+    배정 결과는 같습니다 (지표만 초기화). 요청마다 다른 saup이 들어와도 상태가 쌓이지 않습니다.
+    """
+    state = self._tenants.get(name)
+    if state and not state.active and not state.waiting and not self._configured(name):
+      del self._tenants[name]
+
+  def _tenant(self, name: str) -> _TenantState:
+    state = self._tenants.get(name)
+    if state is None:
+      state = _TenantState(
+          weight=self.tenant_weights.get(name, 1.0),
+          max_concurrency=self.tenant_max_concurrency.get(name, self.default_tenant_max_concurrency),
+          token_quota=self.tenant_token_quotas.get(name, 0),
+      )
+      self._tenants[name] = state
+    return state
+
+  def _roll_window(self, state: _TenantState) -> None:
+    now = time.monotonic()
+    if now - state.window_started >= self.quota_window:
+      state.window_started = now
+      state.window_tokens = 0
+
+  def _quota_exhausted(self, state: _TenantState) -> bool:
+    self._roll_window(state)
+    return bool(state.token_quota) and state.window_tokens >= state.token_quota
+
+  def _eligible(self, state: _TenantState, lane: Lane) -> bool:
+    if not state.waiters[lane]:
+      return False
+    if state.max_concurrency and state.active >= state.max_concurrency:
+      return False
+    return not self._quota_exhausted(state)
+
+  def _pick_tenant(self, lane: Lane) -> Optional[_TenantState]:
+    eligible = [t for t in self._tenants.values() if self._eligible(t, lane)]
+    if not eligible:
+      return None
+    return min(eligible, key=lambda t: (t.pass_value, t.waiters[lane][0].enqueued_at))
+
+  def _pick(self) -> Optional[tuple[_TenantState, Lane]]:
+    """다음에 배정할 (tenant, lane) 선택
+
+    interactive 대기자가 배정 가능하면 항상 우선하고, background는 배정 가능한 interactive 대기자가 없고
+    background 동시 실행 상한 이내일 때만 남는 슬롯을 사용합니다. 자기 기관의 동시 실행/토큰 한도로 막힌
+    interactive 대기자는 배정될 수 없으므로 background를 막지 않습니다.
+    """
+    state = self._pick_tenant("interactive")
+    if state:
+      return state, "interactive"
+    if self.active_by_lane["background"] >= self.background_max_concurrency:
+      return None
+    state = self._pick_tenant("background")
+    return (state, "background") if state else None
+
+  async def _acquire(
+      self,
+      key: str,
+      tenant: str,
+      lane: Lane,
+      on_position: Optional[PositionCallback],
+  ) -> None:
+    self.check(tenant, lane)
+    state = self._tenant(tenant)
+    if not state.waiting and not state.active:
+      # 쉬고 있던 tenant는 누적된 우선권 없이 현재 시점부터 경쟁
+      state.pass_value = max(state.pass_value, self._virtual_time)
+
+    waiter = _Waiter(
+        key=key,
+        tenant=tenant,
+        lane=lane,
+        future=asyncio.get_running_loop().create_future(),
+        on_position=on_position)
+    state.waiters[lane].append(waiter)
+    self._dispatch()
+    if not waiter.future.done():
+      self._notify_positions()
+
+    try:
+      await waiter.future
+    except asyncio.CancelledError:
+      if waiter.future.done() and not waiter.future.cancelled():
+        # 슬롯을 배정받은 직후 취소된 경우 반환
+        self._release(tenant, lane)
+      else:
+        state.waiters[lane].remove(waiter)
+        self._evict_idle(tenant)
+        self._notify_positions()
+      raise
+
+  def _dispatch(self) -> None:
+    granted = False
+    while self.active < self.max_concurrency:
+      picked = self._pick()
+      if picked is None:
+        break
+      state, lane = picked
+      waiter = state.waiters[lane].popleft()
+      if waiter.future.done():
+        continue
+
+      self.active += 1
+      self.active_by_lane[lane] += 1
+      state.active += 1
+      self._virtual_time = state.pass_value
+      state.pass_value += 1 / state.weight
+      wait = time.monotonic() - waiter.enqueued_at
+      state.metrics.wait.observe(wait)
+      self.lane_metrics[lane].wait.observe(wait)
+      waiter.future.set_result(None)
+      granted = True
+
+    if granted:
+      self._notify_positions()
+    self._schedule_quota_retry()
+
+  def _schedule_quota_retry(self) -> None:
+    """토큰 한도로 막힌 대기자가 있으면 가장 빠른 한도 구간 교체 시점에 다시 배정
+
+    배정은 요청 등록/반환 때만 일어나므로, 막힌 tenant만 대기 중이면 구간이 바뀌어도 깨울 요청이 없습니다.
+    """
+    retry_at = min(
+        (state.window_started + self.quota_window
+         for state in self._tenants.values() if state.waiting and self._quota_exhausted(state)),
+        default=None)
+    if retry_at is None:
+      return
+    loop = asyncio.get_running_loop()
+    when = loop.time() + max(0.0, retry_at - time.monotonic())
+    if self._quota_timer and self._quota_timer.when() <= when:
+      return
+    if self._quota_timer:
+      self._quota_timer.cancel()
+    self._quota_timer = loop.call_at(when, self._on_quota_window)
+
+  def _on_quota_window(self) -> None:
+    self._quota_timer = None
+    self._dispatch()
+
+  def _release(self, tenant: str, lane: Lane) -> None:
+    state = self._tenant(tenant)
+    state.active -= 1
+    self.active -= 1
+    self.active_by_lane[lane] -= 1
+    self._dispatch()
+    self._evict_idle(tenant)
+
+  def _observe_duration(self, duration: float) -> None:
+    self._avg_duration = self._avg_duration * 0.8 + duration * 0.2
+
+  def _dispatch_order(self) -> list[_Waiter]:
+    """현재 대기자들이 배정될 예상 순서 (interactive 먼저, lane 안에서는 stride 순서)
+
+    동시 실행/토큰 한도는 무시한 근사치입니다.
+    """
+    passes = {name: state.pass_value for name, state in self._tenants.items()}
+    order: list[_Waiter] = []
+    for lane in LANES:
+      queues = {
+          name: list(state.waiters[lane])
+          for name, state in self._tenants.items() if state.waiters[lane]
+      }
+      while queues:
+        name = min(queues, key=lambda n: (passes[n], queues[n][0].enqueued_at))
+        order.append(queues[name].pop(0))
+        passes[name] += 1 / self._tenants[name].weight
+        if not queues[name]:
+          del queues[name]
+    return order
+
+  def _notify_positions(self) -> None:
+    """대기 위치 알림 예약 (같은 이벤트 루프 틱의 변경은 한 번에 계산)"""
+    if not self._notify_scheduled:
+      self._notify_scheduled = True
+      asyncio.get_running_loop().call_soon(self._flush_positions)
+
+  def _flush_positions(self) -> None:
+    """위치가 바뀐 대기자에게만 알림"""
+    self._notify_scheduled = False
+    for position, waiter in enumerate(self._dispatch_order(), 1):
+      if waiter.on_position and waiter.notified_position != position:
+        waiter.notified_position = position
+        task = asyncio.create_task(self._safe_notify(waiter, position))
+        self._notify_tasks.add(task)
+        task.add_done_callback(self._notify_tasks.discard)
+
+  async def _safe_notify(self, waiter: _Waiter, position: int) -> None:
+    try:
+      await waiter.on_position(position, self.estimate_start(position))
+    except Exception as e:
+      logger.warning(f"[scheduler] 대기 위치 전송 실패 - key: {waiter.key}, error: {e}")
@@ -0,0 +1,65 @@
+"""요약 그래프 섹션(노드) 선언과 입력 fingerprint
+
+각 노드가 읽는 요청 항목을 선언해 두고, 항목 값의 해시(fingerprint)를 결과와 함께 저장합니다.
+재요약(resummarize) 요청은 fingerprint가 바뀐 섹션만 다시 실행하고 나머지는 이전 결과를 재사용합니다.
+"""
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+from src.sio.features.medical.dto import LoadingCompleteTarget
+from src.utils.hash_util import stable_hash
+
+
+# 모든 노드가 프롬프트에 함께 넣는 추가 입력 메모
+MEMO_INPUTS = ("mainSymptoms", "specialNotes", "wardNotes")
+
+
+@dataclass(frozen=True)
+class Section:
+  # 그래프 노드 이름
+  node: str
+  # 결과가 저장되는 state 키 (PatientSummaryResponse 필드명과 같음)
+  result_key: str
+  # 완료 시 전송하는 Loading.complete_target
+  target: LoadingCompleteTarget
+  # 노드가 읽는 요청 항목 (MEMO_INPUTS 제외)
+  inputs: tuple[str, ...]
+
+
+PROGRESS_NOTES = Section(
+    "create_progressnote_summary", "progress_notes_summary", "progress_notes", ("progressNotes",))
+SURGERY = Section(
+    "create_surgery_summary", "surgery_summary", "surgery",
+    ("progressNotes", "patientInfo", "diagnosisRecords", "medications", "labs", "vitalSigns"))
+NS_VS = Section("create_ns_vs_summary", "vs_ns_summary", "ns_vs", ("vitalSigns", "nursingRecords"))
+PRESCRIPTIONS = Section(
+    "create_prescription_summary", "prescription_summary", "prescriptions",
+    ("medications", "diagnosisRecords", "patientInfo"))
+LABS = Section("create_lab_summary", "lab_summary", "labs", ("labs", "patientInfo", "diagnosisRecords"))
+RADIOLOGY = Section(
+    "create_radiology_analysis_summary", "radiology_summary", "radiology",
+    ("radiologyReports", "patientInfo", "vitalSigns", "labs", "medications"))
+# 병렬 섹션 결과를 모두 입력으로 받는 최종 통합 노드
+CLINICAL = Section("create_clinical_summary", "clinical_summary", "clinical_summary", ("patientInfo",))
+
+PARALLEL_SECTIONS: tuple[Section, ...] = (PROGRESS_NOTES, SURGERY, NS_VS, PRESCRIPTIONS, LABS, RADIOLOGY)
+SECTIONS: tuple[Section, ...] = (*PARALLEL_SECTIONS, CLINICAL)
+
+
+def section_fingerprints(data: Mapping[str, Any]) -> dict[str, str]:
+  """섹션(result_key)별 입력 fingerprint
+
+  최종 노드는 병렬 섹션 fingerprint에 의존하므로, 어느 섹션이든 바뀌면 함께 바뀝니다.
+  """
+  fingerprints = {
+      section.result_key: stable_hash({key: data.get(key) for key in (*section.inputs, *MEMO_INPUTS)})
+      for section in PARALLEL_SECTIONS}
+  fingerprints[CLINICAL.result_key] = stable_hash({
+      "sections": fingerprints,
+      **{key: data.get(key) for key in (*CLINICAL.inputs, *MEMO_INPUTS)}})
+  return fingerprints
+
+
+def unchanged_sections(current: Mapping[str, str], previous: Mapping[str, str]) -> set[str]:
+  """이전 실행과 fingerprint가 같은 섹션(result_key)"""
+  return {key for key, fingerprint in current.items() if previous.get(key) == fingerprint}
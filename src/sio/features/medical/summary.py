@@ -0,0 +1,329 @@
+"""환자 요약 파이프라인 (그래프 실행 + 결과 전송)"""
+import asyncio
+import uuid
+from typing import Any, Optional
+
+from loguru import logger
+from pydantic.alias_generators import to_camel
+from src.core import settings
+from src.core.exceptions import ValidationException
+from src.sio.emitter import RoomEmitter
+from src.sio.features.medical import medical_graph
+from src.sio.features.medical.job_store import summary_job_store
+from src.sio.features.medical.llm_usage import LlmUsage, cancellation_metrics
+from src.sio.features.medical.progress import LoadingCoalescer, SummaryProgress, node_latency_stats
+from src.sio.features.medical.scheduler import LANES
+from src.sio.features.medical.sections import SECTIONS, Section, section_fingerprints, unchanged_sections
+from src.sio.presence import room_presence
+from src.utils.hash_util import stable_hash
+from src.sio.features.medical.dto import (
+    LawData,
+    Loading,
+    PatientSummaryResponse,
+    SectionResult,
+    PrescriptionSummaryResult,
+    ProgressNoteResult,
+    SummarizePatientRequest,
+    VsNsSummaryResult,
+    LabSummaryResult,
+    ClinicalSummaryResult,
+    SurgerySummaryResult,
+)
+
+
+async def run_patient_summary(
+    emitter: RoomEmitter,
+    to: str,
+    data: SummarizePatientRequest,
+    job_id: Optional[str] = None,
+    usage: Optional[LlmUsage] = None,
+    require_listener: bool = True,
+) -> Optional[PatientSummaryResponse]:
+  """환자 요약 그래프를 실행하고 진행 상태/결과를 room에 전송
+
+  job_id가 주어지면 결과를 전송하기 전에 작업 보관소에 먼저 저장하므로,
+  전송/ack가 실패해도 재접속한 클라이언트가 결과를 다시 받을 수 있습니다.
+
+  실행 전과 각 노드 완료 시점에 room 참여자를 확인하여, 아무도 없으면
+  settings.EMPTY_ROOM_POLICY에 따라 취소(abort)하거나 전송 없이 결과만 보관(park)합니다.
+
+  Args:
+      emitter: room 전송 인터페이스 (네임스페이스 또는 워커용 매니저)
+      to: 결과를 받을 room (환자 id)
+      data: 요약 요청 데이터 (chartRef 요청은 resolve_chart로 차트를 채운 데이터)
+      job_id: 작업 id (작업 큐 경유 시)
+      usage: LLM 사용량 집계 대상 (미지정 시 내부 생성)
+      require_listener: False면 room이 비어도 취소하지 않음 (사전 계산 등 background 작업)
+
+  Returns:
+      환자 요약 응답 (실행 전 빈 room으로 취소된 경우 None)
+  """
+  async def is_listening() -> bool:
+    return await room_presence.count(emitter.namespace, to) > 0
+
+  abort_when_empty = require_listener and settings.EMPTY_ROOM_POLICY == "abort"
+  if abort_when_empty and not await is_listening():
+    await _skip_for_empty_room(to, job_id)
+    return None
+
+  # 환자 정보 전송 (ack는 그래프 실행과 병렬로 수집, 느린 클라이언트가 시작을 지연시키지 않음)
+  patient_data_acks = await emitter.send_with_acks("patient_data", data["patientInfo"], room=to)
+  _collect_acks_in_background(emitter, "patient_data", to, patient_data_acks)
+
+  # 재요약이면 입력이 바뀌지 않은 섹션은 직전 완료 결과 재사용
+  fingerprints = section_fingerprints(data)
+  reuse = data.get("resummarize") and not data.get("force")
+  reuse_sections = await _reusable_sections(to, fingerprints) if reuse else {}
+
+  # === 로딩 상태 전송 함수 정의 ===
+  pipeline_task = asyncio.current_task()
+  progress = SummaryProgress(data, reused={s.target for s in SECTIONS if s.result_key in reuse_sections})
+
+  async def emit_loading(loading: Loading) -> None:
+    """진행률/남은 시간을 전송 시점 기준으로 채워 전송"""
+    loading.job_id = job_id
+    if loading.status == "processing":
+      loading.completed_targets = list(progress.completed)
+      loading.estimated_remaining_seconds = progress.remaining_seconds()
+    await emitter.emit("loading", loading.to_json(), room=to)
+
+  coalescer = LoadingCoalescer(emit_loading, settings.LOADING_COALESCE_SECONDS)
+
+  async def send_loading(loading: Loading) -> None:
+    """로딩 상태 전송 (노드 완료 시점마다 실행 시간 기록 + room 참여자 확인)"""
+    if loading.complete_target:
+      progress.complete(loading.complete_target)
+      if not await is_listening():
+        if abort_when_empty:
+          logger.info(f"[summary] room이 비어 요약 중단 - job: {job_id}, room: {to}, 완료 노드: {loading.complete_target}")
+          pipeline_task.cancel()
+        return
+
+    await coalescer.push(loading)
+
+  async def send_section(section: Section, section_result: Any) -> None:
+    """섹션 결과를 최종 응답을 기다리지 않고 전송"""
+    if not await is_listening():
+      return
+    await emitter.emit("section_result", SectionResult(
+        target=section.target,
+        key=to_camel(section.result_key),
+        result=section_result.model_dump(by_alias=True),
+        job_id=job_id,
+    ).to_json(), room=to)
+
+  # 처리 중 상태 전송
+  await send_loading(Loading(status="processing"))
+
+  # 체크포인트 스레드는 작업별로 사용하고, 같은 room + 같은 입력의 직전 작업이 중단됐으면 그 스레드를 이어받음
+  usage = usage or LlmUsage()
+  thread_id = f"summary:{to}:{job_id or uuid.uuid4().hex}"
+  if job_id and medical_graph.checkpointing_enabled():
+    thread_id = await summary_job_store.claim_thread(job_id, to, stable_hash(data), thread_id)
+  config = medical_graph.build_run_config(
+      send_loading,
+      thread_id=thread_id,
+      llm_usage=usage,
+      reuse_sections=reuse_sections,
+      send_section=send_section)
+  try:
+    result = await medical_graph.run_workflow(data, config)
+  except asyncio.CancelledError:
+    coalescer.close()
+    await _record_cancellation(emitter, to, job_id, usage)
+    raise
+  except Exception:
+    coalescer.close()
+    raise
+  await medical_graph.delete_thread(config)
+  logger.debug(f"[summary] 노드 실행 시간 통계: {node_latency_stats.snapshot()}")
+
+  response = build_summary_response(data, result)
+  response_json = response.model_dump(by_alias=True)
+  if job_id:
+    await summary_job_store.update(job_id, to, "done", result=response_json, fingerprints=fingerprints)
+
+  if not await is_listening():
+    coalescer.close()
+    logger.info(f"[summary] room이 비어 결과 보관만 함 - job: {job_id}, room: {to}")
+    return response
+
+  # room의 모든 클라이언트에게 개별 전송, 응답은 백그라운드에서 수집 (미응답 클라이언트는 보관소에서 재전송)
+  try:
+    result_acks = await emitter.send_with_acks("summarize_patient", response_json, room=to)
+    _collect_acks_in_background(emitter, "summarize_patient", to, result_acks)
+  except Exception as e:
+    if not job_id:
+      raise
+    logger.warning(f"[summary] 결과 전송 실패, 보관소에 저장됨 - job: {job_id}, error: {e}")
+
+  # 완료 상태 전송
+  await send_loading(Loading(status="done"))
+  return response
+
+
+def validate_summary_request(data: SummarizePatientRequest) -> None:
+  """작업 등록 전 요청 옵션 검증
+
+  응답 옵션은 모든 LLM 노드가 끝난 뒤 응답을 만들 때, 우선순위는 실행 슬롯을 받을 때 사용되므로
+  큐에 넣기 전에 확인해서 작업이 뒤늦게 실패하는 일이 없도록 합니다.
+
+  Raises:
+      ValidationException: 지원하지 않는 옵션
+  """
+  mode = data.get('lawDataMode', settings.LAW_DATA_MODE)
+  if not LawData.supports(mode):
+    raise ValidationException(f"지원하지 않는 lawData 모드: {mode}", details={"lawDataMode": mode})
+  priority = data.get('priority', "interactive")
+  if priority not in LANES:
+    raise ValidationException(f"지원하지 않는 우선순위: {priority}", details={"priority": priority})
+
+
+def build_summary_response(data: SummarizePatientRequest, result: dict[str, Any]) -> PatientSummaryResponse:
+  """그래프 실행 결과(state)로 환자 요약 응답 생성"""
+  # Pydantic 모델을 dict로 변환 (JSON 직렬화 가능)
+  progress_notes_summary: Optional[ProgressNoteResult] = result.get(
+      'progress_notes_summary')
+  vs_ns_summary: Optional[VsNsSummaryResult] = result.get("vs_ns_summary")
+  prescription_summary: Optional[PrescriptionSummaryResult] = result.get(
+      "prescription_summary")
+  lab_summary: Optional[LabSummaryResult] = result.get("lab_summary")
+  surgery_summary: Optional[SurgerySummaryResult] = result.get("surgery_summary")
+  clinical_summary: Optional[ClinicalSummaryResult] = result.get("clinical_summary")
+
+  return PatientSummaryResponse(
+      progress_notes_summary=progress_notes_summary,
+      vs_ns_summary=vs_ns_summary,
+      prescription_summary=prescription_summary,
+      lab_summary=lab_summary,
+      radiology_summary=result.get('radiology_summary'),
+      surgery_summary=surgery_summary,
+      clinical_summary=clinical_summary,
+      law_data=LawData.from_vital_signs(
+          data['vitalSigns'],
+          mode=data.get('lawDataMode', settings.LAW_DATA_MODE),
+          max_points=settings.LAW_DATA_MAX_POINTS)
+  )
+
+
+async def find_warm_result(to: str, data: SummarizePatientRequest) -> Optional[tuple[str, dict[str, Any]]]:
+  """직전 완료 결과의 모든 섹션 fingerprint가 현재 입력과 같으면 (작업 id, 결과) 반환
+
+  lawData는 입력이 같아도 요청마다 전송 모드가 다를 수 있으므로 다시 생성합니다.
+
+  사전 계산(prewarm)된 결과나 같은 입력의 이전 요청 결과를 LLM 호출 없이 바로 돌려줄 때 사용합니다.
+  """
+  previous = await summary_job_store.get_latest_done(to)
+  if previous is None or previous.result is None:
+    return None
+  fingerprints = section_fingerprints(data)
+  if unchanged_sections(fingerprints, previous.fingerprints) != set(fingerprints):
+    return None
+
+  law_data = LawData.from_vital_signs(
+      data['vitalSigns'],
+      mode=data.get('lawDataMode', settings.LAW_DATA_MODE),
+      max_points=settings.LAW_DATA_MAX_POINTS)
+  return previous.job_id, {**previous.result, "lawData": law_data.model_dump(by_alias=True)}
+
+
+async def send_warm_result(
+    emitter: RoomEmitter,
+    to: str,
+    data: SummarizePatientRequest,
+    job_id: Optional[str] = None,
+) -> bool:
+  """입력이 보관된 결과와 같으면 LLM 호출 없이 그 결과를 room에 전송하고 작업을 완료로 기록
+
+  force 요청은 보관된 결과를 쓰지 않습니다.
+
+  Returns:
+      보관된 결과로 응답했는지 여부
+  """
+  if data.get("force"):
+    return False
+  warm = await find_warm_result(to, data)
+  if warm is None:
+    return False
+
+  previous_job_id, result = warm
+  logger.info(f"[summary] 보관 결과 응답 - job: {job_id}, room: {to}, 보관 작업: {previous_job_id}")
+  if job_id:
+    await summary_job_store.update(job_id, to, "done", result=result, fingerprints=section_fingerprints(data))
+  await emitter.emit("summarize_patient", result, room=to)
+  await emitter.emit("loading", Loading(status="done", job_id=job_id).to_json(), room=to)
+  return True
+
+
+# 수집 중인 ack 태스크 (GC 방지용 참조)
+_ack_tasks: set[asyncio.Task] = set()
+
+
+def _collect_acks_in_background(
+    emitter: RoomEmitter,
+    event: str,
+    to: str,
+    futures: dict[str, asyncio.Future],
+) -> None:
+  """sid별 ack를 개별 타임아웃으로 수집하고 결과만 로그로 남김 (파이프라인은 기다리지 않음)"""
+  if not futures:
+    return
+
+  task = asyncio.create_task(emitter.collect_acks(futures, timeout=settings.SIO_ACK_TIMEOUT_SECONDS))
+  _ack_tasks.add(task)
+
+  def on_done(t: asyncio.Task) -> None:
+    _ack_tasks.discard(t)
+    if not t.cancelled() and t.exception() is None:
+      acks = t.result()
+      missing = [sid for sid, ack in acks.items() if ack is None]
+      logger.info(f"[summary] {event} ack - room: {to}, 응답: {len(acks) - len(missing)}/{len(acks)}, 미응답: {missing}")
+
+  task.add_done_callback(on_done)
+
+
+async def _reusable_sections(to: str, fingerprints: dict[str, str]) -> dict[str, Any]:
+  """직전 완료 결과 중 입력 fingerprint가 같은 섹션 결과 (state 키 -> 결과 모델)"""
+  previous = await summary_job_store.get_latest_done(to)
+  if previous is None or previous.result is None:
+    return {}
+
+  prior = PatientSummaryResponse.model_validate(previous.result)
+  reuse = {
+      key: getattr(prior, key) for key in unchanged_sections(fingerprints, previous.fingerprints)
+      if getattr(prior, key) is not None}
+  logger.info(
+      f"[summary] 재요약 - room: {to}, 이전 작업: {previous.job_id}, 재사용 섹션: {sorted(reuse)}, "
+      f"재실행 섹션: {sorted(set(fingerprints) - set(reuse))}")
+  return reuse
+
+
+async def _record_cancellation(
+    emitter: RoomEmitter,
+    to: str,
+    job_id: Optional[str],
+    usage: LlmUsage,
+) -> None:
+  """취소된 요청의 중단 호출 수/절감 토큰 기록 및 취소 상태 전송"""
+  # 병렬 노드는 동시에 시작하므로, 아직 시작하지 않은 노드는 최종 통합 노드뿐입니다.
+  pending_nodes = 0 if "create_clinical_summary" in usage.started_nodes else 1
+  cancelled_calls, saved_tokens = cancellation_metrics.record(usage, pending_nodes)
+  logger.info(
+      f"[summary] 요약 취소 - job: {job_id}, room: {to}, 취소 호출: {cancelled_calls}, "
+      f"절감 토큰(추정): {saved_tokens}, 누적 취소 호출: {cancellation_metrics.cancelled_calls}, "
+      f"누적 절감 토큰: {cancellation_metrics.saved_tokens}")
+
+  if job_id:
+    await summary_job_store.update(
+        job_id, to, "cancelled", cancelled_calls=cancelled_calls, saved_tokens=saved_tokens)
+  await emitter.emit(
+      "loading", Loading(status="cancelled", job_id=job_id).to_json(), room=to)
+
+
+async def _skip_for_empty_room(to: str, job_id: Optional[str]) -> None:
+  """결과를 받을 클라이언트가 없어 실행 전에 건너뛴 요청 기록"""
+  cancelled_calls, _ = cancellation_metrics.record(LlmUsage(), pending_nodes=len(medical_graph.builder.nodes))
+  logger.info(
+      f"[summary] room이 비어 요약 건너뜀 - job: {job_id}, room: {to}, 절감 호출: {cancelled_calls}")
+  if job_id:
+    await summary_job_store.update(job_id, to, "cancelled", cancelled_calls=cancelled_calls)
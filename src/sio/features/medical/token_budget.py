@@ -0,0 +1,181 @@
+"""노드별 프롬프트 토큰 예산
+
+노드가 프롬프트에 넣는 이력 항목(경과기록, 투약, 검사 등)을 로컬 토큰 추정치(estimate_tokens)로
+예산 안에 맞춥니다. 입원 기간이 길어도 프롬프트 크기와 LLM 지연이 예산 이상 커지지 않습니다.
+
+항목 선택 순서
+1. 중복 제거: 같은 내용(key)은 가장 최근 항목 하나만 유지
+2. 우선 항목(이상 소견 등) 먼저
+3. 그다음 최근 항목부터 예산이 남는 동안 포함
+
+포함된 항목은 원래 순서를 유지하고, 제외한 항목 수/토큰은 노드별로 기록합니다.
+예산은 settings.PROMPT_TOKEN_BUDGETS(노드 이름 -> 토큰), 없으면 settings.PROMPT_TOKEN_BUDGET을 사용하며
+0 이하는 제한 없음입니다.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from loguru import logger
+from src.core import settings
+from src.sio.features.medical.llm_usage import get_llm_usage
+from src.sio.features.medical.dto import Lab, VitalSign
+from src.utils.token_util import estimate_tokens
+
+
+def node_budget(node: str) -> int:
+  """노드의 토큰 예산 (0 이하는 제한 없음)"""
+  return settings.PROMPT_TOKEN_BUDGETS.get(node, settings.PROMPT_TOKEN_BUDGET)
+
+
+@dataclass
+class BudgetResult[T]:
+  """예산에 맞춘 항목 목록 1개의 결과"""
+  kept: list[T]
+  # 예산 초과로 제외한 항목 (중복 제외)
+  dropped: list[T] = field(default_factory=list)
+  # 중복으로 제외한 항목 수
+  duplicates: int = 0
+  kept_tokens: int = 0
+  dropped_tokens: int = 0
+
+  @property
+  def trimmed(self) -> bool:
+    return bool(self.dropped or self.duplicates)
+
+  def note(self, label: str) -> str:
+    """프롬프트 제목 뒤에 덧붙일 생략 안내 (앞 공백 포함, 생략한 항목이 없으면 빈 문자열)"""
+    parts = []
+    if self.dropped:
+      parts.append(f"토큰 예산 초과로 {label} {len(self.dropped)}건 생략")
+    if self.duplicates:
+      parts.append(f"중복 {label} {self.duplicates}건 생략")
+    return f" ({', '.join(parts)})" if parts else ""
+
+  def summary(self) -> dict[str, int]:
+    return {
+        "kept": len(self.kept),
+        "dropped": len(self.dropped),
+        "duplicates": self.duplicates,
+        "keptTokens": self.kept_tokens,
+        "droppedTokens": self.dropped_tokens,
+    }
+
+
+class TokenBudget:
+  """노드 1회 실행의 프롬프트 토큰 예산
+
+  fit()을 여러 번 호출하면 남은 예산을 이어서 사용합니다. 먼저 호출한 목록이 예산을 모두 쓰지 않도록
+  share로 전체 예산 중 사용할 수 있는 최대 비율을 지정합니다.
+  """
+
+  def __init__(self, node: str, total: Optional[int] = None) -> None:
+    self.node = node
+    self.total = node_budget(node) if total is None else total
+    self.used = 0
+    self.results: dict[str, BudgetResult] = {}
+
+  @property
+  def limited(self) -> bool:
+    return self.total > 0
+
+  def fit[T](
+      self,
+      name: str,
+      items: Sequence[T],
+      render: Callable[[T], str],
+      *,
+      key: Optional[Callable[[T], Hashable]] = None,
+      recency: Optional[Callable[[T], Any]] = None,
+      priority: Optional[Callable[[T], bool]] = None,
+      share: float = 1.0,
+  ) -> BudgetResult[T]:
+    """items 중 예산에 맞는 항목 선택
+
+    Args:
+        name: 기록에 사용할 목록 이름
+        items: 후보 항목
+        render: 프롬프트에 들어갈 항목 문자열 (토큰 추정용)
+        key: 중복 판단 키 (미지정 시 render 결과, 중복 제거는 예산과 관계없이 적용)
+        recency: 최근 순 정렬 키 (클수록 최근, 미지정 시 뒤에 있는 항목이 최근)
+        priority: True인 항목은 최근 항목보다 먼저 포함
+        share: 이 목록이 쓸 수 있는 전체 예산 비율
+    """
+    texts = [render(item) for item in items]
+    keys = [key(item) if key else text for item, text in zip(items, texts)]
+    order = sorted(range(len(items)), key=(lambda i: recency(items[i])) if recency else None, reverse=True)
+    if priority:
+      order.sort(key=lambda i: not priority(items[i]))
+
+    limit = min(self.total - self.used, int(self.total * share)) if self.limited else None
+    seen: set[Hashable] = set()
+    kept_indexes: list[int] = []
+    result = BudgetResult[T](kept=[])
+    for i in order:
+      if keys[i] in seen:
+        result.duplicates += 1
+        continue
+      seen.add(keys[i])
+      tokens = estimate_tokens(texts[i])
+      if limit is not None and result.kept_tokens + tokens > limit:
+        result.dropped.append(items[i])
+        result.dropped_tokens += tokens
+        continue
+      kept_indexes.append(i)
+      result.kept_tokens += tokens
+
+    result.kept = [items[i] for i in sorted(kept_indexes)]
+    self.used += result.kept_tokens
+    self.results[name] = result
+    return result
+
+  def record(self, config: Optional[RunnableConfig] = None) -> None:
+    """생략 내역을 로그와 실행 사용량(LlmUsage.trimmed)에 기록"""
+    trimmed = {name: result.summary() for name, result in self.results.items() if result.trimmed}
+    if not trimmed:
+      return
+    logger.info(f"[token_budget] 프롬프트 축소 - node: {self.node}, 예산: {self.total}, 사용: {self.used}, 생략: {trimmed}")
+    usage = get_llm_usage(config)
+    if usage is not None:
+      usage.trimmed[self.node] = trimmed
+
+
+# === 우선 항목 판단 ===
+
+def _number(value: Any) -> Optional[float]:
+  try:
+    return float(str(value).strip())
+  except (TypeError, ValueError):
+    return None
+
+
+def is_abnormal_lab(lab: Lab) -> bool:
+  """판정(H/L) 또는 정상범위(`a~b`, `a-b`) 밖의 검사 결과"""
+  if (lab.get("note") or "").strip().upper() in ("H", "L", "HH", "LL", "HIGH", "LOW"):
+    return True
+  value = _number(lab.get("resultValue"))
+  normal_range = (lab.get("normalRange") or "").replace(" ", "")
+  for separator in ("~", "-"):
+    low, _, high = normal_range.partition(separator)
+    low, high = _number(low), _number(high)
+    if value is not None and low is not None and high is not None:
+      return not low <= value <= high
+  return False
+
+
+# 활력징후 이상 기준 (값 -> 이상 여부)
+_VITAL_LIMITS: dict[str, Callable[[float], bool]] = {
+    "highPressure": lambda v: v >= 160 or v < 90,
+    "lowPressure": lambda v: v >= 100 or v < 50,
+    "pulse": lambda v: v > 100 or v < 50,
+    "temperature": lambda v: v >= 37.8 or v < 35.5,
+    "respiration": lambda v: v > 24 or v < 10,
+    "spo2": lambda v: v < 94,
+}
+
+
+def is_abnormal_vital(vs: VitalSign) -> bool:
+  """기준 밖의 값이 하나라도 있는 활력징후 측정"""
+  return any(
+      (value := _number(vs.get(key))) is not None and abnormal(value)
+      for key, abnormal in _VITAL_LIMITS.items())
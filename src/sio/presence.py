@@ -0,0 +1,164 @@
+"""room 참여자(presence) 추적
+
+join_room/leave_room/disconnect에서 갱신하며, 요약 파이프라인이 실행 전/단계 사이에
+결과를 받을 클라이언트가 남아 있는지 확인하는 데 사용합니다.
+SIO_CLIENT_MANAGER=redis이면 모든 노드와 워커 프로세스가 같은 presence를 공유합니다.
+HTTP 스트리밍(SSE) 요청도 연결된 동안 HTTP_STREAM_SID_PREFIX로 시작하는 sid로 참여자에 포함됩니다.
+"""
+import asyncio
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Optional
+
+from loguru import logger
+from src.core import settings
+
+
+# Socket.IO 클라이언트가 아닌 HTTP 스트리밍 참여자 sid 접두사 (Socket.IO 전송 대상에서 제외)
+HTTP_STREAM_SID_PREFIX = "http:"
+
+
+def new_http_stream_sid() -> str:
+  return f"{HTTP_STREAM_SID_PREFIX}{uuid.uuid4().hex}"
+
+
+def is_http_stream_sid(sid: str) -> bool:
+  return sid.startswith(HTTP_STREAM_SID_PREFIX)
+
+
+class RoomPresence(ABC):
+  """namespace + room 단위 참여자 sid 집합"""
+
+  @abstractmethod
+  async def add(self, namespace: str, room: str, sid: str) -> None:
+    """room에 sid 추가"""
+
+  @abstractmethod
+  async def remove(self, namespace: str, room: str, sid: str) -> None:
+    """room에서 sid 제거"""
+
+  @abstractmethod
+  async def members(self, namespace: str, room: str) -> set[str]:
+    """room 참여자 sid 목록"""
+
+  async def count(self, namespace: str, room: str, exclude_sid: str | None = None) -> int:
+    """room 참여자 수 (exclude_sid 제외)"""
+    return len((await self.members(namespace, room)) - {exclude_sid})
+
+  async def close(self) -> None:
+    """리소스 정리"""
+
+
+class LocalRoomPresence(RoomPresence):
+  """프로세스 메모리 presence"""
+
+  def __init__(self) -> None:
+    self._rooms: dict[tuple[str, str], set[str]] = defaultdict(set)
+
+  async def add(self, namespace: str, room: str, sid: str) -> None:
+    self._rooms[(namespace, room)].add(sid)
+
+  async def remove(self, namespace: str, room: str, sid: str) -> None:
+    key = (namespace, room)
+    self._rooms[key].discard(sid)
+    if not self._rooms[key]:
+      del self._rooms[key]
+
+  async def members(self, namespace: str, room: str) -> set[str]:
+    return set(self._rooms.get((namespace, room), ()))
+
+
+class RedisRoomPresence(RoomPresence):
+  """Redis 호환 ZSET 기반 presence (노드/워커 간 공유)
+
+  sid마다 마지막 확인 시각을 score로 저장하고, 이 프로세스가 추가한 sid는 heartbeat_seconds마다 갱신합니다.
+  ttl_seconds 동안 갱신되지 않은 sid(비정상 종료된 노드의 클라이언트)는 참여자에서 제외하고 정리하므로,
+  새 참여자 없이 오래 머무는 room도 비어 보이지 않습니다.
+  """
+
+  def __init__(
+      self,
+      url: str,
+      prefix: str,
+      ttl_seconds: float,
+      heartbeat_seconds: float,
+      **redis_options: Any,
+  ) -> None:
+    try:
+      from redis import asyncio as aioredis
+    except ImportError as e:
+      raise RuntimeError("SIO_CLIENT_MANAGER=redis 사용 시 redis 패키지가 필요합니다") from e
+
+    self._redis = aioredis.Redis.from_url(url, decode_responses=True, **redis_options)
+    self._prefix = prefix
+    self.ttl_seconds = ttl_seconds
+    self.heartbeat_seconds = heartbeat_seconds
+    # 이 프로세스가 추가한 참여자 (키 -> sid 집합), heartbeat로 갱신
+    self._local: dict[str, set[str]] = defaultdict(set)
+    self._heartbeat: Optional[asyncio.Task] = None
+
+  def _key(self, namespace: str, room: str) -> str:
+    return f"{self._prefix}:{namespace}:{room}"
+
+  async def add(self, namespace: str, room: str, sid: str) -> None:
+    key = self._key(namespace, room)
+    self._local[key].add(sid)
+    await self._touch(key, [sid])
+    if self._heartbeat is None:
+      self._heartbeat = asyncio.create_task(self._refresh_periodically(), name="room-presence-heartbeat")
+
+  async def remove(self, namespace: str, room: str, sid: str) -> None:
+    key = self._key(namespace, room)
+    self._local[key].discard(sid)
+    if not self._local[key]:
+      del self._local[key]
+    await self._redis.zrem(key, sid)
+
+  async def members(self, namespace: str, room: str) -> set[str]:
+    key = self._key(namespace, room)
+    async with self._redis.pipeline(transaction=True) as pipe:
+      pipe.zremrangebyscore(key, "-inf", time.time() - self.ttl_seconds)
+      pipe.zrange(key, 0, -1)
+      _, sids = await pipe.execute()
+    return set(sids)
+
+  async def _touch(self, key: str, sids: list[str]) -> None:
+    """sid의 마지막 확인 시각 갱신 (모든 참여자의 갱신이 끊기면 키도 만료)"""
+    now = time.time()
+    async with self._redis.pipeline(transaction=True) as pipe:
+      pipe.zadd(key, {sid: now for sid in sids})
+      pipe.expire(key, math.ceil(self.ttl_seconds))
+      await pipe.execute()
+
+  async def _refresh_periodically(self) -> None:
+    while True:
+      await asyncio.sleep(self.heartbeat_seconds)
+      for key, sids in list(self._local.items()):
+        try:
+          await self._touch(key, list(sids))
+        except Exception as e:
+          logger.warning(f"[presence] 참여자 갱신 실패 - key: {key}, error: {e}")
+
+  async def close(self) -> None:
+    if self._heartbeat:
+      self._heartbeat.cancel()
+      await asyncio.gather(self._heartbeat, return_exceptions=True)
+      self._heartbeat = None
+    await self._redis.aclose()
+
+
+def create_room_presence() -> RoomPresence:
+  """settings.SIO_CLIENT_MANAGER에 맞는 presence 생성"""
+  if settings.SIO_CLIENT_MANAGER == "redis":
+    return RedisRoomPresence(
+        settings.REDIS_URL,
+        settings.ROOM_PRESENCE_KEY_PREFIX,
+        settings.ROOM_PRESENCE_TTL_SECONDS,
+        settings.ROOM_PRESENCE_HEARTBEAT_SECONDS)
+  return LocalRoomPresence()
+
+
+room_presence: RoomPresence = create_room_presence()
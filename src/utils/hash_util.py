@@ -0,0 +1,13 @@
+import hashlib
+import json
+from typing import Any
+
+
+def canonical_json(data: Any) -> str:
+  """키 정렬 + 공백 제거 JSON 문자열 (클라이언트와 동일한 해시 계산용)"""
+  return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def stable_hash(data: Any) -> str:
+  """canonical_json 기준 sha256 hex digest"""
+  return hashlib.sha256(canonical_json(data).encode("utf-8")).hexdigest()
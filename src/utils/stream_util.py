@@ -0,0 +1,82 @@
+import asyncio
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable
+
+
+async def iter_ndjson_lines(chunks: AsyncIterable[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+  """바이트 청크 스트림을 줄 단위로 분리 (빈 줄 제외, 한 줄이 max_line_bytes를 넘으면 ValueError)
+
+  줄바꿈은 새로 받은 바이트에서만 찾으므로, 긴 줄이 작은 청크로 나뉘어 와도 전체 처리량은 입력 크기에 비례합니다.
+  """
+  buffer = bytearray()
+  async for chunk in chunks:
+    scanned = len(buffer)
+    buffer += chunk
+    start = 0
+    while (end := buffer.find(b"\n", scanned)) != -1:
+      if end - start > max_line_bytes:
+        raise ValueError(f"NDJSON 한 줄이 {max_line_bytes} bytes를 초과했습니다")
+      line = bytes(buffer[start:end])
+      if line.strip():
+        yield line
+      start = scanned = end + 1
+    del buffer[:start]
+    if len(buffer) > max_line_bytes:
+      raise ValueError(f"NDJSON 한 줄이 {max_line_bytes} bytes를 초과했습니다")
+  if buffer.strip():
+    yield bytes(buffer)
+
+
+def ndjson_line(data: Any) -> bytes:
+  return json.dumps(data, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+
+def sse_event(event: str, data: Any) -> bytes:
+  """Server-Sent Events 메시지 1건 (data는 한 줄 JSON)"""
+  payload = json.dumps(data, ensure_ascii=False, default=str)
+  return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+async def map_unordered[T, R](
+    items: AsyncIterable[T],
+    worker: Callable[[T], Awaitable[R]],
+    concurrency: int,
+) -> AsyncIterator[R]:
+  """items를 최대 concurrency개씩 동시에 처리하고 끝나는 즉시 결과 반환 (입력 순서와 무관)
+
+  실행 중이거나 아직 소비되지 않은 결과가 concurrency개면 입력을 더 읽지 않으므로,
+  배치 크기와 관계없이 메모리 사용량이 일정합니다.
+  소비자가 중간에 멈추면(연결 종료 등) 입력 읽기와 실행 중인 작업이 취소됩니다.
+  worker 예외는 결과를 꺼낼 때 다시 발생하므로, 항목별 실패는 worker 안에서 결과로 변환해야 합니다.
+  """
+  slots = asyncio.Semaphore(concurrency)
+  finished: asyncio.Queue[asyncio.Task[R] | None] = asyncio.Queue()
+  running: set[asyncio.Task[R]] = set()
+
+  def on_done(task: asyncio.Task[R]) -> None:
+    running.discard(task)
+    finished.put_nowait(task)
+
+  async def feed() -> None:
+    async for item in items:
+      await slots.acquire()
+      task = asyncio.create_task(worker(item))
+      running.add(task)
+      task.add_done_callback(on_done)
+    # 남은 작업이 모두 끝날 때까지 기다린 뒤 종료 표시
+    for _ in range(concurrency):
+      await slots.acquire()
+    finished.put_nowait(None)
+
+  feeder = asyncio.create_task(feed())
+  feeder.add_done_callback(lambda t: t.cancelled() or t.exception() is None or finished.put_nowait(None))
+  try:
+    while (task := await finished.get()) is not None:
+      # 결과를 넘겨준 뒤에 슬롯 반환 (소비가 느리면 끝난 결과가 쌓이지 않도록 입력 읽기도 멈춤)
+      slots.release()
+      yield task.result()
+    await feeder
+  finally:
+    feeder.cancel()
+    for task in list(running):
+      task.cancel()
@@ -0,0 +1,13 @@
+import math
+
+
+def estimate_tokens(text: str) -> int:
+  """토크나이저 없이 빠르게 토큰 수를 추정
+
+  영문/숫자/기호는 약 4자당 1토큰, 한글 등 비 ASCII 문자는 약 1.5자당 1토큰으로 계산합니다.
+  """
+  if not text:
+    return 0
+  ascii_count = len(text.encode("ascii", "ignore"))
+  other_count = len(text) - ascii_count
+  return math.ceil(ascii_count / 4 + other_count / 1.5)
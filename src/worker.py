@@ -0,0 +1,49 @@
+"""환자 요약 워커 프로세스
+
+SUMMARY_QUEUE=redis, SIO_CLIENT_MANAGER=redis 환경에서 웹 프로세스와 별도로 실행합니다.
+
+    python -m src.worker
+"""
+import asyncio
+import sys
+
+from loguru import logger
+from src.core import settings
+from src.core.logging_conf import setup_loguru
+from src.sio.emitter import ManagerEmitter
+from src.sio.features.medical import MedicalNamespace
+from src.sio.features.medical import medical_graph
+from src.sio.features.medical.checkpoint import open_checkpointer
+from src.sio.features.medical.job_store import summary_job_store
+from src.sio.features.medical.jobs import SummaryWorkerPool, summary_queue
+from src.services import close_emr_service
+from src.sio.presence import room_presence
+
+
+async def main() -> None:
+  if settings.SUMMARY_QUEUE != "redis" or settings.SIO_CLIENT_MANAGER != "redis":
+    raise RuntimeError("워커 프로세스는 SUMMARY_QUEUE=redis, SIO_CLIENT_MANAGER=redis 에서만 실행합니다")
+
+  async with open_checkpointer() as checkpointer:
+    medical_graph.compile_workflow(checkpointer)
+
+    pool = SummaryWorkerPool(summary_queue, emitter=ManagerEmitter(MedicalNamespace.namespace))
+    pool.start()
+    try:
+      await asyncio.Event().wait()
+    finally:
+      await pool.stop()
+      await summary_queue.close()
+      await summary_job_store.close()
+      await room_presence.close()
+      await close_emr_service()
+
+
+if __name__ == "__main__":
+  if sys.platform != "win32":
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+  setup_loguru()
+  logger.info("요약 워커 프로세스 시작")
+  asyncio.run(main())
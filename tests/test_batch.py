@@ -0,0 +1,70 @@
+"""HTTP 배치 요약 테스트 (워커 풀 경유)"""
+import json
+
+import pytest
+
+from src.api.medical import _summarize_line
+from src.core import settings
+from src.sio.features.medical.job_store import summary_job_store
+from src.sio.features.medical.jobs import SummaryJob
+
+
+class FakePool:
+  """작업을 받아 보관소에 결과만 기록하는 워커 풀"""
+
+  def __init__(self, status: str = "done") -> None:
+    self.status = status
+    self.jobs: list[SummaryJob] = []
+
+  async def run(self, job: SummaryJob, emitter) -> None:
+    self.jobs.append(job)
+    if self.status == "done":
+      await summary_job_store.update(job.job_id, job.room, "done", result={"clinicalSummary": "요약"})
+    else:
+      await summary_job_store.update(job.job_id, job.room, self.status, error="요청이 많아 처리할 수 없습니다.")
+
+
+async def test_batch_line_runs_in_background_lane(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(settings, "TENANT_WEIGHTS", {"01": 1})
+  pool = FakePool()
+  line = json.dumps({"patientInfo": {"chart": "00000001"}, "saup": "01"}).encode()
+
+  result = await _summarize_line(pool, (3, line))
+
+  assert result == {"index": 3, "chart": "00000001", "summary": {"clinicalSummary": "요약"}}
+  job = pool.jobs[0]
+  assert (job.priority, job.tenant, job.silent) == ("background", "01", True)
+
+
+async def test_batch_line_reports_rejection() -> None:
+  result = await _summarize_line(FakePool("rejected"), (0, b"{}"))
+
+  assert result["index"] == 0
+  assert result["error"] == "요청이 많아 처리할 수 없습니다."
+
+
+async def test_batch_line_reports_invalid_json() -> None:
+  result = await _summarize_line(FakePool(), (1, b"{not json"))
+
+  assert result["index"] == 1
+  assert "error" in result
+
+
+async def test_batch_line_rejects_invalid_option_before_enqueue() -> None:
+  pool = FakePool()
+  line = json.dumps({"patientInfo": {"chart": "00000001"}, "lawDataMode": "zip"}).encode()
+
+  result = await _summarize_line(pool, (2, line))
+
+  assert result["index"] == 2
+  assert "lawData" in result["error"]
+  assert pool.jobs == []
+
+
+async def test_batch_line_rejects_unknown_priority() -> None:
+  pool = FakePool()
+
+  result = await _summarize_line(pool, (4, json.dumps({"priority": "urgent"}).encode()))
+
+  assert "우선순위" in result["error"]
+  assert pool.jobs == []
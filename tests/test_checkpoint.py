@@ -0,0 +1,22 @@
+"""체크포인트 보관 기간 정리 테스트"""
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.sio.features.medical.checkpoint import prune_checkpoints
+from src.sio.features.medical.medical_graph import builder
+
+
+async def _run(saver: InMemorySaver, thread_id: str) -> None:
+  graph = builder.compile(checkpointer=saver)
+  config = {"configurable": {"thread_id": thread_id}}
+  await graph.aupdate_state(config, {"data": {}}, as_node="create_clinical_summary")
+
+
+async def test_prune_removes_only_expired_threads() -> None:
+  saver = InMemorySaver()
+  await _run(saver, "summary:patient-1:job-1")
+
+  assert await prune_checkpoints(saver, retention_seconds=3600) == 0
+  assert await saver.aget_tuple({"configurable": {"thread_id": "summary:patient-1:job-1"}}) is not None
+
+  assert await prune_checkpoints(saver, retention_seconds=-1) == 1
+  assert await saver.aget_tuple({"configurable": {"thread_id": "summary:patient-1:job-1"}}) is None
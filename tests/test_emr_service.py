@@ -0,0 +1,71 @@
+"""EMR 조회 서비스 테스트 (aiosqlite 파일 DB)"""
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.models.ns import Ns
+from src.models.progressnote import ProgressNote
+from src.models.vs import Vs
+from src.services import EmrService, resolve_chart
+from src.services.chart_snapshot import LocalChartSnapshotStore
+
+REF = {"saup": "01", "chart": "00000001", "ibymd": "20240101"}
+
+
+@pytest.fixture
+async def session_factory(tmp_path: Path):
+  engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'emr.sqlite'}")
+  async with engine.begin() as conn:
+    for model in (Vs, Ns, ProgressNote):
+      await conn.run_sync(model.metadata.create_all)
+
+  factory = async_sessionmaker(engine, expire_on_commit=False)
+  async with factory() as session:
+    session.add_all([
+        Vs(auto=1, **REF, ymd="20240102", time="0900", hulap1="120", hulap2="80", maekbak="72"),
+        Vs(auto=2, **REF, ymd="20240101", time="1800", hulap1="130", hulap2="85", cheon="37.8"),
+        # 삭제된 행과 다른 입원 기간의 행은 제외
+        Vs(auto=3, **REF, ymd="20240102", time="1000", dc="1"),
+        Vs(auto=4, **{**REF, "ibymd": "20230101"}, ymd="20230101", time="0900"),
+        Ns(auto=1, **REF, ymd="20240101", dup=1, time="0700", neyong1="낙상 위험", neyong2="침상 난간 올림"),
+        ProgressNote(
+            auto=1, **REF, ymd="20240101", dup=1, time="0900", gubun="01", weibgu="I", yuhyung="01",
+            jinchal="01", soapuse="1", s="복통 호소", a="충수염 의증"),
+    ])
+    await session.commit()
+  yield factory
+  await engine.dispose()
+
+
+async def test_load_chart(session_factory) -> None:
+  chart = await EmrService(session_factory, batch_size=1).load_chart(REF)
+
+  assert [(v["ymd"], v["time"]) for v in chart["vitalSigns"]] == [("20240101", "1800"), ("20240102", "0900")]
+  assert chart["vitalSigns"][0]["temperature"] == "37.8"
+  assert chart["vitalSigns"][1]["temperature"] == ""
+  assert chart["nursingRecords"] == [{
+      "ymd": "20240101", "time": "0700", "nursingDiagnosis": "낙상 위험", "nursingIntervention": "침상 난간 올림"}]
+  assert chart["progressNotes"][0]["progress"] == "S: 복통 호소\nA: 충수염 의증"
+
+
+@pytest.mark.parametrize("snapshots", [False, True])
+async def test_resolve_fills_only_missing_keys(session_factory, snapshots: bool) -> None:
+  service = EmrService(session_factory, snapshots=LocalChartSnapshotStore(max_charts=10) if snapshots else None)
+  note = {"ymd": "20240105", "time": "1000", "progress": "클라이언트 기록"}
+
+  resolved = await service.resolve({"chartRef": REF, "progressNotes": [note], "vitalSigns": []})
+
+  assert resolved["progressNotes"] == [note]
+  assert len(resolved["vitalSigns"]) == 2
+  assert len(resolved["nursingRecords"]) == 1
+
+
+async def test_resolve_chart_without_ref_skips_database() -> None:
+  data = {"vitalSigns": []}
+
+  # chartRef가 없으면 DATABASE_URL이 비어 있어도 엔진을 만들지 않음
+  assert await resolve_chart(data) is data
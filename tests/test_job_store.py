@@ -0,0 +1,101 @@
+"""작업 보관소 동시 갱신 테스트 (Redis 호환 보관소는 fakeredis 사용)"""
+import asyncio
+
+import pytest
+
+from src.core import settings
+from src.sio.features.medical.job_store import LocalSummaryJobStore, RedisSummaryJobStore, SummaryJobStore
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture(params=["local", "redis"])
+async def store(request: pytest.FixtureRequest):
+  if request.param == "local":
+    store: SummaryJobStore = LocalSummaryJobStore(ttl_seconds=60, max_jobs=100)
+  else:
+    store = RedisSummaryJobStore(
+        "redis://localhost:6379/0", "test:summary", ttl_seconds=60,
+        connection_class=fakeredis.FakeAsyncRedisConnection, server=fakeredis.FakeServer())
+  yield store
+  await store.close()
+
+
+async def test_status_update_keeps_cancel_request(store: SummaryJobStore) -> None:
+  await store.update("job-1", "patient-1", "queued", requester_sid="sid-1")
+
+  assert await store.request_cancel("job-1") is not None
+  # 취소 요청 직후 워커가 실행 상태로 바꿔도 취소 요청은 유지
+  record = await store.update("job-1", "patient-1", "running")
+
+  assert record.status == "running"
+  assert record.cancel_requested
+  assert record.requester_sid == "sid-1"
+  assert (await store.get("job-1")).cancel_requested
+
+
+async def test_concurrent_updates_and_cancel(store: SummaryJobStore) -> None:
+  await store.update("job-1", "patient-1", "queued")
+
+  results = await asyncio.gather(
+      *(store.update("job-1", "patient-1", "running") for _ in range(10)),
+      store.request_cancel("job-1"),
+      *(store.update("job-1", "patient-1", "running") for _ in range(10)))
+
+  assert results[10] is not None
+  assert (await store.get("job-1")).cancel_requested
+
+
+async def test_cancel_ignores_finished_job(store: SummaryJobStore) -> None:
+  await store.update("job-1", "patient-1", "done", result={"ok": True}, fingerprints={"labs": "a"})
+
+  assert await store.request_cancel("job-1") is None
+  assert await store.request_cancel("missing") is None
+
+  done = await store.get_latest_done("patient-1")
+  assert done.result == {"ok": True}
+  assert done.fingerprints == {"labs": "a"}
+  assert not done.cancel_requested
+
+
+async def test_claim_thread_resumes_only_abandoned_job(store: SummaryJobStore) -> None:
+  await store.update("job-1", "patient-1", "running")
+  assert await store.claim_thread("job-1", "patient-1", "input-a", "thread-1") == "thread-1"
+
+  # 같은 입력의 직전 작업이 실행 중이면 새 스레드 사용
+  await store.update("job-2", "patient-1", "running")
+  assert await store.claim_thread("job-2", "patient-1", "input-a", "thread-2") == "thread-2"
+
+  # 직전 작업이 실패했으면 그 스레드를 이어받음
+  await store.update("job-2", "patient-1", "failed")
+  await store.update("job-3", "patient-1", "running")
+  assert await store.claim_thread("job-3", "patient-1", "input-a", "thread-3") == "thread-2"
+
+  # 이어받은 작업이 실행 중이면 같은 입력의 다음 요청은 새 스레드 사용
+  await store.update("job-4", "patient-1", "running")
+  assert await store.claim_thread("job-4", "patient-1", "input-a", "thread-4") == "thread-4"
+
+
+async def test_claim_thread_resumes_stale_job(store: SummaryJobStore, monkeypatch: pytest.MonkeyPatch) -> None:
+  await store.update("job-1", "patient-1", "running")
+  await store.claim_thread("job-1", "patient-1", "input-a", "thread-1")
+  await store.update("job-2", "patient-1", "running")
+
+  # heartbeat가 끊긴 실행 작업은 중단된 것으로 봄
+  monkeypatch.setattr(settings, "SUMMARY_JOB_STALE_SECONDS", -1)
+  assert await store.claim_thread("job-2", "patient-1", "input-a", "thread-2") == "thread-1"
+
+
+async def test_silent_job_stays_out_of_latest(store: SummaryJobStore) -> None:
+  await store.update("job-user", "patient-1", "running", requester_sid="sid-1")
+  await store.update("job-prewarm", "patient-1", "queued", silent=True)
+  await store.update("job-prewarm", "patient-1", "running")
+
+  # join_room/room 취소는 사용자 요청을 가리킴
+  assert (await store.get_latest("patient-1")).job_id == "job-user"
+  assert (await store.get_latest_silent("patient-1")).job_id == "job-prewarm"
+
+  await store.update("job-prewarm", "patient-1", "done", result={"clinicalSummary": "사전 계산"})
+  assert (await store.get_latest("patient-1")).job_id == "job-user"
+  # 완료되면 보관 결과로만 사용
+  assert (await store.get_latest_done("patient-1")).job_id == "job-prewarm"
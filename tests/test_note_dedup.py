@@ -0,0 +1,61 @@
+"""경과기록 반복 문단 접기/토큰 예산 테스트"""
+import re
+
+import pytest
+
+from src.core import settings
+from src.sio.features.medical import note_dedup
+from src.sio.features.medical.note_dedup import collapse_repeats, fit_progress_notes
+from src.sio.features.medical.token_budget import TokenBudget
+from src.utils.format_util import ymd_to_date
+from src.utils.token_util import estimate_tokens
+
+
+def _render(note: dict) -> str:
+  return f"{note['ymd']} {note['time']}\n{note['progress']}"
+
+
+def _copy_forward_notes(days: int) -> list[dict]:
+  """첫날 긴 문단을 매일 그대로 복사하고 한 줄만 새로 쓴 경과기록"""
+  carried = "\n".join(f"{i}번 문제: 활력징후 안정적이며 기존 치료 유지, 경과 관찰 필요함 " * 3 for i in range(8))
+  return [
+      {"ymd": f"202403{day + 1:02d}", "time": "0900", "progress": f"{carried}\n{day + 1}일차 특이사항 없음"}
+      for day in range(days)]
+
+
+@pytest.fixture(autouse=True)
+def collapse_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(settings, "PROGRESS_NOTE_COLLAPSE_REPEATS", True)
+
+
+def test_refolded_notes_stay_within_budget() -> None:
+  notes = _copy_forward_notes(10)
+  collapsed = collapse_repeats(notes)
+  # 원문 1건 + 접힌 기록 3건 크기: 접힌 크기로는 최근 기록이 더 많이 들어가지만,
+  # 첫날 원문이 빠지면 다시 접은 가장 오래된 기록이 원문으로 돌아옴
+  total = sum(estimate_tokens(_render(note)) for note in collapsed[:4])
+  budget = TokenBudget("progress", total=total)
+
+  kept, result = fit_progress_notes(budget, notes, _render, collapsed=collapsed)
+
+  assert result.dropped
+  assert sum(estimate_tokens(_render(note)) for note in kept) == result.kept_tokens <= total
+  assert budget.used == result.kept_tokens
+  assert len(kept) == len(result.kept) and len(kept) + len(result.dropped) == len(notes)
+  # 포함된 기록은 생략된 기록을 참조하지 않음
+  kept_dates = {ymd_to_date(note['ymd']) for note in kept}
+  refs = {ref for note in kept for ref in re.findall(r"동일 \((\S+) 참조\)", note['progress'])}
+  assert refs and refs <= kept_dates
+
+
+def test_precomputed_collapse_is_reused(monkeypatch: pytest.MonkeyPatch) -> None:
+  notes = _copy_forward_notes(5)
+  collapsed = collapse_repeats(notes)
+  calls = []
+  original = note_dedup.collapse_repeats
+  monkeypatch.setattr(note_dedup, "collapse_repeats", lambda n: calls.append(len(n)) or original(n))
+
+  kept, result = fit_progress_notes(TokenBudget("progress", total=0), notes, _render, collapsed=collapsed)
+
+  assert calls == []
+  assert kept == collapsed and not result.trimmed
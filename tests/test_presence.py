@@ -0,0 +1,54 @@
+"""room presence 만료/빈 room 정책 테스트 (Redis 호환 presence는 fakeredis 사용)"""
+import asyncio
+
+import pytest
+
+from src.core import settings
+from src.sio.features.medical.job_store import summary_job_store
+from src.sio.features.medical.main import MedicalNamespace
+from src.sio.presence import RedisRoomPresence
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _presence(server) -> RedisRoomPresence:
+  return RedisRoomPresence(
+      "redis://localhost:6379/0", "test:presence", ttl_seconds=0.3, heartbeat_seconds=0.05,
+      connection_class=fakeredis.FakeAsyncRedisConnection, server=server)
+
+
+async def test_occupied_room_outlives_ttl() -> None:
+  presence = _presence(fakeredis.FakeServer())
+  try:
+    await presence.add("/medical", "room-1", "sid-1")
+    # 새 참여자가 없어도 heartbeat로 갱신되므로 만료 시간이 지나도 남아 있음
+    await asyncio.sleep(0.5)
+    assert await presence.members("/medical", "room-1") == {"sid-1"}
+  finally:
+    await presence.close()
+
+
+async def test_sids_of_stopped_node_expire() -> None:
+  server = fakeredis.FakeServer()
+  stopped, alive = _presence(server), _presence(server)
+  try:
+    await stopped.add("/medical", "room-2", "sid-stopped")
+    await alive.add("/medical", "room-2", "sid-alive")
+    # 비정상 종료된 노드는 갱신을 멈춤
+    await stopped.close()
+    await asyncio.sleep(0.5)
+    assert await alive.members("/medical", "room-2") == {"sid-alive"}
+  finally:
+    await alive.close()
+
+
+@pytest.mark.parametrize(("policy", "cancelled"), [("park", False), ("abort", True)])
+async def test_empty_room_cancels_only_on_abort(
+    monkeypatch: pytest.MonkeyPatch, policy: str, cancelled: bool) -> None:
+  monkeypatch.setattr(settings, "EMPTY_ROOM_POLICY", policy)
+  room = f"empty-room-{policy}"
+  await summary_job_store.update(f"job-{policy}", room, "running")
+
+  await MedicalNamespace().cancel_if_room_empty(room)
+
+  assert (await summary_job_store.get(f"job-{policy}")).cancel_requested is cancelled
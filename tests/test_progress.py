@@ -0,0 +1,47 @@
+"""요약 진행률/남은 시간 추정 테스트"""
+from src.sio.features.medical import sections
+from src.sio.features.medical.medical_graph import build_run_config, section_node
+from src.sio.features.medical.progress import (
+    FINAL_TARGET,
+    PARALLEL_TARGETS,
+    NodeLatencyStats,
+    SummaryProgress,
+)
+
+
+def test_final_latency_measured_from_parallel_completion(monkeypatch) -> None:
+  clock = iter([0.0, 10.0, 10.0, 10.0, 10.0, 10.0, 10.0, 14.0])
+  monkeypatch.setattr("src.sio.features.medical.progress.time.monotonic", lambda: next(clock))
+  stats = NodeLatencyStats(min_samples=1)
+  progress = SummaryProgress({}, stats=stats)
+
+  for target in PARALLEL_TARGETS:
+    progress.complete(target)
+  progress.complete(FINAL_TARGET)
+
+  # 시작부터 14초가 아니라 병렬 노드가 끝난 뒤 4초
+  assert stats.estimate(FINAL_TARGET, 0) == 4.0
+
+
+def test_final_latency_skipped_without_parallel_completion() -> None:
+  stats = NodeLatencyStats(min_samples=1)
+  progress = SummaryProgress({}, stats=stats)
+
+  progress.complete(FINAL_TARGET)
+
+  assert stats.estimate(FINAL_TARGET, 0) is None
+  assert progress.remaining_seconds() == 0.0
+
+
+async def test_empty_section_reports_completion() -> None:
+  sent = []
+
+  async def send_loading(loading) -> None:
+    sent.append(loading.complete_target)
+
+  async def empty_node(state, config):
+    return {}
+
+  node = section_node(sections.SURGERY, empty_node)
+  assert await node({}, build_run_config(send_loading)) == {}
+  assert sent == [sections.SURGERY.target]
@@ -0,0 +1,108 @@
+"""실행 수락(admission) 제어 테스트"""
+import asyncio
+
+import pytest
+
+from src.sio.features.medical.scheduler import AdmissionController, AdmissionRejected
+
+
+async def test_burst_does_not_exceed_backlog() -> None:
+  admission = AdmissionController(max_concurrency=1, max_backlog=2, default_duration=1)
+  release = asyncio.Event()
+
+  async def request(key: str) -> str:
+    try:
+      async with admission.slot(key):
+        await release.wait()
+    except AdmissionRejected:
+      return "rejected"
+    return "done"
+
+  # 확인과 대기열 등록 사이에 다른 요청이 끼어들 수 없으므로 실행 1 + 대기 2만 수락
+  tasks = [asyncio.create_task(request(f"job-{i}")) for i in range(6)]
+  await asyncio.sleep(0)
+  assert admission.active == 1
+  assert admission.backlog == 2
+
+  release.set()
+  assert sorted(await asyncio.gather(*tasks)) == ["done"] * 3 + ["rejected"] * 3
+
+
+async def test_position_notified_only_when_changed() -> None:
+  admission = AdmissionController(max_concurrency=1, max_backlog=10, default_duration=1)
+  notified: dict[str, list[int]] = {}
+  release = asyncio.Event()
+
+  async def request(key: str) -> None:
+    async def on_position(position: int, _: float) -> None:
+      notified.setdefault(key, []).append(position)
+
+    async with admission.slot(key, on_position=on_position):
+      await release.wait()
+
+  tasks = [asyncio.create_task(request(f"job-{i}")) for i in range(4)]
+  await asyncio.sleep(0.01)
+  # 같은 틱에 들어온 대기자는 최종 위치만 한 번씩 알림
+  assert notified == {"job-1": [1], "job-2": [2], "job-3": [3]}
+
+  tasks[2].cancel()
+  await asyncio.sleep(0.01)
+  # 취소된 대기자 뒤의 대기자만 다시 알림
+  assert notified == {"job-1": [1], "job-2": [2], "job-3": [3, 2]}
+
+  release.set()
+  await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.parametrize("lane", ["interactive", "background"])
+async def test_check_rejects_full_lane(lane: str) -> None:
+  admission = AdmissionController(
+      max_concurrency=1, max_backlog=0, default_duration=1, background_max_backlog=0)
+  async with admission.slot("job-0", lane=lane):
+    with pytest.raises(AdmissionRejected):
+      admission.check(lane=lane)
+
+
+async def test_quota_blocked_waiter_resumes_when_window_rolls() -> None:
+  admission = AdmissionController(
+      max_concurrency=1, max_backlog=10, default_duration=1, tenant_token_quotas={"01": 10}, quota_window=0.05)
+
+  async with admission.slot("job-0", tenant="01"):
+    waiter = asyncio.create_task(admission.slot("job-1", tenant="01").__aenter__())
+    await asyncio.sleep(0)
+    # 실행 중인 요청이 한도를 넘기면 대기자는 다음 한도 구간까지 배정되지 않음
+    admission.record_tokens("01", 20)
+  assert not waiter.done()
+
+  # 다른 요청이 없어도 한도 구간이 바뀌면 배정
+  await asyncio.wait_for(waiter, 1)
+  assert admission.active == 1
+
+
+async def test_idle_unconfigured_tenants_are_evicted() -> None:
+  admission = AdmissionController(
+      max_concurrency=1, max_backlog=10, default_duration=1, tenant_weights={"01": 2})
+
+  for tenant in ("01", "x-1", "x-2"):
+    async with admission.slot(f"job-{tenant}", tenant=tenant):
+      pass
+
+  assert set(admission.metrics()) == {"01"}
+
+
+async def test_capped_interactive_waiter_does_not_block_background() -> None:
+  admission = AdmissionController(
+      max_concurrency=3, max_backlog=10, default_duration=1, tenant_max_concurrency={"01": 1})
+
+  async with admission.slot("job-0", tenant="01"):
+    # 기관 동시 실행 한도로 막힌 interactive 대기자
+    capped = asyncio.create_task(admission.slot("job-1", tenant="01").__aenter__())
+    await asyncio.sleep(0)
+    assert not capped.done()
+
+    # 남는 슬롯은 다른 기관의 background가 사용
+    background = admission.slot("job-2", tenant="02", lane="background")
+    await asyncio.wait_for(background.__aenter__(), 1)
+    assert admission.active_by_lane["background"] == 1
+    await background.__aexit__(None, None, None)
+  await asyncio.wait_for(capped, 1)
@@ -0,0 +1,113 @@
+"""SIO_CLIENT_MANAGER=redis 노드 간 room 전송 테스트
+
+기본은 fakeredis(프로세스 내부 Redis 호환 서버)를 사용하고, TEST_REDIS_URL을 지정하면
+실제 Redis 호환 서버(compose.yaml의 valkey 등)로 같은 테스트를 실행합니다.
+
+    docker compose up -d valkey && TEST_REDIS_URL=redis://localhost:6379/15 uv run pytest tests/test_sio_redis_manager.py
+"""
+import asyncio
+import os
+import uuid
+
+import pytest
+from socketio import AsyncServer
+
+from src.core import config
+from src.sio.config import create_client_manager
+from src.sio.emitter import ManagerEmitter
+
+fakeredis = pytest.importorskip("fakeredis")
+
+NAMESPACE = "/medical"
+
+
+@pytest.fixture
+def redis_options(monkeypatch: pytest.MonkeyPatch) -> dict:
+  monkeypatch.setattr(config.settings, "SIO_CLIENT_MANAGER", "redis")
+  # 테스트마다 다른 채널을 사용해 다른 테스트의 메시지를 받지 않도록 함
+  monkeypatch.setattr(config.settings, "SIO_CHANNEL", f"test-socketio-{uuid.uuid4().hex}")
+  url = os.environ.get("TEST_REDIS_URL")
+  if url:
+    monkeypatch.setattr(config.settings, "REDIS_URL", url)
+    return {}
+  return {"connection_class": fakeredis.FakeAsyncRedisConnection, "server": fakeredis.FakeServer()}
+
+
+class Node:
+  """redis client manager를 사용하는 Socket.IO 서버 1개 (replica 1개에 해당)"""
+
+  def __init__(self, redis_options: dict) -> None:
+    self.server = AsyncServer(async_mode="asgi", client_manager=create_client_manager(redis_options=redis_options))
+    self.received: asyncio.Queue[tuple[str, bytes | str]] = asyncio.Queue()
+
+    async def capture(eio_sid, eio_pkt) -> None:
+      await self.received.put((eio_sid, eio_pkt.data))
+
+    # 실제 연결 대신 엔진 전송 지점에서 패킷 수집
+    self.server._send_eio_packet = capture
+    self.server.manager.initialize()
+
+  async def join(self, room: str) -> str:
+    """이 노드에 연결된 클라이언트 1개를 room에 참여시키고 engine.io sid 반환"""
+    eio_sid = uuid.uuid4().hex
+    sid = await self.server.manager.connect(eio_sid, NAMESPACE)
+    await self.server.manager.enter_room(sid, NAMESPACE, room)
+    return eio_sid
+
+  async def wait_for(self, timeout: float = 2.0) -> tuple[str, bytes | str]:
+    return await asyncio.wait_for(self.received.get(), timeout)
+
+  async def close(self) -> None:
+    await self.server.shutdown()
+
+
+@pytest.fixture
+async def nodes(redis_options: dict):
+  created: list[Node] = []
+
+  def make() -> Node:
+    node = Node(redis_options)
+    created.append(node)
+    return node
+
+  yield make
+  for node in created:
+    await node.close()
+
+
+async def _subscribed(*nodes: Node) -> None:
+  """각 노드의 pub/sub 구독이 시작될 때까지 대기"""
+  for _ in range(100):
+    if all(node.server.manager.pubsub and node.server.manager.pubsub.subscribed for node in nodes):
+      return
+    await asyncio.sleep(0.02)
+  raise TimeoutError("pub/sub 구독이 시작되지 않았습니다")
+
+
+async def test_room_emit_reaches_client_on_other_node(nodes) -> None:
+  node_a, node_b = nodes(), nodes()
+  listener = await node_b.join("patient-1")
+  await node_b.join("patient-2")
+  await _subscribed(node_a, node_b)
+
+  await node_a.server.emit("summarize_patient", {"jobId": "job-1"}, room="patient-1", namespace=NAMESPACE)
+
+  eio_sid, packet = await node_b.wait_for()
+  assert eio_sid == listener
+  assert "summarize_patient" in packet and "job-1" in packet
+  # 다른 room 참여자에게는 전달되지 않음
+  await asyncio.sleep(0.1)
+  assert node_b.received.empty()
+
+
+async def test_write_only_worker_emits_to_every_node(nodes, redis_options: dict) -> None:
+  node_a, node_b = nodes(), nodes()
+  listener_a = await node_a.join("patient-1")
+  listener_b = await node_b.join("patient-1")
+  await _subscribed(node_a, node_b)
+
+  worker = ManagerEmitter(NAMESPACE, manager=create_client_manager(write_only=True, redis_options=redis_options))
+  await worker.emit("loading", {"status": "processing"}, room="patient-1")
+
+  assert (await node_a.wait_for())[0] == listener_a
+  assert (await node_b.wait_for())[0] == listener_b
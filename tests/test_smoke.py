@@ -0,0 +1,22 @@
+"""진입점 import 확인 (모듈마다 새 인터프리터에서 import하여 순환 import를 잡음)"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.parametrize("module", [
+    "src.main",
+    "src.worker",
+    "src.services",
+    "src.api.medical",
+    "src.sio.features.medical.prewarm",
+    "benchmarks.emr_reads",
+])
+def test_import(module: str) -> None:
+  result = subprocess.run(
+      [sys.executable, "-c", f"import {module}"], cwd=ROOT, capture_output=True, text=True, timeout=120)
+  assert result.returncode == 0, result.stderr
@@ -0,0 +1,32 @@
+"""NDJSON 스트림 분리 테스트"""
+from typing import AsyncIterator
+
+import pytest
+
+from src.utils.stream_util import iter_ndjson_lines
+
+
+async def _chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+  for chunk in chunks:
+    yield chunk
+
+
+async def _lines(*chunks: bytes, max_line_bytes: int = 1024) -> list[bytes]:
+  return [line async for line in iter_ndjson_lines(_chunks(*chunks), max_line_bytes)]
+
+
+async def test_lines_split_across_chunks() -> None:
+  assert await _lines(b'{"a"', b': 1}\n\n{"b": 2}\n{"c"', b": 3}") == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+async def test_long_line_in_many_small_chunks() -> None:
+  line = b"x" * 5000
+  chunks = [line[i:i + 7] for i in range(0, len(line), 7)]
+
+  assert await _lines(*chunks, b"\n", b"y", max_line_bytes=5000) == [line, b"y"]
+
+
+@pytest.mark.parametrize("chunks", [(b"x" * 11,), (b"x" * 11 + b"\n",), (b"ok\n" + b"x" * 6, b"x" * 5)])
+async def test_line_over_limit_raises(chunks: tuple[bytes, ...]) -> None:
+  with pytest.raises(ValueError):
+    await _lines(*chunks, max_line_bytes=10)
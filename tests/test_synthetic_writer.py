@@ -0,0 +1,28 @@
+"""벤치마크 합성 데이터 삽입 테스트 (benchmarks.emr_reads / emr_indexes 공용)"""
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.synthetic import REF, SyntheticWriter, create_tables
+from src.services import EmrService
+
+
+@pytest.mark.parametrize("blobs", [False, True])
+async def test_inserted_chart_is_readable(tmp_path: Path, blobs: bool) -> None:
+  engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'emr.sqlite'}")
+  writer = SyntheticWriter(blobs=blobs)
+  async with engine.begin() as conn:
+    await create_tables(conn)
+    await writer.insert_chart(conn, REF, 100)
+    await writer.insert_chart(conn, {**REF, "chart": "00000002"}, 10)
+
+  chart = await EmrService(async_sessionmaker(engine, expire_on_commit=False)).load_chart(REF)
+  await engine.dispose()
+
+  # 50행마다 1건은 삭제(dc='1') 행
+  assert {key: len(rows) for key, rows in chart.items()} == {
+      "vitalSigns": 98, "nursingRecords": 98, "progressNotes": 98}
@@ -0,0 +1,54 @@
+"""보관 결과(warm hit) 응답 테스트"""
+from typing import Any, Optional
+
+from benchmarks.synthetic import synthetic_request
+from src.sio.features.medical.job_store import summary_job_store
+from src.sio.features.medical.jobs import SummaryJob
+from src.sio.features.medical.sections import section_fingerprints
+from src.sio.features.medical.summary import send_warm_result
+
+
+class RecordingEmitter:
+  namespace = "/medical"
+
+  def __init__(self) -> None:
+    self.events: list[tuple[str, Any]] = []
+
+  async def emit(self, event: str, data: Any, room: Optional[str] = None, skip_sid: Optional[str] = None) -> None:
+    self.events.append((event, data))
+
+
+async def _store_done(room: str, data: dict[str, Any]) -> None:
+  await summary_job_store.update(
+      "prewarm-job", room, "done", result={"clinicalSummary": "보관 결과"}, fingerprints=section_fingerprints(data))
+
+
+async def test_warm_result_served_inside_job() -> None:
+  data = synthetic_request(days=3)
+  await _store_done("warm-room-1", data)
+  emitter = RecordingEmitter()
+
+  assert await send_warm_result(emitter, "warm-room-1", data, job_id="job-1")
+
+  assert [event for event, _ in emitter.events] == ["summarize_patient", "loading"]
+  assert emitter.events[0][1]["clinicalSummary"] == "보관 결과"
+  record = await summary_job_store.get("job-1")
+  assert record.status == "done"
+  assert record.result["clinicalSummary"] == "보관 결과"
+
+
+async def test_force_bypasses_warm_result() -> None:
+  data = synthetic_request(days=3)
+  await _store_done("warm-room-2", data)
+  emitter = RecordingEmitter()
+
+  assert not await send_warm_result(emitter, "warm-room-2", {**data, "force": True}, job_id="job-2")
+  assert not await send_warm_result(emitter, "warm-room-2", synthetic_request(days=4), job_id="job-2")
+  assert emitter.events == []
+
+
+def test_silent_flag_survives_queue_round_trip() -> None:
+  job = SummaryJob(room="room", data={}, priority="background", silent=True)
+
+  assert SummaryJob.from_json(job.to_json()).silent
+  assert not SummaryJob.from_json(SummaryJob(room="room", data={}).to_json()).silent
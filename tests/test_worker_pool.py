@@ -0,0 +1,76 @@
+"""요약 워커 풀 큐 소비/작업 tenant 테스트"""
+import asyncio
+
+import pytest
+
+from src.core import settings
+from src.core.exceptions import ValidationException
+from src.sio.emitter import NullEmitter
+from src.sio.features.medical.job_store import summary_job_store
+from src.sio.features.medical.jobs import LocalSummaryJobQueue, SummaryJob, SummaryWorkerPool, resolve_tenant
+from src.sio.features.medical.scheduler import DEFAULT_TENANT
+
+
+async def test_dispatch_takes_only_what_admission_can_hold(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(settings, "SUMMARY_MAX_BACKLOG", 1)
+  queue = LocalSummaryJobQueue()
+  pool = SummaryWorkerPool(queue, NullEmitter("/medical"), concurrency=2)
+  release = asyncio.Event()
+  started: list[str] = []
+
+  async def execute(job: SummaryJob, emitter) -> None:
+    started.append(job.job_id)
+    await release.wait()
+
+  monkeypatch.setattr(pool, "_execute", execute)
+  for i in range(5):
+    await queue.put(SummaryJob(room=f"room-{i}", data={}))
+
+  pool.start()
+  try:
+    await asyncio.sleep(0.05)
+    # 동시 실행 2 + 대기열 1만 꺼내고 나머지는 큐에 남김
+    assert len(started) == 3
+    assert queue._queue.qsize() == 2
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert len(started) == 5 and queue._queue.qsize() == 0
+  finally:
+    await pool.stop()
+
+
+def test_payload_tenant_cannot_override_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(settings, "TENANT_WEIGHTS", {"01": 1})
+
+  assert resolve_tenant("01", "01") == "01"
+  assert resolve_tenant(None, "02") == "02"
+  with pytest.raises(ValidationException):
+    resolve_tenant("01", "02")
+  # 연결에 묶인 기관이 없으면 설정된 기관만 사용
+  assert resolve_tenant("01") == "01"
+  assert resolve_tenant("99") == DEFAULT_TENANT
+
+
+async def test_interactive_job_cancels_prewarm_for_room() -> None:
+  pool = SummaryWorkerPool(LocalSummaryJobQueue(), NullEmitter("/medical"), concurrency=1)
+  await summary_job_store.update("prewarm-1", "prewarm-room", "running", silent=True)
+
+  await pool._cancel_prewarm("prewarm-room")
+
+  assert (await summary_job_store.get("prewarm-1")).cancel_requested
+
+
+async def test_prewarm_skipped_while_request_active(monkeypatch: pytest.MonkeyPatch) -> None:
+  pool = SummaryWorkerPool(LocalSummaryJobQueue(), NullEmitter("/medical"), concurrency=1)
+  await summary_job_store.update("user-1", "busy-room", "running", requester_sid="sid-1")
+  job = SummaryJob(room="busy-room", data={}, priority="background", silent=True)
+  await summary_job_store.update(job.job_id, job.room, "queued", silent=True)
+
+  async def resolve_chart(data: dict) -> dict:
+    return data
+
+  monkeypatch.setattr("src.services.resolve_chart", resolve_chart)
+  await pool._execute(job, NullEmitter("/medical"))
+
+  assert (await summary_job_store.get(job.job_id)).status == "cancelled"